@@ -0,0 +1,93 @@
+"""
+比較 JSON 快照與二進位快照 (binary_snapshot) 的存檔時間、讀檔時間與檔案大小。
+以不依賴 PyQt6 的方式直接呼叫 storage 的讀寫函式，測試資料為多年份、每天數個任務的排程。
+
+    python benchmarks/bench_snapshot.py [--years 1 3 10] [--tasks-per-day 6] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import binary_snapshot  # noqa: E402
+import storage  # noqa: E402
+
+# 實際使用時任務名稱大多重複出現，名稱表只取少量的常用名稱
+TASK_NAMES = ["寫報告", "開會", "Code review", "回覆郵件", "閱讀", "運動", "學習日文", "整理筆記",
+              "Planning", "Deep work", "午餐", "讀論文"]
+
+
+def make_schedule(years, tasks_per_day, seed=0):
+    rng = random.Random(seed)
+    first = date(2020, 1, 1)
+    schedule = {}
+    for offset in range(int(years * 365)):
+        minutes = sorted(rng.sample(range(7 * 60, 22 * 60, 5), tasks_per_day))
+        schedule[(first + timedelta(days=offset)).isoformat()] = {
+            'tasks': [{'name': rng.choice(TASK_NAMES), 'time': f"{m // 60:02d}:{m % 60:02d}"} for m in minutes]}
+    return schedule
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_format(name, encode, decode, schedule, repeat, directory):
+    path = os.path.join(directory, 'snapshot.' + name)
+
+    def save():
+        storage.atomic_write(path, encode('zh_TW', schedule))
+
+    def load():
+        with open(path, 'rb') as f:
+            return decode(f.read())
+
+    save_seconds = best_of(repeat, save)
+    load_seconds = best_of(repeat, load)
+    if load() != ('zh_TW', schedule): raise AssertionError(f"{name} 讀回的資料與原本不同")
+    return {'format': name, 'save_ms': save_seconds * 1000, 'load_ms': load_seconds * 1000, 'bytes': os.path.getsize(path)}
+
+
+def decode_json(data):
+    full_data = json.loads(data.decode('utf-8'))
+    return full_data['language'], full_data['schedule']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 3, 10])
+    parser.add_argument('--tasks-per-day', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="以 JSON 輸出結果")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for years in args.years:
+            schedule = make_schedule(years, args.tasks_per_day)
+            for name, encode, decode in (('json', storage.encode_snapshot, decode_json),
+                                         ('binary', binary_snapshot.encode, binary_snapshot.decode)):
+                result = run_format(name, encode, decode, schedule, args.repeat, directory)
+                result.update(years=years, days=len(schedule), tasks=len(schedule) * args.tasks_per_day)
+                results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'years':>6} {'tasks':>8} {'format':>7} {'save ms':>9} {'load ms':>9} {'size KiB':>9}")
+    for r in results:
+        print(f"{r['years']:>6g} {r['tasks']:>8} {r['format']:>7} {r['save_ms']:>9.1f} {r['load_ms']:>9.1f} {r['bytes'] / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
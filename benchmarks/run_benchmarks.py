@@ -0,0 +1,271 @@
+"""
+FocusFlow 熱門路徑的效能測試，使用 Qt 的 offscreen 平台在沒有螢幕的環境執行。
+涵蓋排程生成、排程驗證、存檔/讀檔 (不同歷史長度與儲存後端)、週計畫重新綁定與計時畫面更新。
+
+    python benchmarks/run_benchmarks.py                       # 執行並與本機的 benchmarks/baseline.json 比較
+    python benchmarks/run_benchmarks.py --output results.json # 另外輸出機器可讀的結果
+    python benchmarks/run_benchmarks.py --save-baseline       # 以這次結果取代基準
+    python benchmarks/run_benchmarks.py --quick               # 較少的重複次數與較小的資料量
+
+任何項目的中位數比基準慢超過 --threshold 倍、且多出 --min-delta-ms 以上時以結束碼 1 結束
+(不到一毫秒的項目容易受雜訊影響，只看倍數會誤報)；有項目沒有基準時以結束碼 2 結束。
+基準與執行的機器有關，因此不放進版本控制 (見 .gitignore)，也不會自動建立：
+在這台機器上先以 --save-baseline 量測一次，之後的執行只與同一台機器上的結果比較。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt6.QtCore import QDate  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QMessageBox  # noqa: E402
+
+import main  # noqa: E402
+import storage  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+MODES = [(20, 5), (25, 10), (30, 15)]
+TASK_NAMES = ["寫報告", "開會", "Code review", "回覆郵件", "閱讀", "運動", "學習日文", "整理筆記"]
+
+
+def measure(func, repeat, setup=None):
+    """回傳每次執行的秒數列表；setup 在每次量測前執行且不計入時間。先執行一次不計時的暖身。"""
+    if setup: setup()
+    func()
+    samples = []
+    for _ in range(repeat):
+        if setup: setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(name, samples, **params):
+    return {'name': name, 'params': params, 'runs': len(samples),
+            'median_ms': statistics.median(samples) * 1000, 'min_ms': min(samples) * 1000}
+
+
+def make_day(task_count, rng):
+    minutes = sorted(rng.randrange(0, 24 * 60) for _ in range(task_count))
+    return {'tasks': [{'name': rng.choice(TASK_NAMES), 'time': f"{m // 60:02d}:{m % 60:02d}"} for m in minutes]}
+
+
+def make_history(days, tasks_per_day, seed=0):
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    return {(today - timedelta(days=offset)).isoformat(): make_day(tasks_per_day, rng) for offset in range(days)}
+
+
+class Workspace:
+    """在暫存資料夾中建立獨立的 PomodoroApp，結束時關閉背景存檔並刪除資料。"""
+    def __init__(self, storage_mode='sharded', history=None, language='zh_TW'):
+        self._tmp = tempfile.TemporaryDirectory()
+        main.CONFIG_FILE = os.path.join(self._tmp.name, 'pomodoro_schedule.json')
+        if history is not None:
+            with open(main.CONFIG_FILE, 'wb') as f:
+                f.write(storage.encode_snapshot(language, history))
+        self.window = main.PomodoroApp(storage_mode=storage_mode)
+
+    def close_window(self):
+        self.window.writer.close()
+        self.window.store.close()
+        # 先送出背景存檔排隊中的通知，再銷毀視窗
+        QApplication.processEvents()
+        self.window.deleteLater()
+        QApplication.processEvents()
+
+    def close(self):
+        self.close_window()
+        self._tmp.cleanup()
+
+
+def bench_generate(args):
+    results = []
+    rng = random.Random(1)
+    workspace = Workspace()
+    window = workspace.window
+    today_str = QDate.currentDate().toString("yyyy-MM-dd")
+    for task_count in args.task_counts:
+        window.schedule_data[today_str] = make_day(task_count, rng)
+        for mode_index, mode in enumerate(MODES):
+            window.pomodoro_mode_combo.setCurrentIndex(mode_index)
+            samples = measure(window.generate_pomodoro_schedule, args.repeat)
+            results.append(summarize('generate_pomodoro_schedule', samples, tasks=task_count, mode=f"{mode[0]}/{mode[1]}"))
+            # 清除排程快取後再量測，相當於任務剛被編輯過的第一次預覽
+            samples = measure(window.generate_pomodoro_schedule, args.repeat, setup=lambda: window.plan_cache.invalidate(today_str))
+            results.append(summarize('generate_pomodoro_schedule_cold', samples, tasks=task_count, mode=f"{mode[0]}/{mode[1]}"))
+        schedule, _ = window.generate_pomodoro_schedule()
+        samples = measure(lambda: window.validate_schedule(schedule), args.repeat)
+        results.append(summarize('validate_schedule', samples, tasks=task_count))
+    workspace.close()
+    return results
+
+
+def bench_persistence(args):
+    results = []
+    rng = random.Random(2)
+    for storage_mode in args.storage:
+        for days in args.history_days:
+            workspace = Workspace(storage_mode, make_history(days, args.tasks_per_day))
+            window = workspace.window
+            week_dates = window.week_model.dates()
+
+            def edit_week():
+                for date_str in week_dates:
+                    window.schedule_data[date_str] = make_day(args.tasks_per_day, rng)
+                    window.dirty_dates.add(date_str)
+                window.week_model.set_week(window.date_picker.date, window.schedule_data)
+
+            def save():
+                window.save_data_to_file()
+                window.writer.flush()
+
+            samples = measure(save, args.repeat, setup=edit_week)
+            results.append(summarize('save_data_to_file', samples, storage=storage_mode, history_days=days))
+
+            def load():
+                window.load_data()
+                window.fetch_range(window.date_picker.date, window.date_picker.date.addDays(6))
+
+            def fresh_store():
+                # 每次都換一個新的後端物件，量測冷啟動時的讀取
+                window.store.close()
+                window.store = window.writer.store = storage.open_store(storage_mode, main.CONFIG_FILE)
+
+            samples = measure(load, args.repeat, setup=fresh_store)
+            results.append(summarize('load_data', samples, storage=storage_mode, history_days=days))
+            workspace.close()
+    return results
+
+
+def bench_populate(args):
+    results = []
+    for tasks_per_day in args.week_tasks:
+        # 兩週交替切換，每天都排滿任務
+        history = {}
+        start = QDate.currentDate()
+        rng = random.Random(3)
+        for offset in range(14):
+            history[start.addDays(offset).toString("yyyy-MM-dd")] = make_day(tasks_per_day, rng)
+        workspace = Workspace(history=history)
+        window = workspace.window
+        weeks = [start, start.addDays(7)]
+        window.fetch_range(weeks[1], weeks[1].addDays(6))
+        state = {'i': 0}
+
+        def flip():
+            state['i'] ^= 1
+            window.populate_week_view(weeks[state['i']])
+
+        samples = measure(flip, args.repeat)
+        results.append(summarize('populate_week_view', samples, tasks_per_day=tasks_per_day))
+        workspace.close()
+    return results
+
+
+def bench_update_timer(args):
+    workspace = Workspace()
+    window = workspace.window
+    now = datetime.now()
+    window.schedule_data[now.date().isoformat()] = {'tasks': [{'name': 'Benchmark', 'time': now.strftime("%H:%M")}]}
+    schedule, _ = window.generate_pomodoro_schedule()
+    window.pomodoro_schedule = schedule
+    window.is_running = True
+    window.ensure_timer_view()
+    window.setup_view.hide(); window.timer_view.show()
+    window.show()
+    window.timer_engine.start(schedule)
+    samples = measure(window.update_timer, args.repeat * 20)
+    window.stop_pomodoro()
+    window.hide()
+    workspace.close()
+    return [summarize('update_timer', samples)]
+
+
+BENCHMARKS = [bench_generate, bench_persistence, bench_populate, bench_update_timer]
+
+
+def result_key(result):
+    return result['name'] + json.dumps(result['params'], sort_keys=True)
+
+
+def compare(results, baseline, threshold, min_delta_ms=0.0):
+    """回傳 (報告文字列, 是否有退步)。"""
+    previous = {result_key(result): result for result in baseline.get('results', [])}
+    lines, regressed = [], False
+    for result in results:
+        params = ', '.join(f"{k}={v}" for k, v in result['params'].items())
+        label = f"{result['name']}[{params}]" if params else result['name']
+        old = previous.get(result_key(result))
+        if old is None:
+            lines.append(f"{label:<64}{result['median_ms']:>10.3f} ms   (沒有基準)")
+            continue
+        ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] else 1.0
+        flag = ''
+        if ratio > threshold and result['median_ms'] - old['median_ms'] > min_delta_ms:
+            flag, regressed = '  <-- 退步', True
+        lines.append(f"{label:<64}{result['median_ms']:>10.3f} ms   x{ratio:.2f}{flag}")
+    return lines, regressed
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="FocusFlow 效能測試")
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--quick', action='store_true', help="較少的重複次數與較小的資料量")
+    parser.add_argument('--output', help="將結果寫入此 JSON 檔案")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="以這次的結果覆寫基準檔案")
+    parser.add_argument('--threshold', type=float, default=1.5, help="中位數超過基準的幾倍視為退步")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help="比基準多出的毫秒數低於此值時不視為退步")
+    parser.add_argument('--storage', nargs='+', default=['sharded', 'json'], choices=sorted(storage.STORAGE_BACKENDS))
+    args = parser.parse_args(argv)
+    args.task_counts = [10, 100] if args.quick else [10, 100, 1000]
+    args.history_days = [365] if args.quick else [365, 5 * 365]
+    args.week_tasks = [10] if args.quick else [10, 50]
+    args.tasks_per_day = 8
+    if args.quick: args.repeat = min(args.repeat, 5)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    # 所有任務時間都已過去時會跳出詢問對話框；效能測試中一律回答「是」
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.StandardButton.Yes)
+    results = []
+    for bench in BENCHMARKS:
+        results.extend(bench(args))
+        app.processEvents()
+
+    report = {'python': platform.python_version(), 'platform': platform.platform(),
+              'created': datetime.now().isoformat(timespec='seconds'), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(report, f, ensure_ascii=False, indent=2)
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f: baseline = json.load(f)
+    lines, regressed = compare(results, baseline, args.threshold, args.min_delta_ms)
+    print("\n".join(lines))
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f: json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"已更新基準: {args.baseline}")
+        return 0
+    if regressed: return 1
+    # 不自動以這次的結果當作基準，否則沒有基準的機器 (例如 CI) 永遠不會失敗，較慢的第一次執行也會成為基準
+    known = {result_key(result) for result in baseline.get('results', [])}
+    missing = [result for result in results if result_key(result) not in known]
+    if missing:
+        print(f"{len(missing)} 個項目沒有基準 ({args.baseline})；請在這台機器上以 --save-baseline 建立基準", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,164 @@
+"""
+排程資料的精簡二進位快照格式 (不依賴 PyQt6)。
+與 JSON 快照 ({'language': ..., 'schedule': {日期: {'tasks': [...]}}}) 可無損互轉:
+    encode(language, schedule) -> bytes
+    decode(data) -> (language, schedule)
+
+檔案配置 (varint 為無號 LEB128；陣列為 1 byte 型別碼 + varint 長度 + little-endian 內容):
+    標頭      MAGIC (4 bytes) | 版本 (1 byte) | 保留 (1 byte)
+    字串表    varint 數量, 每個字串為 (varint UTF-8 長度, 內容)；任務名稱與語言只存一次
+    語言      varint 字串表索引
+    日期      varint 第一天的序數；陣列: 每天與前一天的序數差 (第一個為 0)
+              陣列: 每天的任務數
+    任務      陣列: 分鐘數；陣列: 名稱在字串表中的索引
+    其他      varint JSON 長度, 內容 (0 表示沒有)；無法以上述欄位表示的日期原樣保存於此
+    檢查碼    標頭之後所有內容的 CRC32 (4 bytes, little-endian)
+各欄位分開存放成整數陣列，讀取時整段轉換，不必逐一解析每個數值。
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date
+from itertools import accumulate
+
+MAGIC = b'FFSN'
+VERSION = 1
+_HEADER = struct.Struct('<4sBB')
+_CRC = struct.Struct('<I')
+# 依最大值選用最小的整數型別
+_ARRAY_TYPES = (('B', 0xFF), ('H', 0xFFFF), ('I', 0xFFFFFFFF), ('Q', 0xFFFFFFFFFFFFFFFF))
+_TIMES = [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)]
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        if pos >= len(data): raise ValueError("快照資料不完整")
+        byte = data[pos]; pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80: return result, pos
+        shift += 7
+
+
+def _write_array(out, values):
+    typecode = next(code for code, limit in _ARRAY_TYPES if not values or max(values) <= limit)
+    packed = array(typecode, values)
+    if sys.byteorder == 'big': packed.byteswap()
+    out.append(ord(typecode)); _write_varint(out, len(values)); out += packed.tobytes()
+
+
+def _read_array(data, pos):
+    if pos >= len(data): raise ValueError("快照資料不完整")
+    typecode = chr(data[pos])
+    if typecode not in dict(_ARRAY_TYPES): raise ValueError(f"無效的陣列型別: {typecode!r}")
+    count, pos = _read_varint(data, pos + 1)
+    values = array(typecode)
+    end = pos + count * values.itemsize
+    if end > len(data): raise ValueError("快照資料不完整")
+    values.frombytes(data[pos:end])
+    if sys.byteorder == 'big': values.byteswap()
+    return values, end
+
+
+def _day_ordinal(date_str):
+    """可用序數表示的日期回傳序數，否則回傳 None。"""
+    try:
+        day = date.fromisoformat(date_str)
+    except (TypeError, ValueError):
+        return None
+    return day.toordinal() if day.isoformat() == date_str else None
+
+
+def _task_minute(task):
+    """只有 {'name': 字串, 'time': 'HH:mm'} 形式的任務能以分鐘數表示，否則回傳 None。"""
+    if not isinstance(task, dict) or task.keys() != {'name', 'time'} or not isinstance(task['name'], str): return None
+    text = task['time']
+    if not isinstance(text, str) or len(text) != 5 or text[2] != ':' or not (text[:2] + text[3:]).isdigit(): return None
+    hours, minutes = int(text[:2]), int(text[3:])
+    return hours * 60 + minutes if hours < 24 and minutes < 60 else None
+
+
+def encode(language, schedule):
+    strings, index = [], {}
+
+    def intern(text):
+        if text not in index:
+            index[text] = len(strings); strings.append(text)
+        return index[text]
+
+    intern(language)
+    days, extras = [], {}
+    for date_str, day in schedule.items():
+        ordinal = _day_ordinal(date_str)
+        tasks = day.get('tasks') if isinstance(day, dict) and day.keys() == {'tasks'} else None
+        minutes = [_task_minute(task) for task in tasks] if isinstance(tasks, list) else None
+        if ordinal is None or minutes is None or None in minutes:
+            extras[date_str] = day
+            continue
+        days.append((ordinal, [(minute, intern(task['name'])) for minute, task in zip(minutes, tasks)]))
+    days.sort(key=lambda entry: entry[0])
+
+    body = bytearray()
+    _write_varint(body, len(strings))
+    for text in strings:
+        raw = text.encode('utf-8')
+        _write_varint(body, len(raw)); body += raw
+    _write_varint(body, index[language])
+    ordinals = [ordinal for ordinal, _ in days]
+    _write_varint(body, ordinals[0] if ordinals else 0)
+    _write_array(body, [later - earlier for earlier, later in zip(ordinals[:1] + ordinals, ordinals)])
+    _write_array(body, [len(tasks) for _, tasks in days])
+    _write_array(body, [minute for _, tasks in days for minute, _ in tasks])
+    _write_array(body, [name_index for _, tasks in days for _, name_index in tasks])
+    raw = json.dumps(extras, ensure_ascii=False, separators=(',', ':')).encode('utf-8') if extras else b''
+    _write_varint(body, len(raw)); body += raw
+    return _HEADER.pack(MAGIC, VERSION, 0) + bytes(body) + _CRC.pack(zlib.crc32(body))
+
+
+def decode(data):
+    if len(data) < _HEADER.size + _CRC.size: raise ValueError("快照資料不完整")
+    magic, version, _ = _HEADER.unpack_from(data)
+    if magic != MAGIC: raise ValueError("不是 FocusFlow 二進位快照")
+    if version > VERSION: raise ValueError(f"不支援的快照版本: {version}")
+    body = memoryview(data)[_HEADER.size:-_CRC.size]
+    if zlib.crc32(body) != _CRC.unpack_from(data, len(data) - _CRC.size)[0]: raise ValueError("快照檢查碼不符")
+
+    count, pos = _read_varint(body, 0)
+    strings = []
+    for _ in range(count):
+        length, pos = _read_varint(body, pos)
+        strings.append(bytes(body[pos:pos + length]).decode('utf-8')); pos += length
+    language_index, pos = _read_varint(body, pos)
+    first_ordinal, pos = _read_varint(body, pos)
+    deltas, pos = _read_array(body, pos)
+    counts, pos = _read_array(body, pos)
+    minutes, pos = _read_array(body, pos)
+    name_indexes, pos = _read_array(body, pos)
+    if len(deltas) != len(counts) or len(minutes) != len(name_indexes) or sum(counts) != len(minutes):
+        raise ValueError("快照中的陣列長度不一致")
+    try:
+        language = strings[language_index]
+        times = [_TIMES[minute] for minute in minutes]
+        names = [strings[name_index] for name_index in name_indexes]
+        schedule, start = {}, 0
+        for offset, count in zip(accumulate(deltas), counts):
+            end = start + count
+            schedule[date.fromordinal(first_ordinal + offset).isoformat()] = {
+                'tasks': [{'name': name, 'time': time} for name, time in zip(names[start:end], times[start:end])]}
+            start = end
+    except (IndexError, ValueError, OverflowError):
+        raise ValueError("快照中的索引或日期無效") from None
+    length, pos = _read_varint(body, pos)
+    if length:
+        schedule.update(json.loads(bytes(body[pos:pos + length]).decode('utf-8'))); pos += length
+    if pos != len(body): raise ValueError("快照結尾有多餘的資料")
+    return language, schedule
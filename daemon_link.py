@@ -0,0 +1,32 @@
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import focus_daemon
+
+
+class DaemonListener(QObject):
+    """
+    以獨立的連線訂閱計時守護行程的事件。
+    事件在背景執行緒中讀取，以 event 訊號 (跨執行緒時自動排入 GUI 執行緒) 交給視窗處理。
+    """
+    event = pyqtSignal(dict)
+    disconnected = pyqtSignal()
+
+    def __init__(self, address, token_file=None, parent=None):
+        super().__init__(parent)
+        self._client = focus_daemon.DaemonClient(address, token_file=token_file)
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="FocusFlowDaemonEvents", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for message in self._client.events(): self.event.emit(message)
+        except focus_daemon.DaemonError:
+            pass
+        if not self._closing: self.disconnected.emit()
+
+    def close(self):
+        self._closing = True
+        self._client.close()
+        self._thread.join(1.0)
@@ -0,0 +1,787 @@
+"""
+計時守護行程 (main.py --daemon，不依賴 PyQt6)。
+擁有排程資料的儲存後端與執行中的番茄鐘，GUI 關閉或當掉都不會中斷計時；
+GUI (main.py --attach)、托盤與命令列工具以本機通訊端連線，可隨時連上或離開。
+
+協定為每行一個 UTF-8 JSON 物件；不是以 { 開頭或無法解析的一行會讓守護行程中斷該連線:
+    要求    {"id": 1, "cmd": "status", ...參數}
+    回應    {"id": 1, "ok": true, "result": ...} 或 {"id": 1, "ok": false, "error": "..."}
+    事件    {"event": "segment", "time": ..., ...}  只送給送出過 subscribe 的連線
+指令:
+    auth(token)    TCP 連線的第一個要求必須是 auth，權杖在資料檔旁的 .token 檔案中 (只有擁有者可讀取)
+    ping / status / subscribe / unsubscribe / shutdown
+    load_settings / load_range(first, last) / search(text, limit) / stats(first, last)
+    save(language, days, dates)    days 為 {日期: {"tasks": [...]} 或 null}；dates 為要寫入的日期 (不接受整份取代)。
+                                   只寫入資料，不重新規劃執行中的番茄鐘 (GUI 編輯期間每幾秒自動存檔一次)
+    start(segments 或 restart, mode) / stop
+    update_plan(segments)          執行中替換排程 (GUI 回到計時畫面時重新規劃的結果)，目前的區段不變
+事件:
+    started(plan, mode, origin) / plan(plan, origin) / segment(index, segment) / done / stopped(origin) / saved(days, origin)
+區段以 schedule_engine.segment_to_dict 的格式傳遞；origin 為發出要求的連線編號 (見 ping)。
+
+加上 --rpc 時另外開啟一個 JSON-RPC 2.0 端點 (同樣每行一個要求，可用陣列批次送出)，給編輯器外掛與腳本使用；
+無法解析的一行會在回應 Parse error 後中斷連線:
+    system.auth(token)                 TCP 連線的第一個要求，權杖與 auth 指令相同
+    system.ping
+    plan.today(mode, restart)          執行中時為目前的排程，否則依 GUI 預覽的規則產生今天的排程 (不開始計時)
+    timer.current / timer.start(mode, restart) / timer.stop
+    timer.subscribe / timer.unsubscribe        推送 timer.transition 通知 (params 同上方的事件)
+    schedule.subscribe / schedule.unsubscribe  推送 schedule.changed 通知 (params: dates, origin)
+    schedule.get(date) / schedule.range(first, last) / schedule.set(date, tasks) / schedule.delete(date)
+    schedule.add_task(date, name, time) / schedule.update_task(date, index, name, time) / schedule.delete_task(date, index)
+    schedule.* 的編輯包含今天時，執行中的番茄鐘會重新規劃目前區段之後的部分
+
+POSIX 上使用資料檔旁、只有擁有者可存取的 Unix 通訊端；Windows 上改用只接受本機連線的 TCP 連接埠，
+本機的其他程式 (包括瀏覽器中的網頁) 都能連上，因此必須先以權杖驗證。
+"""
+import argparse
+import asyncio
+import hmac
+import itertools
+import json
+import os
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import headless
+import jsonrpc
+import schedule_engine
+import storage
+from translations import TRANSLATIONS
+
+PROTOCOL_VERSION = 1
+# 不支援 Unix 通訊端時使用的本機連接埠
+DEFAULT_PORT = 47815
+# 計時迴圈每次最多等待的秒數，系統休眠或調整時鐘後最遲在此時間內重新對時
+MAX_SLEEP_SECONDS = 30.0
+WAKE_SLACK_SECONDS = 0.005
+# 單一要求 (一行) 的長度上限
+MAX_LINE_BYTES = 16 * 1024 * 1024
+# 訂閱者來不及讀取、尚未送出的資料超過此大小時中斷該連線，避免記憶體無限增加
+MAX_PENDING_BYTES = 4 * 1024 * 1024
+# 未指定模式時使用的 (工作, 休息) 分鐘數，與 GUI 的第一個選項相同
+DEFAULT_MODE = (20, 5)
+# 用戶端等待單一回應的秒數
+CALL_TIMEOUT_SECONDS = 30.0
+
+
+def daemon_address(config_file):
+    """Unix 通訊端為路徑字串，TCP 為 (主機, 連接埠)。"""
+    if hasattr(socket, 'AF_UNIX') and os.name != 'nt':
+        return os.path.splitext(config_file)[0] + '.sock'
+    return ('127.0.0.1', DEFAULT_PORT)
+
+
+def rpc_address(config_file):
+    if hasattr(socket, 'AF_UNIX') and os.name != 'nt':
+        return os.path.splitext(config_file)[0] + '.rpc.sock'
+    return ('127.0.0.1', DEFAULT_PORT + 1)
+
+
+def token_path(config_file):
+    return os.path.splitext(config_file)[0] + '.token'
+
+
+def write_token(path):
+    """產生新的權杖並寫入只有擁有者可讀取的檔案 (先刪除舊檔，避免沿用較寬的權限)。"""
+    token = secrets.token_hex(32)
+    if os.path.exists(path): os.unlink(path)
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w', encoding='ascii') as f:
+        f.write(token)
+    return token
+
+
+def read_token(path):
+    try:
+        with open(path, 'r', encoding='ascii') as f: return f.read().strip()
+    except OSError as e:
+        raise DaemonError(f"無法讀取計時守護行程的權杖: {e}") from None
+
+
+def parse_address(text):
+    host, sep, port = text.rpartition(':')
+    if sep and port.isdigit() and os.path.sep not in text: return (host or '127.0.0.1', int(port))
+    return text
+
+
+def format_address(address):
+    return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+
+# --- 守護行程 ---
+class Connection:
+    _ids = itertools.count(1)
+    # 一行要求允許的開頭；其他內容 (例如 HTTP 要求的標頭) 不回應，直接中斷連線
+    OPENERS = (b'{',)
+
+    def __init__(self, writer, authenticated):
+        self.id = next(self._ids)
+        self.writer = writer
+        self.task = asyncio.current_task()
+        self.topics = set()  # 'timer' 與/或 'schedule'
+        self.authenticated = authenticated
+        self.hang_up = False  # 送出回應後中斷連線 (無法解析的要求)
+
+    def send(self, message):
+        if self.writer.is_closing(): return
+        if self.writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+            self.writer.transport.abort()
+            return
+        self.writer.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def notify(self, topic, message):
+        self.send(message)
+
+    async def process(self, daemon, line):
+        return await daemon.dispatch(self, line)
+
+
+class RpcConnection(Connection):
+    """JSON-RPC 端點的連線；事件以 JSON-RPC 通知的形式推送。"""
+    METHODS = {'timer': 'timer.transition', 'schedule': 'schedule.changed'}
+    OPENERS = (b'{', b'[')
+
+    def notify(self, topic, message):
+        self.send(jsonrpc.notification(self.METHODS[topic], message))
+
+    async def process(self, daemon, line):
+        try:
+            payload = jsonrpc.parse(line)
+        except jsonrpc.RpcError as e:
+            self.hang_up = True
+            return jsonrpc.error_response(None, e)
+        if not self.authenticated and not (isinstance(payload, dict) and payload.get('method') == 'system.auth'):
+            request_id = payload.get('id') if isinstance(payload, dict) else None
+            return jsonrpc.error_response(request_id, jsonrpc.RpcError(jsonrpc.UNAUTHORIZED, "Unauthorized", "需要先呼叫 system.auth"))
+        return await daemon.rpc.handle(payload, self)
+
+
+class FocusDaemon:
+    """
+    在 asyncio 事件迴圈中執行的番茄鐘。所有狀態只在事件迴圈的執行緒中存取；
+    儲存後端的讀寫交給工作執行緒，並以 store_lock 依序進行。
+    """
+    def __init__(self, store, token=None):
+        self.store = store
+        self.token = token  # TCP 連線需要的權杖；None 時拒絕所有 TCP 連線
+        self.connections = set()
+        self.plan = []
+        self.starts = []
+        self.running_mode = None
+        self.current_index = -1
+        self.timer_task = None
+        self.store_lock = asyncio.Lock()
+        # schedule.* 的讀取-修改-寫入期間持有，避免兩個腳本同時編輯同一天時互相覆蓋
+        self.edit_lock = asyncio.Lock()
+        self.closed = asyncio.Event()
+        self.rpc = jsonrpc.Dispatcher()
+        for name in dir(self):
+            if name.startswith('rpc_'): self.rpc.register(name[4:].replace('__', '.'), getattr(self, name))
+
+    async def serve(self, address, connection_class=Connection):
+        # Unix 通訊端以檔案權限限制存取；TCP 連線都必須先驗證
+        trusted = isinstance(address, str)
+        async def handle(reader, writer):
+            await self.handle(reader, writer, connection_class(writer, trusted))
+        if trusted:
+            # 以 umask 讓通訊端一建立就只有擁有者可存取 (bind 之後才 chmod 會留下其他使用者可連線的空檔)
+            old_umask = os.umask(0o077)
+            try:
+                server = await asyncio.start_unix_server(handle, path=address, limit=MAX_LINE_BYTES)
+            finally:
+                os.umask(old_umask)
+        else:
+            server = await asyncio.start_server(handle, *address, limit=MAX_LINE_BYTES)
+        return server
+
+    async def handle(self, reader, writer, connection):
+        self.connections.add(connection)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    connection.send({'id': None, 'ok': False, 'error': "要求過長"})
+                    break
+                if not line: break
+                if not line.strip(): continue
+                if not line.lstrip().startswith(connection.OPENERS): break
+                response = await connection.process(self, line)
+                if response is not None: connection.send(response)
+                await writer.drain()
+                # 無法解析的要求，或第一個要求沒有通過驗證
+                if connection.hang_up or not connection.authenticated: break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+
+    async def dispatch(self, connection, line):
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                connection.hang_up = True
+                raise
+            if not isinstance(request, dict): raise ValueError("要求必須是 JSON 物件")
+            request_id = request.get('id')
+            if not connection.authenticated and request.get('cmd') != 'auth': raise PermissionError("需要先以 auth 指令驗證")
+            handler = getattr(self, 'cmd_' + str(request.get('cmd')), None)
+            if handler is None: raise ValueError(f"未知的指令: {request.get('cmd')!r}")
+            args = {key: value for key, value in request.items() if key not in ('id', 'cmd')}
+            return {'id': request_id, 'ok': True, 'result': await handler(connection, **args)}
+        except (TypeError, KeyError, *storage.STORAGE_ERRORS) as e:
+            return {'id': request_id, 'ok': False, 'error': str(e)}
+
+    def broadcast(self, event, **fields):
+        topic = 'schedule' if event == 'saved' else 'timer'
+        message = {'event': event, 'time': datetime.now().isoformat(timespec='seconds'), **fields}
+        for connection in list(self.connections):
+            if topic in connection.topics: connection.notify(topic, message)
+
+    async def in_store(self, func, *args):
+        async with self.store_lock:
+            return await asyncio.to_thread(func, *args)
+
+    # --- 計時 ---
+    def plan_records(self):
+        return [schedule_engine.segment_to_dict(segment) for segment in self.plan]
+
+    def locate(self, now):
+        return schedule_engine.locate(self.plan, self.starts, now)
+
+    def set_plan(self, plan, current_index):
+        self.plan, self.starts = plan, [segment.start for segment in plan]
+        self.current_index = current_index
+        if self.timer_task is not None: self.timer_task.cancel()
+        self.timer_task = asyncio.get_running_loop().create_task(self.run_timer()) if plan else None
+
+    async def run_timer(self):
+        # 與 headless.TerminalTimer.run 相同：只在區段邊界 (或 MAX_SLEEP_SECONDS 上限) 醒來
+        while self.plan:
+            now = datetime.now()
+            state, index = self.locate(now)
+            if state == 'done':
+                self.plan, self.starts, self.running_mode, self.timer_task = [], [], None, None
+                self.broadcast('done')
+                return
+            if state == 'active' and index > self.current_index:
+                self.current_index = index
+                self.broadcast('segment', index=index, segment=schedule_engine.segment_to_dict(self.plan[index]))
+            segment = self.plan[index]
+            boundary = segment.end if state == 'active' else segment.start
+            await asyncio.sleep(max(0.0, min((boundary - now).total_seconds(), MAX_SLEEP_SECONDS)) + WAKE_SLACK_SECONDS)
+
+    def stop_session(self, origin):
+        self.set_plan([], -1)
+        self.running_mode = None
+        self.broadcast('stopped', origin=origin)
+
+    def replan(self, tasks, origin):
+        """與 PomodoroApp.replan_running_session 相同：只重新計算目前區段之後的部分。"""
+        now = datetime.now()
+        state, index = self.locate(now)
+        if state == 'done': return
+        current_index = index if state == 'active' else index - 1
+        new_plan = schedule_engine.replan_tail(self.plan, current_index, tasks, self.running_mode, now)
+        if not new_plan:
+            self.stop_session(origin)
+            return
+        if new_plan == self.plan or schedule_engine.find_overlap(new_plan) != -1: return
+        self.set_plan(new_plan, self.current_index)
+        self.broadcast('plan', plan=self.plan_records(), origin=origin)
+
+    # --- 指令 ---
+    async def cmd_auth(self, connection, token):
+        if self.token is None or not hmac.compare_digest(str(token).encode('utf-8'), self.token.encode('utf-8')):
+            raise PermissionError("權杖不正確")
+        connection.authenticated = True
+        return True
+
+    async def cmd_ping(self, connection):
+        return {'version': PROTOCOL_VERSION, 'pid': os.getpid(), 'connection': connection.id}
+
+    async def cmd_status(self, connection):
+        state, index = self.locate(datetime.now())
+        return {'running': bool(self.plan), 'mode': list(self.running_mode) if self.running_mode else None,
+                'state': state, 'index': index, 'plan': self.plan_records()}
+
+    async def cmd_subscribe(self, connection):
+        connection.topics = {'timer', 'schedule'}
+        return True
+
+    async def cmd_unsubscribe(self, connection):
+        connection.topics = set()
+        return True
+
+    async def cmd_shutdown(self, connection):
+        asyncio.get_running_loop().call_soon(self.closed.set)
+        return True
+
+    async def cmd_load_settings(self, connection):
+        return await self.in_store(self.store.load_settings)
+
+    async def cmd_load_range(self, connection, first, last):
+        return await self.in_store(self.store.load_range, str(first), str(last))
+
+    async def cmd_search(self, connection, text, limit=100):
+        return [list(item) for item in await self.in_store(self.store.search, str(text), int(limit))]
+
+    async def cmd_stats(self, connection, first, last):
+        return await self.in_store(self.store.stats, str(first), str(last))
+
+    async def cmd_save(self, connection, language, days, dates):
+        if language not in TRANSLATIONS: raise ValueError(f"不支援的語言: {language!r}")
+        if not isinstance(days, dict): raise TypeError("days 必須是 {日期: 資料} 物件")
+        # 整份取代會刪除所有沒有列出的日期，不開放給連線使用
+        if not isinstance(dates, list): raise TypeError("dates 必須是日期陣列")
+        # 與 schedule.* 相同的檢查，格式錯誤的資料不寫入 (之後的 plan.today 與 GUI 讀取時才會失敗)
+        dates = [check_date(date_str) for date_str in dates]
+        days = {check_date(date_str): check_day(day) for date_str, day in days.items()}
+        # GUI 的自動存檔：執行中的番茄鐘由 GUI 回到計時畫面時以 update_plan 更新，不在這裡重新規劃
+        await self.save_days(language, {date_str: days.get(date_str) for date_str in dates}, dates, connection.id)
+        return True
+
+    async def save_days(self, language, days, dates, origin, replan=False):
+        await self.in_store(self.store.save, language, {date_str: day for date_str, day in days.items() if day}, dates)
+        self.broadcast('saved', days=days, origin=origin)
+        today_str = datetime.now().date().isoformat()
+        if replan and self.plan and today_str in dates:
+            self.replan((days.get(today_str) or {}).get('tasks', []), origin)
+
+    async def build_today(self, mode, restart):
+        """回傳 (排程, None) 或 (None, 錯誤訊息)；規則與 GUI 的 generate_pomodoro_schedule 相同。"""
+        today_str = datetime.now().date().isoformat()
+        language = await self.in_store(self.store.load_settings)
+        days = await self.in_store(self.store.load_range, today_str, today_str)
+        plan, error_key = headless.build_today(days.get(today_str, {}).get('tasks', []), mode, datetime.now(), bool(restart))
+        return plan, None if plan is not None else TRANSLATIONS.get(language, TRANSLATIONS['zh_TW'])[error_key]
+
+    async def cmd_start(self, connection, segments=None, mode=DEFAULT_MODE, restart=False):
+        mode = schedule_engine.check_mode(tuple(mode))
+        if segments is None:
+            plan, error = await self.build_today(mode, restart)
+            if plan is None: raise ValueError(error)
+        else:
+            plan = [schedule_engine.segment_from_dict(record) for record in segments]
+            if not plan or schedule_engine.find_overlap(plan) != -1: raise ValueError("排程為空或區段重疊")
+        self.running_mode = mode
+        self.set_plan(plan, -1)
+        self.broadcast('started', plan=self.plan_records(), mode=list(mode), origin=connection.id)
+        return self.plan_records()
+
+    async def cmd_stop(self, connection):
+        if self.plan: self.stop_session(connection.id)
+        return True
+
+    async def cmd_update_plan(self, connection, segments):
+        if not self.plan: raise ValueError("番茄鐘沒有在執行")
+        if not isinstance(segments, list): raise TypeError("segments 必須是區段陣列")
+        plan = [schedule_engine.segment_from_dict(record) for record in segments]
+        if not plan or schedule_engine.find_overlap(plan) != -1: raise ValueError("排程為空或區段重疊")
+        # 與 replan 相同：前段 (已完成與目前的區段) 不變，因此目前區段的索引沿用
+        if plan[:self.current_index + 1] != self.plan[:self.current_index + 1]: raise ValueError("已開始的區段不能變更")
+        if plan == self.plan: return True
+        self.set_plan(plan, self.current_index)
+        self.broadcast('plan', plan=self.plan_records(), origin=connection.id)
+        return True
+
+    # --- JSON-RPC 方法 (名稱中的 __ 對應到 .) ---
+    async def rpc_system__auth(self, connection, token):
+        try:
+            return await self.cmd_auth(connection, token)
+        except PermissionError as e:
+            raise jsonrpc.RpcError(jsonrpc.UNAUTHORIZED, "Unauthorized", str(e)) from None
+
+    async def rpc_system__ping(self, connection):
+        return await self.cmd_ping(connection)
+
+    async def rpc_plan__today(self, connection, mode=None, restart=True):
+        if self.plan and mode is None:
+            return {'running': True, 'mode': list(self.running_mode), 'segments': self.plan_records()}
+        mode = check_params(lambda: schedule_engine.check_mode(tuple(mode or DEFAULT_MODE)))
+        plan, error = await self.build_today(mode, restart)
+        result = {'running': False, 'mode': list(mode), 'segments': [schedule_engine.segment_to_dict(segment) for segment in plan or []]}
+        if error: result['message'] = error
+        return result
+
+    async def rpc_timer__current(self, connection):
+        """與 GUI 的 update_timer 相同的狀態判斷；seconds_left 為到目前區段結束 (等待中時為到開始) 的秒數。"""
+        now = datetime.now()
+        state, index = self.locate(now) if self.plan else ('done', -1)
+        if state == 'done': return {'running': False, 'state': 'stopped'}
+        segment = self.plan[index]
+        boundary = segment.end if state == 'active' else segment.start
+        return {'running': True, 'state': state, 'index': index, 'mode': list(self.running_mode),
+                'segment': schedule_engine.segment_to_dict(segment), 'seconds_left': max(0, int((boundary - now).total_seconds()))}
+
+    async def rpc_timer__start(self, connection, mode=None, restart=False):
+        try:
+            return await self.cmd_start(connection, mode=mode or DEFAULT_MODE, restart=restart)
+        except (ValueError, TypeError) as e:
+            raise jsonrpc.RpcError(jsonrpc.INVALID_PARAMS, "Invalid params", str(e)) from None
+
+    async def rpc_timer__stop(self, connection):
+        return await self.cmd_stop(connection)
+
+    async def rpc_timer__subscribe(self, connection):
+        connection.topics.add('timer')
+        return True
+
+    async def rpc_timer__unsubscribe(self, connection):
+        connection.topics.discard('timer')
+        return True
+
+    async def rpc_schedule__subscribe(self, connection):
+        connection.topics.add('schedule')
+        return True
+
+    async def rpc_schedule__unsubscribe(self, connection):
+        connection.topics.discard('schedule')
+        return True
+
+    async def rpc_schedule__get(self, connection, date):
+        date_str = check_params(check_date, date)
+        days = await self.in_store(self.store.load_range, date_str, date_str)
+        return {'date': date_str, 'tasks': days.get(date_str, {}).get('tasks', [])}
+
+    async def rpc_schedule__range(self, connection, first, last):
+        return await self.in_store(self.store.load_range, check_params(check_date, first), check_params(check_date, last))
+
+    async def edit_day(self, connection, date, edit):
+        """以 edit(tasks) 修改某一天的任務列表並寫入；回傳修改後的任務。"""
+        date_str = check_params(check_date, date)
+        async with self.edit_lock:
+            language = await self.in_store(self.store.load_settings)
+            days = await self.in_store(self.store.load_range, date_str, date_str)
+            tasks = list(days.get(date_str, {}).get('tasks', []))
+            tasks = check_params(edit, tasks)
+            await self.save_days(language, {date_str: {'tasks': tasks} if tasks else None}, [date_str], connection.id, replan=True)
+        return tasks
+
+    async def rpc_schedule__set(self, connection, date, tasks):
+        if not isinstance(tasks, list): raise jsonrpc.RpcError(jsonrpc.INVALID_PARAMS, "Invalid params", "tasks 必須是陣列")
+        return await self.edit_day(connection, date, lambda _: [check_task(task) for task in tasks])
+
+    async def rpc_schedule__delete(self, connection, date):
+        await self.edit_day(connection, date, lambda _: [])
+        return True
+
+    async def rpc_schedule__add_task(self, connection, date, name, time):
+        return await self.edit_day(connection, date, lambda tasks: tasks + [check_task({'name': name, 'time': time})])
+
+    async def rpc_schedule__update_task(self, connection, date, index, name=None, time=None):
+        def edit(tasks):
+            task = tasks[check_index(tasks, index)]
+            tasks[index] = check_task({'name': task['name'] if name is None else name, 'time': task.get('time', '00:00') if time is None else time})
+            return tasks
+        return await self.edit_day(connection, date, edit)
+
+    async def rpc_schedule__delete_task(self, connection, date, index):
+        def edit(tasks):
+            del tasks[check_index(tasks, index)]
+            return tasks
+        return await self.edit_day(connection, date, edit)
+
+    async def close(self):
+        if self.timer_task is not None: self.timer_task.cancel()
+        # 關閉連線後等各連線的處理工作讀到結尾自行結束
+        connections = list(self.connections)
+        for connection in connections: connection.writer.close()
+        if connections: await asyncio.wait([connection.task for connection in connections], timeout=1.0)
+
+
+def check_params(func, *args):
+    """執行參數檢查，ValueError 轉為 JSON-RPC 的 Invalid params 錯誤。"""
+    try:
+        return func(*args)
+    except (ValueError, TypeError, KeyError) as e:
+        raise jsonrpc.RpcError(jsonrpc.INVALID_PARAMS, "Invalid params", str(e)) from None
+
+
+def check_date(date_str):
+    try:
+        if datetime.strptime(date_str, '%Y-%m-%d').date().isoformat() == date_str: return date_str
+    except (ValueError, TypeError):
+        pass
+    raise ValueError(f"無效的日期: {date_str!r} (格式為 yyyy-MM-dd)")
+
+
+def check_task(task):
+    if not isinstance(task, dict) or not isinstance(task.get('name'), str) or not task['name'].strip():
+        raise ValueError(f"任務必須有名稱: {task!r}")
+    if not isinstance(task.get('time'), str): raise ValueError(f"任務必須有時間 (HH:mm): {task!r}")
+    return {'name': task['name'], 'time': schedule_engine.format_time(schedule_engine.parse_time(task['time']))}
+
+
+def check_day(day):
+    """save 指令中的一天：null 或 {"tasks": [任務, ...]}；沒有任務時視為刪除。"""
+    if not day: return None
+    if not isinstance(day, dict) or not isinstance(day.get('tasks'), list): raise ValueError(f"每天的資料必須是 {{\"tasks\": [...]}}: {day!r}")
+    tasks = [check_task(task) for task in day['tasks']]
+    return {'tasks': tasks} if tasks else None
+
+
+def check_index(tasks, index):
+    if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < len(tasks):
+        raise ValueError(f"無效的任務索引: {index!r}")
+    return index
+
+
+async def serve_forever(daemon, address, rpc_address=None):
+    server = await daemon.serve(address)
+    rpc_server = await daemon.serve(rpc_address, RpcConnection) if rpc_address else None
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, daemon.closed.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows 的事件迴圈不支援，改由 KeyboardInterrupt 結束
+    print(f"FocusFlow 計時守護行程已啟動: {format_address(address)}", file=sys.stderr)
+    if rpc_server: print(f"JSON-RPC 端點: {format_address(rpc_address)}", file=sys.stderr)
+    async with server:
+        await daemon.closed.wait()
+        if rpc_server: rpc_server.close()
+        await daemon.close()
+
+
+# --- 用戶端 ---
+class DaemonError(OSError):
+    """守護行程回報的錯誤或連線問題；屬於 OSError，因此也包含在 storage.STORAGE_ERRORS 中。"""
+
+
+def open_socket(address, timeout):
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def is_running(address):
+    try:
+        open_socket(address, 1.0).close()
+    except OSError:
+        return False
+    return True
+
+
+class DaemonClient:
+    """
+    同步的用戶端。多個執行緒可共用同一個連線 (每次要求都持有 _lock)；
+    events() 會讓連線改為只接收事件，GUI 因此另外開一個連線收事件。
+    """
+    def __init__(self, address, timeout=5.0, token_file=None):
+        self.address = address
+        self.token_file = token_file  # TCP 連線時讀取權杖的檔案 (見 token_path)
+        self._sock = open_socket(address, timeout)
+        self._sock.settimeout(CALL_TIMEOUT_SECONDS)
+        self._reader = self._sock.makefile('rb')
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._events = deque()
+        if not isinstance(address, str) and token_file:
+            try:
+                self.call('auth', token=read_token(token_file))
+            except DaemonError:
+                self.close()
+                raise
+
+    def call(self, cmd, **args):
+        with self._lock:
+            request_id = next(self._ids)
+            try:
+                self._sock.sendall(json.dumps({'id': request_id, 'cmd': cmd, **args}, ensure_ascii=False).encode('utf-8') + b'\n')
+            except OSError as e:
+                raise DaemonError(f"無法連線到計時守護行程: {e}") from None
+            while True:
+                message = self._receive()
+                if 'event' in message:
+                    self._events.append(message)
+                elif message.get('id') == request_id:
+                    if not message.get('ok'): raise DaemonError(message.get('error') or "未知的錯誤")
+                    return message.get('result')
+
+    def _receive(self):
+        try:
+            line = self._reader.readline()
+        except OSError as e:
+            raise DaemonError(f"無法連線到計時守護行程: {e}") from None
+        if not line: raise DaemonError("計時守護行程已關閉連線")
+        return json.loads(line)
+
+    def events(self):
+        """訂閱後逐一產生事件，連線中斷或關閉時結束。"""
+        self.call('subscribe')
+        self._sock.settimeout(None)
+        while True:
+            while self._events: yield self._events.popleft()
+            try:
+                message = self._receive()
+            except (DaemonError, ValueError):
+                return
+            if 'event' in message: yield message
+
+    def close(self):
+        # 先 shutdown，讓其他執行緒中阻塞的 readline 立即返回
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._reader.close()
+        self._sock.close()
+
+
+class DaemonStore:
+    """透過守護行程讀寫資料的儲存後端，介面與 storage 模組中的後端相同。"""
+    def __init__(self, client):
+        self.client = client
+
+    def load(self):
+        return self.load_settings(), self.load_range('0001-01-01', '9999-12-31')
+
+    def load_settings(self):
+        return self.client.call('load_settings')
+
+    def load_range(self, first, last):
+        return self.client.call('load_range', first=first, last=last)
+
+    def search(self, text, limit=100):
+        return [tuple(item) for item in self.client.call('search', text=text, limit=limit)]
+
+    def stats(self, first, last):
+        return self.client.call('stats', first=first, last=last)
+
+    def save(self, language, schedule, dates=None):
+        # 守護行程不接受整份取代；dates 為 None 時只寫入 schedule 中的日期
+        dates = list(schedule if dates is None else dates)
+        self.client.call('save', language=language, days={date_str: schedule.get(date_str) for date_str in dates}, dates=dates)
+
+    def close(self):
+        self.client.close()
+
+
+def connect_or_spawn(address, command, timeout=5.0, token_file=None):
+    """連線到守護行程；沒有在執行時以 command 啟動一個 (與呼叫端分離，呼叫端結束後繼續執行)。"""
+    try:
+        return DaemonClient(address, token_file=token_file)
+    except OSError:
+        pass
+    if os.name == 'nt':
+        options = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        options = {'start_new_session': True}
+    subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True, **options)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return DaemonClient(address, token_file=token_file)
+        except OSError as e:
+            if time.monotonic() >= deadline: raise DaemonError(f"無法啟動計時守護行程: {e}") from None
+            time.sleep(0.05)
+
+
+# --- 命令列 ---
+def print_status(status, texts):
+    if not status['running']:
+        print(texts['timer_status_stopped'])
+        return
+    plan = [schedule_engine.segment_from_dict(record) for record in status['plan']]
+    timer = headless.TerminalTimer(plan, texts)
+    now = datetime.now()
+    if status['state'] == 'active':
+        segment = plan[status['index']]
+        minutes, seconds = divmod(max(0, int((segment.end - now).total_seconds())), 60)
+        label = texts['timer_status_work' if segment.type == 'work' else 'timer_status_break']
+        print(f"{label} {timer.segment_label(segment)}  {minutes:02d}:{seconds:02d}")
+    elif status['state'] == 'waiting':
+        print(f"{texts['timer_status_waiting']}  {texts['timer_task_next'].format(plan[0].name)}  {plan[0].start:%H:%M}")
+    else:
+        print(texts['timer_status_gap'])
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py --daemon", description="FocusFlow 計時守護行程")
+    parser.add_argument('--daemon', action='store_true')
+    parser.add_argument('action', nargs='?', default='serve', choices=['serve', 'status', 'start', 'stop', 'watch', 'shutdown'],
+                        help="serve: 執行守護行程 (預設)；其餘為連線到執行中的守護行程的指令")
+    parser.add_argument('--storage', choices=sorted(storage.STORAGE_BACKENDS), default=storage.DEFAULT_BACKEND)
+    parser.add_argument('--address', type=parse_address, help="Unix 通訊端路徑或 主機:連接埠 (預設依資料檔位置決定)")
+    parser.add_argument('--rpc', nargs='?', const='', type=lambda text: parse_address(text) if text else '',
+                        help="另外開啟 JSON-RPC 2.0 端點，可指定位址 (預設為資料檔旁的 .rpc.sock，Windows 為 127.0.0.1:47816)")
+    parser.add_argument('--mode', type=headless.parse_mode, default=DEFAULT_MODE, help="start 使用的 工作/休息 分鐘數")
+    parser.add_argument('--restart', action='store_true', help="start 時今天的任務都已過去則從頭開始")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+def run_client(args, address, token_file):
+    try:
+        client = DaemonClient(address, token_file=token_file)
+    except OSError as e:
+        print(f"無法連線到計時守護行程 ({format_address(address)}): {e}", file=sys.stderr)
+        return 1
+    try:
+        texts = TRANSLATIONS.get(client.call('load_settings'), TRANSLATIONS['zh_TW'])
+        if args.action == 'status':
+            print_status(client.call('status'), texts)
+        elif args.action == 'start':
+            client.call('start', mode=list(args.mode), restart=args.restart)
+            print_status(client.call('status'), texts)
+        elif args.action == 'stop':
+            client.call('stop')
+        elif args.action == 'shutdown':
+            client.call('shutdown')
+        else:
+            for event in client.events(): print(json.dumps(event, ensure_ascii=False), flush=True)
+    except DaemonError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        client.close()
+    return 0
+
+
+def main(argv, config_file):
+    args = parse_args(argv)
+    address = args.address or daemon_address(config_file)
+    if args.action != 'serve': return run_client(args, address, token_path(config_file))
+    if is_running(address):
+        print(f"計時守護行程已在執行: {format_address(address)}", file=sys.stderr)
+        return 1
+    rpc = None if args.rpc is None else args.rpc or rpc_address(config_file)
+    addresses = [a for a in (address, rpc) if a is not None]
+    files = [path for path in addresses if isinstance(path, str)]
+    # 上次沒有正常結束時留下的通訊端檔案
+    for path in files:
+        if os.path.exists(path): os.unlink(path)
+    # 有 TCP 位址時每次啟動產生新的權杖，用戶端從檔案讀取
+    token = None
+    if len(files) < len(addresses):
+        token = write_token(token_path(config_file))
+        files.append(token_path(config_file))
+    store = storage.open_store(args.storage, config_file)
+    try:
+        asyncio.run(serve_forever(FocusDaemon(store, token), address, rpc))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+        for path in files:
+            if os.path.exists(path): os.unlink(path)
+    return 0
@@ -0,0 +1,169 @@
+"""
+不使用 Qt 的終端機計時模式 (main.py --headless)，適合遠端主機或 tmux 窗格。
+讀取與 GUI 相同的排程資料，以 schedule_engine 產生今天的排程 (與 generate_pomodoro_schedule 相同的規則)，
+每進入一個新區段就在 stdout 輸出一行事件；stderr 為終端機時另外顯示每秒更新的倒數。
+此模組不可載入 PyQt6。
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+import schedule_engine
+import storage
+from translations import TRANSLATIONS
+
+# 沒有倒數顯示時每次最多等待的秒數，系統休眠或調整時鐘後最遲在此時間內重新對時
+MAX_SLEEP_SECONDS = 30.0
+# 喚醒時間多加一點餘裕，避免提早幾毫秒醒來而落在邊界之前
+WAKE_SLACK_SECONDS = 0.005
+
+
+def parse_mode(text):
+    work, _, rest = text.partition('/')
+    try:
+        return schedule_engine.check_mode((int(work), int(rest)))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"無效的番茄鐘模式: {text!r} (格式為 工作/休息，例如 25/10)") from None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py --headless", description="FocusFlow 終端機計時模式")
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--storage', choices=sorted(storage.STORAGE_BACKENDS), default=storage.DEFAULT_BACKEND)
+    parser.add_argument('--mode', type=parse_mode, default=(20, 5), help="工作/休息分鐘數，例如 25/10 (預設 20/5)")
+    parser.add_argument('--restart', action='store_true', help="今天的任務時間都已過去時，從第一個任務重新開始")
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help="stdout 事件的格式")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+class TerminalTimer:
+    """依排程在終端機倒數；區段轉換以事件輸出到 out，倒數畫面輸出到 status (僅限終端機)。"""
+
+    def __init__(self, schedule, texts, output_format='text', out=sys.stdout, status=sys.stderr):
+        self.schedule = schedule
+        self.starts = [segment.start for segment in schedule]
+        self.texts = texts
+        self.output_format = output_format
+        self.out = out
+        self.status = status if status.isatty() else None
+
+    def get_text(self, key):
+        return self.texts.get(key, key)
+
+    def segment_label(self, segment):
+        if segment.type == 'work': return segment.name
+        if segment.next_name is not None: return self.get_text('preview_break_next').format(segment.next_name)
+        return self.get_text('preview_break_final')
+
+    def emit(self, event, text, **fields):
+        if self.status: self.status.write("\r\033[K")
+        if self.output_format == 'json':
+            line = json.dumps({'event': event, 'time': datetime.now().isoformat(timespec='seconds'), **fields}, ensure_ascii=False)
+        else:
+            line = f"[{datetime.now():%H:%M:%S}] {text}"
+        self.out.write(line + "\n")
+        self.out.flush()
+
+    def describe(self, index):
+        segment = self.schedule[index]
+        return {'index': index, 'type': segment.type, 'name': segment.name, 'label': self.segment_label(segment),
+                'start': segment.start.isoformat(timespec='seconds'), 'end': segment.end.isoformat(timespec='seconds')}
+
+    def emit_plan(self):
+        lines = []
+        for segment in self.schedule:
+            time_range = f"{segment.start:%H:%M} - {segment.end:%H:%M}"
+            label = self.get_text('preview_focus').format(segment.name) if segment.type == 'work' else self.get_text('preview_break')
+            lines.append(f"  {time_range}: {label}")
+        self.emit('plan', self.get_text('preview_title') + "\n" + "\n".join(lines),
+                  segments=[self.describe(i) for i in range(len(self.schedule))])
+
+    def run(self):
+        self.emit_plan()
+        current_index, waiting_reported = -1, False
+        while True:
+            now = datetime.now()
+            state, index = schedule_engine.locate(self.schedule, self.starts, now)
+            if state == 'done':
+                self.emit('done', f"{self.get_text('notification_done')}: {self.get_text('notification_done_msg')}")
+                return
+            if state == 'waiting' and not waiting_reported:
+                waiting_reported = True
+                first = self.schedule[0]
+                self.emit('waiting', f"{self.get_text('timer_status_waiting')}: {self.get_text('timer_task_next').format(first.name)} ({first.start:%H:%M})",
+                          **self.describe(0))
+            # 只往前推進：時鐘倒退時不重複輸出，一次跨過多個區段時只輸出目前所在的區段
+            if state == 'active' and index > current_index:
+                current_index = index
+                segment = self.schedule[index]
+                title = self.get_text('notification_title_work' if segment.type == 'work' else 'notification_title_break')
+                self.emit('segment', f"{title}: {self.segment_label(segment)} ({segment.start:%H:%M} - {segment.end:%H:%M})",
+                          **self.describe(index))
+            segment = self.schedule[index]
+            boundary = segment.end if state == 'active' else segment.start
+            wait = min((boundary - now).total_seconds(), MAX_SLEEP_SECONDS)
+            if self.status:
+                self.draw_countdown(state, segment, now)
+                # 在剩餘秒數下一次變動時更新倒數
+                wait = min(wait, (boundary - now).total_seconds() % 1 or 1.0)
+            time.sleep(max(0.0, wait) + WAKE_SLACK_SECONDS)
+
+    def draw_countdown(self, state, segment, now):
+        if state == 'active':
+            minutes, seconds = divmod(max(0, int((segment.end - now).total_seconds())), 60)
+            status = self.get_text('timer_status_work' if segment.type == 'work' else 'timer_status_break')
+            line = f"{status} {self.segment_label(segment)}  {minutes:02d}:{seconds:02d}"
+        elif state == 'waiting':
+            line = f"{self.get_text('timer_status_waiting')}  {self.get_text('timer_task_next').format(segment.name)}  {segment.start:%H:%M}"
+        else:
+            line = self.get_text('timer_status_gap')
+        self.status.write("\r\033[K" + line)
+        self.status.flush()
+
+
+def build_today(tasks, mode, now, restart):
+    """與 PomodoroApp.generate_pomodoro_schedule 相同的規則；無法產生時回傳 (None, 翻譯鍵)。"""
+    entries = schedule_engine.sort_tasks(tasks)
+    if not entries: return None, 'preview_no_tasks'
+    start_index = schedule_engine.find_start_index(entries, now)
+    if start_index == -1:
+        if not restart: return None, 'all_tasks_past_info'
+        start_index = 0
+    schedule = schedule_engine.build_schedule(entries, mode, now, start_index)
+    if schedule_engine.find_overlap(schedule) != -1: return None, 'validation_error_msg'
+    return schedule, None
+
+
+def main(argv, config_file):
+    args = parse_args(argv)
+    texts = TRANSLATIONS['zh_TW']
+    store = storage.open_store(args.storage, config_file)
+    try:
+        texts = TRANSLATIONS.get(store.load_settings(), texts)
+        today_str = datetime.now().date().isoformat()
+        tasks = store.load_range(today_str, today_str).get(today_str, {}).get('tasks', [])
+    except storage.STORAGE_ERRORS as e:
+        print(f"{texts['load_error']}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+    try:
+        schedule, error_key = build_today(tasks, args.mode, datetime.now(), args.restart)
+    except ValueError as e:
+        # 資料中的任務時間格式錯誤
+        print(f"{texts['load_error']}: {e}", file=sys.stderr)
+        return 1
+    if schedule is None:
+        print(texts[error_key], file=sys.stderr)
+        return 1
+    timer = TerminalTimer(schedule, texts, args.format)
+    try:
+        timer.run()
+    except KeyboardInterrupt:
+        timer.emit('stopped', texts['timer_status_stopped'])
+        return 130
+    return 0
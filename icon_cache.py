@@ -0,0 +1,136 @@
+"""
+程式內共用的圖示快取：托盤、視窗與提示視窗的圖示只以 QPainter 繪製一次。
+以 (種類, 邏輯尺寸, 裝置像素比) 為鍵保存在記憶體中；
+set_disk_cache() 設定資料夾後，繪製結果也會存成 PNG，下次啟動直接讀取。
+"""
+import os
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QIcon, QPixmap, QPainter, QColor, QBrush, QPen, QPainterPath, QFont, QGuiApplication
+
+# 繪製方式改變時遞增，讓舊的磁碟快取失效
+CACHE_VERSION = 1
+# 托盤與視窗圖示提供的尺寸，由系統挑選最接近的一個
+APP_ICON_SIZES = (16, 24, 32, 48, 64)
+
+_pixmaps = {}
+_disk_dir = None
+
+
+def set_disk_cache(directory):
+    """設定磁碟快取的資料夾；None 表示只使用記憶體快取。"""
+    global _disk_dir
+    _disk_dir = directory
+
+
+def clear():
+    _pixmaps.clear()
+
+
+# --- 繪製函式：以 base 尺寸的座標繪製，實際尺寸由 render() 縮放 ---
+def _paint_app(painter):
+    painter.setBrush(QBrush(QColor("#d9534f")))
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.drawEllipse(5, 15, 54, 44)
+    painter.setBrush(QBrush(QColor("#5cb85c")))
+    path = QPainterPath()
+    path.moveTo(32, 0); path.quadTo(20, 10, 32, 20); path.quadTo(44, 10, 32, 0)
+    painter.drawPath(path)
+
+
+def _paint_work(painter):
+    painter.setPen(QPen(QColor("#50fa7b"), 3))
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    path = QPainterPath()
+    path.moveTo(10, 38); path.quadTo(24, 42, 38, 38); path.lineTo(38, 10)
+    path.quadTo(24, 14, 10, 10); path.lineTo(10, 38)
+    painter.drawPath(path)
+    painter.drawLine(24, 12, 24, 39)
+
+
+def _paint_break(painter):
+    painter.setPen(QPen(QColor("#8be9fd"), 3))
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    painter.drawRect(8, 12, 28, 24)
+    painter.drawArc(36, 18, 8, 12, -90 * 16, 180 * 16)
+    painter.drawLine(14, 8, 16, 12); painter.drawLine(22, 8, 24, 12); painter.drawLine(30, 8, 32, 12)
+
+
+def _paint_done(painter):
+    painter.setPen(QPen(QColor("#50fa7b"), 4, cap=Qt.PenCapStyle.RoundCap, join=Qt.PenJoinStyle.RoundJoin))
+    painter.drawLine(10, 24, 22, 36); painter.drawLine(22, 36, 38, 12)
+
+
+def _paint_info(painter):
+    painter.setPen(QPen(QColor("#f1fa8c"), 3))
+    painter.drawEllipse(8, 8, 32, 32)
+    painter.setFont(QFont("Arial", 18, QFont.Weight.Bold))
+    painter.drawText(QRectF(8, 8, 32, 32), Qt.AlignmentFlag.AlignCenter, "i")
+
+
+# 種類 -> (繪製函式, 繪製時使用的邊長)
+PAINTERS = {
+    'app': (_paint_app, 64),
+    'work': (_paint_work, 48),
+    'break': (_paint_break, 48),
+    'done': (_paint_done, 48),
+    'info': (_paint_info, 48),
+}
+
+
+def render(kind, size, dpr):
+    paint, base = PAINTERS[kind]
+    pixmap = QPixmap(round(size * dpr), round(size * dpr))
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.scale(size / base, size / base)
+    paint(painter)
+    painter.end()
+    return pixmap
+
+
+def _disk_path(kind, size, dpr):
+    return os.path.join(_disk_dir, f"{kind}-{size}@{dpr:g}x-v{CACHE_VERSION}.png")
+
+
+def _load_from_disk(kind, size, dpr):
+    path = _disk_path(kind, size, dpr)
+    if not os.path.exists(path): return None
+    pixmap = QPixmap(path)
+    # 檔案損毀或尺寸不符時重新繪製
+    if pixmap.isNull() or pixmap.width() != round(size * dpr): return None
+    pixmap.setDevicePixelRatio(dpr)
+    return pixmap
+
+
+def _save_to_disk(pixmap, kind, size, dpr):
+    path = _disk_path(kind, size, dpr)
+    temp_path = path + '.tmp'
+    try:
+        os.makedirs(_disk_dir, exist_ok=True)
+        if pixmap.save(temp_path, 'PNG'): os.replace(temp_path, path)
+    except OSError as e:
+        print(f"無法寫入圖示快取: {e}")
+
+
+def pixmap(kind, size, dpr=None):
+    """回傳快取中的圖示；不認得的種類以 'info' 代替。dpr 預設為主螢幕的裝置像素比。"""
+    if kind not in PAINTERS: kind = 'info'
+    if dpr is None: dpr = QGuiApplication.primaryScreen().devicePixelRatio()
+    key = (kind, size, dpr)
+    cached = _pixmaps.get(key)
+    if cached is not None: return cached
+    cached = _load_from_disk(kind, size, dpr) if _disk_dir else None
+    if cached is None:
+        cached = render(kind, size, dpr)
+        if _disk_dir: _save_to_disk(cached, kind, size, dpr)
+    _pixmaps[key] = cached
+    return cached
+
+
+def icon(kind, sizes=APP_ICON_SIZES, dpr=None):
+    result = QIcon()
+    for size in sizes: result.addPixmap(pixmap(kind, size, dpr))
+    return result
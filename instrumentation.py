@@ -0,0 +1,147 @@
+"""
+效能量測工具 (不依賴 PyQt6)。
+StartupProfiler 記錄一次性的啟動階段；Metrics 在執行期間持續累積各熱門路徑的延遲分布與計數。
+"""
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    記錄啟動過程中各階段的耗時；所有時間都以 origin (預設為建立的時間點) 起算。
+    phase() 量測一段程式碼，mark() 記錄單一時間點 (例如第一次繪製完成)。
+    """
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.entries = []  # [(名稱, 開始秒數, 耗時秒數或 None)]
+
+    def record(self, name, start, end=None):
+        end = time.perf_counter() if end is None else end
+        self.entries.append((name, start - self.origin, end - start))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def mark(self, name):
+        self.entries.append((name, time.perf_counter() - self.origin, None))
+
+    def elapsed(self, name):
+        """回傳名稱為 name 的項目結束時距離 origin 的秒數，找不到時回傳 None。"""
+        for entry_name, start, seconds in self.entries:
+            if entry_name == name: return start + (seconds or 0.0)
+        return None
+
+    def report(self):
+        lines = [f"{'phase':<28}{'start ms':>10}{'ms':>9}"]
+        for name, start, seconds in sorted(self.entries, key=lambda entry: entry[1]):
+            duration = '' if seconds is None else f"{seconds * 1000:.1f}"
+            lines.append(f"{name:<28}{start * 1000:>10.1f}{duration:>9}")
+        return "\n".join(lines)
+
+
+# --- 執行期間的延遲直方圖與計數器 ---
+class Histogram:
+    """固定分界 (毫秒) 的延遲分布；另外保留最近的樣本以計算百分位數。"""
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+    RECENT_SAMPLES = 512
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.recent = deque(maxlen=self.RECENT_SAMPLES)
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.recent.append(ms)
+
+    def percentile(self, p):
+        if not self.recent: return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def to_dict(self):
+        labels = [f"<={bound}" for bound in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}"]
+        return {'count': self.count, 'mean_ms': self.total_ms / self.count if self.count else 0.0,
+                'p50_ms': self.percentile(50), 'p95_ms': self.percentile(95), 'max_ms': self.max_ms,
+                'buckets_ms': dict(zip(labels, self.buckets))}
+
+
+class Metrics:
+    """
+    以名稱區分的延遲直方圖與計數器。背景存檔執行緒也會記錄，所有存取都持有 _lock。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None: histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds * 1000)
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.histograms.clear(); self.counters.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'uptime_s': round(time.time() - self.started, 1),
+                    'counters': dict(sorted(self.counters.items())),
+                    'histograms': {name: h.to_dict() for name, h in sorted(self.histograms.items())}}
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def report(self):
+        snapshot = self.snapshot()
+        lines = [f"uptime {snapshot['uptime_s']} s", "", f"{'histogram':<24}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}  (ms)"]
+        for name, h in snapshot['histograms'].items():
+            lines.append(f"{name:<24}{h['count']:>7}{h['mean_ms']:>9.2f}{h['p50_ms']:>9.2f}{h['p95_ms']:>9.2f}{h['max_ms']:>9.2f}")
+        # 每分鐘的次數方便比較長時間執行時的頻率 (例如樣式重新計算)
+        minutes = max(snapshot['uptime_s'], 1.0) / 60
+        lines += ["", f"{'counter':<24}{'value':>7}{'per min':>9}"]
+        lines += [f"{name:<24}{value:>7}{value / minutes:>9.1f}" for name, value in snapshot['counters'].items()]
+        return "\n".join(lines)
+
+
+def timed(name):
+    """方法裝飾器：把每次呼叫的耗時記錄到 self.metrics 中名為 name 的直方圖。"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timed(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,86 @@
+"""
+JSON-RPC 2.0 的要求分派 (不依賴 PyQt6)，供 focus_daemon 的 RPC 端點使用。
+支援以名稱或位置傳遞參數、批次要求 (陣列) 與通知 (沒有 id 的要求不回應)。
+方法為 async 函式，第一個參數固定是發出要求的連線。
+"""
+import inspect
+import json
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# 伺服器自訂的錯誤碼 (-32000 到 -32099)
+UNAUTHORIZED = -32001
+
+
+class RpcError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self):
+        error = {'code': self.code, 'message': self.message}
+        if self.data is not None: error['data'] = self.data
+        return error
+
+
+def notification(method, params):
+    return {'jsonrpc': '2.0', 'method': method, 'params': params}
+
+
+def error_response(request_id, error):
+    return {'jsonrpc': '2.0', 'error': error.to_dict(), 'id': request_id}
+
+
+def parse(line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise RpcError(PARSE_ERROR, "Parse error", str(e)) from None
+
+
+class Dispatcher:
+    def __init__(self):
+        self.methods = {}
+
+    def register(self, name, func):
+        self.methods[name] = (func, inspect.signature(func))
+
+    async def handle(self, payload, connection):
+        """處理一行已解析 (見 parse) 的要求，回傳回應物件、回應陣列 (批次) 或 None (全部都是通知時)。"""
+        if isinstance(payload, list):
+            if not payload: return error_response(None, RpcError(INVALID_REQUEST, "Invalid Request"))
+            # 批次中的要求依序執行，前一個要求的修改對後一個要求可見
+            responses = [await self.call(request, connection) for request in payload]
+            return [response for response in responses if response is not None] or None
+        return await self.call(payload, connection)
+
+    async def call(self, request, connection):
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str) \
+                or not isinstance(request.get('id', 0), (str, int, type(None))):
+            request_id = request.get('id') if isinstance(request, dict) else None
+            return error_response(request_id if isinstance(request_id, (str, int)) else None, RpcError(INVALID_REQUEST, "Invalid Request"))
+        is_notification = 'id' not in request
+        request_id = request.get('id')
+        try:
+            entry = self.methods.get(request['method'])
+            if entry is None: raise RpcError(METHOD_NOT_FOUND, "Method not found", request['method'])
+            func, signature = entry
+            params = request.get('params', [])
+            if isinstance(params, dict): args, kwargs = [], params
+            elif isinstance(params, list): args, kwargs = params, {}
+            else: raise RpcError(INVALID_PARAMS, "Invalid params", "params 必須是物件或陣列")
+            try:
+                signature.bind(connection, *args, **kwargs)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, "Invalid params", str(e)) from None
+            result = await func(connection, *args, **kwargs)
+        except RpcError as e:
+            return None if is_notification else error_response(request_id, e)
+        except Exception as e:  # 方法本身的錯誤不應讓連線中斷
+            return None if is_notification else error_response(request_id, RpcError(INTERNAL_ERROR, "Internal error", str(e)))
+        return None if is_notification else {'jsonrpc': '2.0', 'result': result, 'id': request_id}
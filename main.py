@@ -1,34 +1,68 @@
+import time
+# 啟動時間量測 (--profile-startup) 的起點，必須在載入 PyQt6 之前
+STARTUP_ORIGIN = time.perf_counter()
 import sys
-import json
 import os
-from datetime import datetime, timedelta
+import argparse
+from datetime import datetime
+
+# --- 應用程式設定 ---
+if getattr(sys, 'frozen', False):
+    APP_DIR = os.path.dirname(sys.executable)
+else:
+    APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CONFIG_FILE = os.path.join(APP_DIR, "pomodoro_schedule.json")
+# 結束程式時等待背景存檔完成的最長秒數
+SHUTDOWN_FLUSH_SECONDS = 5.0
+# 開啟效能數據除錯面板的快捷鍵
+METRICS_PANEL_SHORTCUT = "Ctrl+Shift+D"
+# 視窗隱藏到系統匣時，托盤提示的剩餘時間以分鐘為單位更新；多等一點避免在分鐘數改變前醒來
+TRAY_TOOLTIP_SLACK_MS = 50
+# 繪製好的圖示存放在使用者快取資料夾 (QStandardPaths.CacheLocation) 下的這個子資料夾，刪除後會自動重新產生；
+# 不寫入程式所在的資料夾，安裝後該處可能是唯讀的
+ICON_CACHE_DIR_NAME = "icon_cache"
+# 延後的初始化通常在第一次繪製後執行；視窗一直沒有繪製時 (例如啟動即最小化) 最晚在此時間後執行
+DEFERRED_STARTUP_FALLBACK_MS = 1000
+
+# --headless 不需要任何 Qt 元件，在載入 PyQt6 之前就交給 headless.py 處理
+if __name__ == '__main__' and '--headless' in sys.argv[1:]:
+    import headless
+    sys.exit(headless.main(sys.argv[1:], CONFIG_FILE))
+# --daemon 同樣不需要 Qt：執行計時守護行程，或以 status/start/stop/watch/shutdown 操作它 (見 focus_daemon.py)
+if __name__ == '__main__' and '--daemon' in sys.argv[1:]:
+    import focus_daemon
+    sys.exit(focus_daemon.main(sys.argv[1:], CONFIG_FILE))
+
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, 
-                             QSystemTrayIcon, QMenu, QScrollArea, QFrame, QHBoxLayout, 
-                             QComboBox, QMessageBox, QDialog, QDialogButtonBox, QSpinBox)
-from PyQt6.QtCore import (Qt, QTimer, QDate, QPoint, QRectF, QTime)
-from PyQt6.QtGui import QIcon, QAction, QColor, QFont, QPixmap, QPainter, QBrush, QPainterPath, QPen
+                             QSystemTrayIcon, QMenu, QFrame, QHBoxLayout, 
+                             QComboBox, QMessageBox, QDialog, QDialogButtonBox, QSpinBox,
+                             QTreeView, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import (Qt, QObject, QTimer, QDate, QPoint, QRectF, QEvent, QStandardPaths)
+from PyQt6.QtGui import QIcon, QAction, QColor, QFont, QPixmap, QPainter, QBrush, QPainterPath, QPen, QShortcut, QKeySequence
 
 # --- 假設這些檔案存在於同一個資料夾 ---
 # translations.py 和 ui_components.py 的內容需要您保留原樣
 try:
     from translations import TRANSLATIONS
-    from ui_components import (NotificationWidget, DatePickerButton, DayScheduleWidget)
+    from ui_components import (NotificationCenter, DatePickerButton, WeekPlannerModel, WeekPlannerDelegate, MetricsPanel, StyleChangeCounter,
+                               SchedulePreviewModel, create_schedule_preview_view)
 except ImportError:
     # 如果檔案不存在，提供一個基本的備用方案
     TRANSLATIONS = {'zh_TW': {'window_title': 'FocusFlow'}}
-    class NotificationWidget(QWidget): pass
+    class NotificationCenter(QObject): pass
     class DatePickerButton(QPushButton): pass
-    class DayScheduleWidget(QWidget): pass
     print("警告：缺少 translations.py 或 ui_components.py 檔案。")
 # ------------------------------------
-
-# --- 應用程式設定 ---
-if getattr(sys, 'frozen', False):
-    APP_DIR = os.path.dirname(sys.executable)
-else:
-    APP_DIR = os.path.dirname(os.path.abspath(__file__))
-
-CONFIG_FILE = os.path.join(APP_DIR, "pomodoro_schedule.json")
+import focus_daemon
+import icon_cache
+import instrumentation
+import schedule_engine
+import storage
+from daemon_link import DaemonListener
+from save_worker import BackgroundWriter
+from timer_engine import TimerEngine
+IMPORTS_DONE = time.perf_counter()
 
 # --- 自訂樣式表 (Stylesheet) ---
 STYLESHEET = """
@@ -61,12 +95,13 @@ QLabel#StatusLabel {
     font-weight: bold;
     color: #50fa7b;
 }
+QLabel#StatusLabel[state="break"] { color: #8be9fd; }
 QLabel#TimerLabel {
     font-size: 48px;
     font-weight: bold;
     color: #FFFFFF;
 }
-QLineEdit, QComboBox, QSpinBox {
+QLineEdit, QComboBox, QSpinBox, QTimeEdit {
     background-color: #282a36;
     border: 1px solid #6272a4;
     border-radius: 5px;
@@ -99,6 +134,15 @@ QPushButton#AddButton, QPushButton#RemoveButton {
     font-size: 18px;
 }
 QScrollArea { border: none; background-color: transparent; }
+QTreeView#WeekView {
+    border: none;
+    background-color: transparent;
+    color: #E0E0E0;
+    font-size: 14px;
+    font-family: 'Segoe UI', 'Microsoft JhengHei';
+}
+QTreeView#WeekView::item { padding: 4px 2px; }
+QTreeView#WeekView::item:selected { background-color: #44475a; }
 QScrollBar:vertical {
     border: none; background: #282a36; width: 8px; margin: 0px;
 }
@@ -147,31 +191,93 @@ class CustomTimeDialog(QDialog):
 
 # --- 主視窗 ---
 class PomodoroApp(QWidget):
-    def __init__(self):
+    def __init__(self, storage_mode=storage.DEFAULT_BACKEND, profiler=None, daemon=None):
         super().__init__()
-        self.schedule_data = {}
+        # 傳入 profiler 時 (--profile-startup) 在啟動完成後印出各階段耗時
+        self.profiler = profiler or instrumentation.StartupProfiler()
+        self.report_startup = profiler is not None
+        self.startup_done = False
+        self.first_paint_done = False
+        # 視窗外框預先繪製成的點陣圖，以 (尺寸, 裝置像素比, 是否執行中) 為鍵
+        self.background_cache = None
+        self.background_key = None
+        # 熱門路徑的延遲與計數，以 METRICS_PANEL_SHORTCUT 開啟的面板檢視
+        self.metrics = instrumentation.Metrics()
+        self.metrics_panel = None
+        # 計時畫面各標籤的樣式重新計算次數 (style.changes)，在除錯面板中以每分鐘次數檢視
+        self.style_counter = StyleChangeCounter(self.metrics, parent=self)
+        with self.profiler.phase('open storage'):
+            # 連上計時守護行程 (--attach) 時，資料的讀寫與執行中的番茄鐘都交給守護行程
+            self.daemon = daemon
+            self.daemon_listener = None
+            self.daemon_status = None
+            if daemon is not None: self.attach_daemon()
+            self.store = focus_daemon.DaemonStore(self.daemon) if self.daemon is not None else storage.open_store(storage_mode, CONFIG_FILE)
+            self.writer = BackgroundWriter(self.store, self, metrics=self.metrics)
+            self.quitting = False  # quit_app 會自行顯示最後一次存檔的錯誤
+            self.writer.save_failed.connect(self.on_save_failed)
+            self.writer.saved.connect(self.on_saved)
+            self.schedule_data = storage.WindowedSchedule(self.store)
         self.pomodoro_schedule = []
-        self.day_widgets = {}
+        self.running_mode = None
         self.current_task_index = -1
         self.is_running = False
         self.old_pos = None
-        self.data_dirty = False
+        self.dirty_dates = set()
+        self.settings_dirty = False
         self.current_lang = 'zh_TW'
         self.custom_mode_data = None
         self.last_mode_index = 0
-
-        self.init_ui()
-        self.load_data()
-        self.populate_week_view(QDate.currentDate())
-        self.retranslate_ui()
-
-        self.main_timer = QTimer(self)
-        self.main_timer.timeout.connect(self.update_timer)
-        self.main_timer.start(1000)
+        # 重複預覽或切換模式時重用已產生的排程與預覽文字
+        self.plan_cache = schedule_engine.PlanCache()
+        # 以下物件在第一次繪製後才建立 (見 finish_startup)，使用前須檢查是否為 None
+        self.app_icon = None
+        self.tray_icon = None
+        self.timer_view = None
+        # 所有提示共用一個視窗，連續的區段轉換會合併成一則
+        self.notifications = NotificationCenter(self, metrics=self.metrics)
+
+        with self.profiler.phase('window shell'): self.init_ui()
+        with self.profiler.phase('load settings'): self.load_data()
+        with self.profiler.phase('current week'): self.populate_week_view(QDate.currentDate())
+        with self.profiler.phase('retranslate'): self.retranslate_ui()
+
+        # 計時引擎只在區段邊界喚醒；每秒的畫面更新僅在計時畫面可見時進行
+        self.timer_engine = TimerEngine(self, metrics=self.metrics)
+        self.timer_engine.segment_changed.connect(self.on_segment_changed)
+        self.timer_engine.finished.connect(self.on_schedule_finished)
+        self.display_timer = QTimer(self)
+        self.display_timer.setSingleShot(True)
+        self.display_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.display_timer.timeout.connect(self.update_timer)
+        # 省電模式：視窗看不見時不更新計時畫面，只在剩餘分鐘數改變時更新托盤提示
+        self.tray_timer = QTimer(self)
+        self.tray_timer.setSingleShot(True)
+        self.tray_timer.timeout.connect(self.update_tray_status)
 
         self.autosave_timer = QTimer(self)
         self.autosave_timer.timeout.connect(self.autosave_data)
         self.autosave_timer.start(3000)
+        if self.daemon_status and self.daemon_status['running']:
+            with self.profiler.phase('adopt daemon session'): self.adopt_session(self.daemon_status['plan'], self.daemon_status['mode'])
+        QTimer.singleShot(DEFERRED_STARTUP_FALLBACK_MS, self.finish_startup)
+        self.profiler.mark('window constructed')
+
+    def finish_startup(self):
+        """
+        第一次繪製之後才建立的部分：程式圖示、系統匣、計時畫面，以及預先載入前後兩週。
+        可重複呼叫；需要這些物件的操作 (例如最小化到系統匣) 會先呼叫此函數。
+        """
+        if self.startup_done: return
+        self.startup_done = True
+        with self.profiler.phase('app icon'):
+            self.app_icon = self.get_app_icon()
+            self.setWindowIcon(self.app_icon)
+        with self.profiler.phase('tray icon'): self.setup_tray_icon()
+        with self.profiler.phase('timer view'): self.ensure_timer_view()
+        with self.profiler.phase('prefetch weeks'): self.prefetch_adjacent_weeks()
+        self.profiler.mark('startup finished')
+        if self.report_startup: print(self.profiler.report())
 
     def get_text(self, key):
         return TRANSLATIONS.get(self.current_lang, {}).get(key, key)
@@ -182,9 +288,6 @@ class PomodoroApp(QWidget):
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setStyleSheet(STYLESHEET)
         self.resize(450, 700)
-        self.app_icon = self.get_app_icon()
-        self.setWindowIcon(self.app_icon)
-        self.setup_tray_icon()
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.setup_title_bar()
@@ -192,31 +295,32 @@ class PomodoroApp(QWidget):
         self.content_layout = QVBoxLayout(self.content_widget)
         self.content_layout.setContentsMargins(15, 0, 15, 15)
         self.setup_view = QWidget()
-        self.timer_view = QWidget()
         self.setup_ui(self.setup_view)
-        self.timer_ui(self.timer_view)
         self.content_layout.addWidget(self.setup_view)
-        self.content_layout.addWidget(self.timer_view)
         self.main_layout.addWidget(self.title_bar)
         self.main_layout.addWidget(self.content_widget)
+        self.metrics_shortcut = QShortcut(QKeySequence(METRICS_PANEL_SHORTCUT), self)
+        self.metrics_shortcut.activated.connect(self.show_metrics_panel)
+
+    def show_metrics_panel(self):
+        if self.metrics_panel is None: self.metrics_panel = MetricsPanel(self.metrics, APP_DIR, self)
+        self.metrics_panel.show()
+        self.metrics_panel.raise_()
+
+    def ensure_timer_view(self):
+        if self.timer_view is not None: return
+        self.metrics.count('widgets.created')
+        self.timer_view = QWidget()
+        self.timer_ui(self.timer_view)
         self.timer_view.hide()
+        self.content_layout.addWidget(self.timer_view)
+        self.stop_button.setText(self.get_text('preview_cancel_button'))
+        self.edit_button.setText(self.get_text('timer_edit_button'))
 
     def get_app_icon(self):
         icon_path = 'icon.png'
         if os.path.exists(os.path.join(APP_DIR, icon_path)): return QIcon(os.path.join(APP_DIR, icon_path))
-        pixmap = QPixmap(64, 64)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setBrush(QBrush(QColor("#d9534f")))
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawEllipse(5, 15, 54, 44)
-        painter.setBrush(QBrush(QColor("#5cb85c")))
-        path = QPainterPath()
-        path.moveTo(32, 0); path.quadTo(20, 10, 32, 20); path.quadTo(44, 10, 32, 0)
-        painter.drawPath(path)
-        painter.end()
-        return QIcon(pixmap)
+        return icon_cache.icon('app')
 
     def setup_tray_icon(self):
         self.tray_icon = QSystemTrayIcon(self)
@@ -229,6 +333,7 @@ class PomodoroApp(QWidget):
         self.tray_menu.addAction(self.show_action); self.tray_menu.addAction(self.quit_action)
         self.tray_icon.setContextMenu(self.tray_menu)
         self.tray_icon.activated.connect(self.on_tray_icon_activated)
+        self.retranslate_tray()
         self.tray_icon.show()
 
     def setup_title_bar(self):
@@ -277,12 +382,25 @@ class PomodoroApp(QWidget):
         top_layout.addWidget(self.lang_combo)
         layout.addWidget(top_panel)
 
-        scroll_area = QScrollArea(); scroll_area.setWidgetResizable(True)
-        self.week_view_widget = QWidget()
-        self.week_view_layout = QVBoxLayout(self.week_view_widget)
-        self.week_view_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        scroll_area.setWidget(self.week_view_widget)
-        layout.addWidget(scroll_area)
+        # 週計畫使用 model/view：只繪製可見的列，編輯器只在編輯時建立
+        self.week_model = WeekPlannerModel(self)
+        self.week_model.day_edited.connect(self.schedule_changed)
+        self.week_view = QTreeView(); self.week_view.setObjectName("WeekView")
+        self.week_view.setModel(self.week_model)
+        self.week_view.setItemDelegate(WeekPlannerDelegate(self))
+        self.week_view.setHeaderHidden(True)
+        self.week_view.setRootIsDecorated(False)
+        self.week_view.setItemsExpandable(False)
+        self.week_view.setUniformRowHeights(True)
+        self.week_view.setEditTriggers(QAbstractItemView.EditTrigger.AllEditTriggers)
+        header = self.week_view.header()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(WeekPlannerModel.COLUMN_NAME, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(WeekPlannerModel.COLUMN_TIME, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(WeekPlannerModel.COLUMN_ACTION, QHeaderView.ResizeMode.Fixed)
+        header.resizeSection(WeekPlannerModel.COLUMN_TIME, 80)
+        header.resizeSection(WeekPlannerModel.COLUMN_ACTION, 36)
+        layout.addWidget(self.week_view)
         
         self.start_button = QPushButton()
         self.start_button.clicked.connect(self.preview_and_start_pomodoro)
@@ -295,11 +413,15 @@ class PomodoroApp(QWidget):
         self.task_label = QLabel(); self.task_label.setAlignment(Qt.AlignmentFlag.AlignCenter); self.task_label.setWordWrap(True); self.task_label.setFont(QFont('Segoe UI', 18))
         self.timer_label = QLabel("00:00"); self.timer_label.setObjectName("TimerLabel"); self.timer_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.stop_button = QPushButton(); self.stop_button.clicked.connect(self.stop_pomodoro)
-        layout.addStretch(); layout.addWidget(self.status_label); layout.addWidget(self.task_label); layout.addWidget(self.timer_label); layout.addStretch(); layout.addWidget(self.stop_button)
+        self.edit_button = QPushButton(); self.edit_button.clicked.connect(self.edit_running_session)
+        layout.addStretch(); layout.addWidget(self.status_label); layout.addWidget(self.task_label); layout.addWidget(self.timer_label); layout.addStretch()
+        layout.addWidget(self.edit_button); layout.addWidget(self.stop_button)
+        self.status_state = None
+        self.style_counter.watch(self.status_label, self.task_label, self.timer_label)
 
     def language_changed(self):
         self.current_lang = self.lang_combo.currentData()
-        self.data_dirty = True
+        self.settings_dirty = True
         self.retranslate_ui()
 
     def retranslate_ui(self):
@@ -319,12 +441,43 @@ class PomodoroApp(QWidget):
         self.pomodoro_mode_combo.setCurrentIndex(self.last_mode_index)
         self.pomodoro_mode_combo.blockSignals(False)
 
-        for day_widget in self.day_widgets.values(): day_widget.retranslate_ui()
+        self.week_model.retranslate()
         self.update_start_button_text()
-        self.stop_button.setText(self.get_text('preview_cancel_button'))
-        self.tray_icon.setToolTip(self.get_text('tray_tooltip'))
+        if self.timer_view is not None:
+            self.stop_button.setText(self.get_text('preview_cancel_button'))
+            self.edit_button.setText(self.get_text('timer_edit_button'))
+        if self.tray_icon is not None: self.retranslate_tray()
+        if self.metrics_panel is not None: self.metrics_panel.retranslate()
+
+    def retranslate_tray(self):
         self.show_action.setText(self.get_text('show'))
         self.quit_action.setText(self.get_text('quit'))
+        self.update_tray_status()
+
+    def update_tray_status(self):
+        """托盤提示：視窗隱藏或最小化且番茄鐘執行中時顯示目前區段與剩餘分鐘數，否則只顯示程式名稱。"""
+        self.tray_timer.stop()
+        if self.tray_icon is None: return
+        lines = [self.get_text('tray_tooltip')]
+        if self.is_running and (self.isHidden() or self.isMinimized()):
+            now = self.timer_engine.now()
+            state, index = self.timer_engine.locate(now)
+            if state == 'active':
+                task = self.pomodoro_schedule[index]
+                remaining_secs = max(0, (task.end - now).total_seconds())
+                is_work = task.type == 'work'
+                lines.append(f"{self.get_text('timer_status_work') if is_work else self.get_text('timer_status_break')} {self.segment_label(task)}")
+                lines.append(self.get_text('tray_tooltip_minutes').format(int(-(-remaining_secs // 60))))
+                # 在顯示的分鐘數下一次變動時再更新；區段轉換由計時引擎的通知處理
+                if remaining_secs > 60: self.tray_timer.start(int(remaining_secs % 60 * 1000) + TRAY_TOOLTIP_SLACK_MS)
+            elif state == 'waiting':
+                first_task = self.pomodoro_schedule[0]
+                lines.append(self.get_text('timer_status_waiting'))
+                lines.append(f"{self.get_text('timer_task_next').format(first_task.name)} ({first_task.start.strftime('%H:%M')})")
+        tooltip = "\n".join(lines)
+        if tooltip != self.tray_icon.toolTip():
+            self.metrics.count('tray.tooltip_updates')
+            self.tray_icon.setToolTip(tooltip)
 
     def pomodoro_mode_changed(self, index):
         if self.pomodoro_mode_combo.itemData(index) == "custom":
@@ -340,6 +493,11 @@ class PomodoroApp(QWidget):
             self.last_mode_index = index
 
     def update_start_button_text(self):
+        if self.is_running:
+            # 執行中回到設定畫面編輯任務時，按鈕改為返回計時畫面
+            self.start_button.setEnabled(True)
+            self.start_button.setText(self.get_text('return_to_timer_button'))
+            return
         start_date = self.date_picker.date
         is_today_in_view = QDate.currentDate() >= start_date and QDate.currentDate() < start_date.addDays(7)
         self.start_button.setEnabled(is_today_in_view)
@@ -348,57 +506,165 @@ class PomodoroApp(QWidget):
     def date_selection_changed(self, date):
         self.populate_week_view(date)
 
+    def fetch_range(self, first_date, last_date):
+        """確保這段日期已載入；資料只保留最近使用的幾個範圍。"""
+        try:
+            self.schedule_data.ensure(first_date.toString("yyyy-MM-dd"), last_date.toString("yyyy-MM-dd"))
+        except storage.STORAGE_ERRORS as e:
+            QMessageBox.critical(self, self.get_text('load_error'), self.get_text('load_error_msg').format(e))
+
+    @instrumentation.timed('populate_week_view')
     def populate_week_view(self, start_date):
-        for i in reversed(range(self.week_view_layout.count())): 
-            widget = self.week_view_layout.itemAt(i).widget()
-            if widget: widget.setParent(None)
-        self.day_widgets.clear()
-        for i in range(7):
-            date = start_date.addDays(i)
-            date_str = date.toString("yyyy-MM-dd")
-            day_widget = DayScheduleWidget(date, self)
-            if date_str in self.schedule_data: day_widget.load_day_data(self.schedule_data[date_str])
-            self.week_view_layout.addWidget(day_widget)
-            self.day_widgets[date_str] = day_widget
+        # 先把目前畫面上尚未儲存的編輯送出，再換成新的一週
+        self.autosave_data()
+        self.fetch_range(start_date, start_date.addDays(6))
+        # 重新綁定期間暫停重繪，完成後一次更新
+        first_week = not self.week_model.days
+        self.week_view.setUpdatesEnabled(False)
+        self.week_model.set_week(start_date, self.schedule_data)
+        if first_week: self.week_view.expandAll()
+        self.week_view.scrollToTop()
+        self.week_view.setUpdatesEnabled(True)
         self.update_start_button_text()
+        # 前後兩週在事件迴圈空閒時才載入，啟動時只讀取目前這一週
+        if self.startup_done: QTimer.singleShot(0, self.prefetch_adjacent_weeks)
+
+    def prefetch_adjacent_weeks(self):
+        start_date = self.date_picker.date
+        for first_date in (start_date.addDays(-7), start_date.addDays(7)):
+            try:
+                self.schedule_data.ensure(first_date.toString("yyyy-MM-dd"), first_date.addDays(6).toString("yyyy-MM-dd"))
+            except storage.STORAGE_ERRORS:
+                pass  # 預先載入失敗時不打擾使用者，真的切換到該週時會再讀取並顯示錯誤
 
-    def schedule_changed(self):
-        self.data_dirty = True
+    def schedule_changed(self, date_str):
+        self.dirty_dates.add(date_str)
+        self.plan_cache.invalidate(date_str)
 
     def autosave_data(self):
-        if self.data_dirty:
+        if self.dirty_dates or self.settings_dirty:
             self.save_data_to_file()
-            self.data_dirty = False
 
+    @instrumentation.timed('save_data_to_file')
     def save_data_to_file(self):
-        for date_str, widget in self.day_widgets.items():
-            day_data = widget.get_day_data()
+        # 只重新整理被編輯過的日期
+        week_dates = self.week_model.dates()
+        dates = [date_str for date_str in self.dirty_dates if date_str in week_dates]
+        for date_str in dates:
+            day_data = self.week_model.day_data(date_str)
             if day_data and day_data.get('tasks'): self.schedule_data[date_str] = day_data
             elif date_str in self.schedule_data: del self.schedule_data[date_str]
-        full_data = {'language': self.current_lang, 'schedule': self.schedule_data}
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(full_data, f, ensure_ascii=False, indent=4)
-        except IOError as e:
-            QMessageBox.warning(self, self.get_text('save_error'), self.get_text('save_error_msg').format(e))
+        self.dirty_dates.clear(); self.settings_dirty = False
+        # 實際寫入交給背景執行緒，避免在慢速磁碟上卡住介面
+        self.writer.submit(self.current_lang, self.schedule_data, dates=dates)
+
+    def replan_running_session(self):
+        """執行中編輯了今天的任務：保留已完成與目前的區段，只重新計算之後的部分並接回計時引擎。"""
+        today_str = QDate.currentDate().toString("yyyy-MM-dd")
+        tasks = self.schedule_data.get(today_str, {}).get('tasks', [])
+        now = self.timer_engine.now()
+        state, index = self.timer_engine.locate(now)
+        if state == 'done': return
+        current_index = index if state == 'active' else index - 1
+        new_schedule = schedule_engine.replan_tail(self.pomodoro_schedule, current_index, tasks, self.running_mode, now)
+        if not new_schedule:
+            self.stop_pomodoro()
+            return
+        if new_schedule == self.pomodoro_schedule or not self.validate_schedule(new_schedule): return
+        self.pomodoro_schedule = new_schedule
+        self.timer_engine.update_schedule(new_schedule)
+        self.daemon_call('update_plan', segments=[schedule_engine.segment_to_dict(segment) for segment in new_schedule])
+        self.update_timer()
+
+    def edit_running_session(self):
+        # 計時引擎繼續執行，只是換成設定畫面；按下返回時以 replan_running_session 套用編輯
+        self.timer_view.hide(); self.setup_view.show()
+        self.update_start_button_text()
 
+    # --- 計時守護行程 ---
+    def attach_daemon(self):
+        """在開啟儲存後端之前呼叫；守護行程在 connect_or_spawn 之後就結束時改為單獨執行。"""
+        try:
+            self.daemon_connection = self.daemon.call('ping')['connection']
+            self.daemon_listener = DaemonListener(self.daemon.address, self.daemon.token_file, self)
+            self.daemon_listener.event.connect(self.on_daemon_event)
+            self.daemon_listener.disconnected.connect(self.on_daemon_disconnected)
+            self.daemon_status = self.daemon.call('status')
+        except OSError as e:  # 包含 DaemonError
+            print(f"無法連線到計時守護行程，改為單獨執行: {e}")
+            if self.daemon_listener is not None: self.daemon_listener.close()
+            self.daemon.close()
+            self.daemon, self.daemon_listener, self.daemon_status = None, None, None
+
+    def daemon_call(self, cmd, **args):
+        if self.daemon is None: return None
+        try:
+            return self.daemon.call(cmd, **args)
+        except focus_daemon.DaemonError as e:
+            print(f"計時守護行程的 {cmd} 要求失敗: {e}")
+            return None
+
+    def adopt_session(self, records, mode):
+        """接手守護行程中執行中的排程 (GUI 啟動時，或其他前端開始了番茄鐘)。"""
+        plan = [schedule_engine.segment_from_dict(record) for record in records]
+        state, index = schedule_engine.locate(plan, [segment.start for segment in plan], self.timer_engine.now())
+        self.pomodoro_schedule = plan
+        self.running_mode = tuple(mode)
+        self.set_running(True)
+        self.current_task_index = index if state == 'active' else -1
+        self.ensure_timer_view()
+        self.setup_view.hide(); self.timer_view.show()
+        # 目前的區段已經開始，不再重複跳出提示
+        self.timer_engine.start(plan, current_index=self.current_task_index)
+        self.update_start_button_text()
+        self.update_timer()
+        self.update_tray_status()
+
+    def on_daemon_event(self, event):
+        kind, own = event.get('event'), event.get('origin') == self.daemon_connection
+        if kind == 'started' and not own:
+            self.adopt_session(event['plan'], event['mode'])
+        elif kind == 'plan' and not own and self.is_running:
+            # 其他前端的編輯 (例如 schedule.* RPC) 重新規劃的結果；與本地的排程相同時不做任何事
+            plan = [schedule_engine.segment_from_dict(record) for record in event['plan']]
+            if plan == self.pomodoro_schedule: return
+            self.pomodoro_schedule = plan
+            self.timer_engine.update_schedule(plan)
+            self.update_timer()
+        elif kind == 'stopped' and not own and self.is_running:
+            self.stop_pomodoro(notify_daemon=False)
+        elif kind == 'saved' and not own:
+            updated = self.schedule_data.apply_remote(event['days'])
+            for date_str in updated: self.plan_cache.invalidate(date_str)
+            week_dates = self.week_model.dates()
+            if any(date_str in week_dates for date_str in updated) and not self.dirty_dates:
+                self.week_model.set_week(self.date_picker.date, self.schedule_data)
+
+    def on_daemon_disconnected(self):
+        # 本地的計時引擎繼續執行，但之後的存檔會失敗並顯示錯誤
+        self.show_notification(self.get_text('daemon_disconnected_title'), self.get_text('daemon_disconnected_msg'))
+
+    def on_saved(self, saved):
+        # 接在視窗的方法上 (而非 lambda)，視窗銷毀後尚未送達的通知會自動捨棄
+        self.schedule_data.mark_saved(saved)
+
+    def on_save_failed(self, error):
+        if self.quitting: return
+        QMessageBox.warning(self, self.get_text('save_error'), self.get_text('save_error_msg').format(error))
+
+    @instrumentation.timed('load_data')
     def load_data(self):
+        # 只讀取設定；排程資料由 fetch_range 依顯示的日期範圍載入
+        self.schedule_data = storage.WindowedSchedule(self.store)
         try:
-            if not os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'w', encoding='utf-8') as f: json.dump({'language': 'zh_TW', 'schedule': {}}, f)
-                self.schedule_data = {}; self.current_lang = 'zh_TW'
-            else:
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    full_data = json.loads(content) if content else {}
-                    self.schedule_data = full_data.get('schedule', {})
-                    self.current_lang = full_data.get('language', 'zh_TW')
-                    index = self.lang_combo.findData(self.current_lang)
-                    if index != -1: self.lang_combo.setCurrentIndex(index)
-        except (json.JSONDecodeError, IOError) as e:
+            self.current_lang = self.store.load_settings()
+            index = self.lang_combo.findData(self.current_lang)
+            if index != -1: self.lang_combo.setCurrentIndex(index)
+        except storage.STORAGE_ERRORS as e:
             QMessageBox.critical(self, self.get_text('load_error'), self.get_text('load_error_msg').format(e))
-            self.schedule_data = {}; self.current_lang = 'zh_TW'
+            self.current_lang = 'zh_TW'
 
+    @instrumentation.timed('generate_schedule')
     def generate_pomodoro_schedule(self):
         """
         生成番茄鐘排程的核心函數。
@@ -408,33 +674,27 @@ class PomodoroApp(QWidget):
         4. 重新排序任務列表，將即將執行的任務放在最前面，形成一個環形隊列。
         5. 基於這個新的隊列，生成一個連續不斷的工作-休息時間鏈。
         """
-        today_str = QDate.currentDate().toString("yyyy-MM-dd")
+        today = QDate.currentDate()
+        self.fetch_range(today, today)
+        today_str = today.toString("yyyy-MM-dd")
         if today_str not in self.schedule_data or not self.schedule_data[today_str].get("tasks"):
             return None, self.get_text('preview_no_tasks')
-        
-        tasks = self.schedule_data[today_str]["tasks"]
-        if not tasks:
-            return None, self.get_text('preview_no_tasks')
 
-        # 步驟 1: 按時間對任務進行排序，確保處理順序正確
-        tasks.sort(key=lambda x: QTime.fromString(x.get('time', '00:00'), "HH:mm"))
+        # 步驟 1: 按時間對任務進行排序，確保處理順序正確 (任務沒有變動時沿用上次的結果)
+        content, entries = self.plan_cache.sorted_entries(today_str, self.schedule_data[today_str]["tasks"])
 
         mode_data = self.pomodoro_mode_combo.currentData()
-        if not isinstance(mode_data, tuple) or len(mode_data) != 2:
+        try:
+            schedule_engine.check_mode(mode_data)
+        except ValueError:
             QMessageBox.warning(self, "模式錯誤", "請選擇一個有效的番茄鐘模式。")
             return None, "模式錯誤"
-        
-        work_min, break_min = mode_data
+
         now_dt = datetime.now()
-        
+
         # 步驟 2: 找到第一個尚未開始的任務的索引
-        start_task_index = -1
-        for i, task_info in enumerate(tasks):
-            task_start_dt = datetime.combine(now_dt.date(), QTime.fromString(task_info['time'], "HH:mm").toPyTime())
-            if task_start_dt >= now_dt:
-                start_task_index = i
-                break
-        
+        start_task_index = schedule_engine.find_start_index(entries, now_dt)
+
         # 步驟 3: 如果所有任務的設定時間都已過去
         if start_task_index == -1:
             reply = QMessageBox.question(self, self.get_text('all_tasks_past_title'), self.get_text('all_tasks_past_msg'),
@@ -444,58 +704,42 @@ class PomodoroApp(QWidget):
             else:
                 return None, self.get_text('all_tasks_past_info')
 
-        # 步驟 4: 建立一個新的、環形排列的任務列表，確保所有任務都會被執行
-        tasks_to_run = tasks[start_task_index:] + tasks[:start_task_index]
-
-        # 步驟 5: 設定整個連續排程的起始時間
-        first_task_original_time = QTime.fromString(tasks_to_run[0]['time'], "HH:mm").toPyTime()
-        current_dt = datetime.combine(now_dt.date(), first_task_original_time)
-        # 如果任務的預定時間已過（或即將到來），則從現在開始；否則，從預定時間開始
-        current_dt = max(now_dt, current_dt) 
-
-        schedule_list = []
-        schedule_text_lines = [self.get_text('preview_header')]
-
-        # 步驟 6: 遍歷重新排序後的任務列表，生成連續的時間鏈
-        for i, task_info in enumerate(tasks_to_run):
-            task_name = task_info['name']
-            
-            # 每個任務的工作時間都從上一個活動（休息）結束的時間點開始
-            # 對於第一個任務，current_dt 已經在上面設定好了
-            work_start_dt = current_dt
-            work_end_dt = work_start_dt + timedelta(minutes=work_min)
-            schedule_list.append({"type": "work", "name": task_name, "start": work_start_dt, "end": work_end_dt})
-            schedule_text_lines.append(f"<font color='#D4AC0D'>{work_start_dt.strftime('%H:%M')} - {work_end_dt.strftime('%H:%M')}: {self.get_text('preview_focus').format(task_name)}</font>")
-
-            break_start_dt = work_end_dt
-            break_end_dt = break_start_dt + timedelta(minutes=break_min)
-            
-            # 決定休息時間的提示文字
-            if i + 1 < len(tasks_to_run):
-                next_task_name = tasks_to_run[i+1]['name']
-                break_name = self.get_text('preview_break_next').format(next_task_name)
-            else:
-                break_name = self.get_text('preview_break_final')
-
-            schedule_list.append({"type": "break", "name": break_name, "start": break_start_dt, "end": break_end_dt})
-            schedule_text_lines.append(f"<font color='#E74C3C'>{break_start_dt.strftime('%H:%M')} - {break_end_dt.strftime('%H:%M')}: {self.get_text('preview_break')}</font>")
-            
-            # 更新時間點，為下一個任務做準備
-            current_dt = break_end_dt
-            
-        return schedule_list, "<br>".join(schedule_text_lines)
+        # 步驟 4-6: 環形排列任務並生成連續的工作-休息時間鏈
+        plan = self.plan_cache.build(today_str, content, entries, mode_data, now_dt, start_task_index)
+        if self.current_lang not in plan.derived:
+            plan.derived[self.current_lang] = self.render_schedule_summary(plan.segments)
+        return plan.segments, plan.derived[self.current_lang]
+
+    def render_schedule_summary(self, schedule):
+        """預覽對話框上方的摘要；逐列的內容由 SchedulePreviewModel 在顯示時才產生。"""
+        work_minutes = sum(int((segment.end - segment.start).total_seconds()) // 60 for segment in schedule if segment.type == 'work')
+        break_minutes = sum(int((segment.end - segment.start).total_seconds()) // 60 for segment in schedule if segment.type == 'break')
+        work_count = sum(1 for segment in schedule if segment.type == 'work')
+        summary = self.get_text('preview_summary').format(work_count, work_minutes, break_minutes, schedule[-1].end.strftime('%H:%M'))
+        return self.get_text('preview_header') + summary
+
+    def segment_label(self, segment):
+        if segment.type == 'work': return segment.name
+        if segment.next_name is not None: return self.get_text('preview_break_next').format(segment.next_name)
+        return self.get_text('preview_break_final')
 
     def validate_schedule(self, schedule):
         if not schedule: return False
-        for i in range(len(schedule) - 1):
-            # 允許時間相等，因為一個結束後下一個立刻開始
-            if schedule[i]['end'] > schedule[i+1]['start']:
-                print(f"驗證錯誤: 事件 {i} 結束於 {schedule[i]['end']} 但下個事件 {i+1} 開始於 {schedule[i+1]['start']}")
-                return False
+        i = schedule_engine.find_overlap(schedule)
+        if i != -1:
+            print(f"驗證錯誤: 事件 {i} 結束於 {schedule[i].end} 但下個事件 {i+1} 開始於 {schedule[i+1].start}")
+            return False
         return True
 
     def preview_and_start_pomodoro(self):
         self.autosave_data()
+        if self.is_running:
+            # 編輯期間的自動存檔不重新規劃，回到計時畫面時才套用一次
+            self.replan_running_session()
+            if not self.is_running: return
+            self.setup_view.hide(); self.timer_view.show()
+            self.update_timer()
+            return
         generated_schedule, schedule_text = self.generate_pomodoro_schedule()
 
         if not generated_schedule:
@@ -506,14 +750,15 @@ class PomodoroApp(QWidget):
             QMessageBox.critical(self, self.get_text('validation_error_title'), self.get_text('validation_error_msg'))
             return
 
+        self.metrics.count('widgets.created')
         dialog = QDialog(self)
         dialog.setWindowTitle(self.get_text('preview_title'))
         dialog.setMinimumWidth(400)
         
         layout = QVBoxLayout(dialog)
-        label = QLabel(schedule_text); label.setWordWrap(True); label.setTextFormat(Qt.TextFormat.RichText)
-        scroll = QScrollArea(); scroll.setWidget(label); scroll.setWidgetResizable(True); scroll.setFrameShape(QFrame.Shape.NoFrame)
-        layout.addWidget(scroll)
+        summary_label = QLabel(schedule_text); summary_label.setWordWrap(True); summary_label.setTextFormat(Qt.TextFormat.RichText)
+        layout.addWidget(summary_label)
+        layout.addWidget(create_schedule_preview_view(SchedulePreviewModel(generated_schedule, self)))
 
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         buttons.button(QDialogButtonBox.StandardButton.Ok).setText(self.get_text('preview_start_button'))
@@ -524,65 +769,105 @@ class PomodoroApp(QWidget):
 
         if dialog.exec():
             self.pomodoro_schedule = generated_schedule
-            self.is_running = True
+            self.running_mode = self.pomodoro_mode_combo.currentData()
+            self.set_running(True)
             self.current_task_index = -1
+            self.ensure_timer_view()
             self.setup_view.hide()
             self.timer_view.show()
+            self.timer_engine.start(self.pomodoro_schedule)
             self.update_timer()
-
-    def stop_pomodoro(self):
-        self.is_running = False; self.pomodoro_schedule = []; self.current_task_index = -1
+            self.daemon_call('start', segments=[schedule_engine.segment_to_dict(segment) for segment in generated_schedule],
+                             mode=list(self.running_mode))
+
+    def set_running(self, running):
+        if running == self.is_running: return
+        self.is_running = running
+        # 背景顏色隨執行狀態改變，下一次繪製時重新產生外框
+        self.update()
+
+    def stop_pomodoro(self, notify_daemon=True):
+        if notify_daemon and self.is_running: self.daemon_call('stop')
+        self.set_running(False); self.pomodoro_schedule = []; self.current_task_index = -1
+        self.timer_engine.stop(); self.display_timer.stop()
+        self.notifications.clear()
+        self.update_tray_status()
+        if self.timer_view is None: return
         self.timer_view.hide(); self.setup_view.show()
-        self.status_label.setText(self.get_text('timer_status_stopped')); self.task_label.setText("..."); self.timer_label.setText("00:00")
-
+        self.update_start_button_text()
+        self.set_status('stopped', self.get_text('timer_status_stopped')); self.task_label.setText("..."); self.timer_label.setText("00:00")
+
+    def display_visible(self):
+        return self.is_running and self.isVisible() and not self.isMinimized() and self.timer_view is not None and self.timer_view.isVisible()
+
+    def on_segment_changed(self, index):
+        self.current_task_index = index
+        task = self.pomodoro_schedule[index]
+        is_work = task.type == 'work'
+        title = self.get_text('notification_title_work') if is_work else self.get_text('notification_title_break')
+        message = task.name if is_work else self.get_text('preview_break')
+        self.show_notification(title, message, notification_type=task.type, key='segment')
+        self.update_timer()
+        self.update_tray_status()
+
+    def on_schedule_finished(self):
+        if self.is_running:
+            # 先停止 (會清除排隊中的區段提示)，再顯示完成提示
+            self.stop_pomodoro()
+            self.show_notification(self.get_text('notification_done'), self.get_text('notification_done_msg'), notification_type='done', key='segment')
+
+    @instrumentation.timed('update_timer')
     def update_timer(self):
+        """重新繪製計時畫面；只有在畫面可見時才會排定下一次 (對齊秒數) 的更新。"""
         if not self.is_running: return
-        now = datetime.now()
-        found_task = False
-        for i, task in enumerate(self.pomodoro_schedule):
-            if task["start"] <= now < task["end"]:
-                if self.current_task_index != i:
-                    self.current_task_index = i
-                    is_work = task['type'] == 'work'
-                    title = self.get_text('notification_title_work') if is_work else self.get_text('notification_title_break')
-                    message = task['name'].split('(')[0].strip()
-                    self.show_notification(title, message, notification_type=task['type'])
-
-                remaining_delta = task["end"] - now
-                remaining_secs = int(remaining_delta.total_seconds())
-                minutes, seconds = divmod(max(0, remaining_secs), 60)
-                self.timer_label.setText(f"{minutes:02d}:{seconds:02d}")
-                self.task_label.setText(task['name'])
-                is_work = task['type'] == 'work'
-                self.status_label.setText(self.get_text('timer_status_work') if is_work else self.get_text('timer_status_break'))
-                self.status_label.setStyleSheet("color: #50fa7b;" if is_work else "color: #8be9fd;")
-                found_task = True
-                break
-        
-        if not found_task:
-            if self.pomodoro_schedule and now >= self.pomodoro_schedule[-1]["end"]:
-                if self.is_running:
-                    self.show_notification(self.get_text('notification_done'), self.get_text('notification_done_msg'), notification_type='done')
-                    self.stop_pomodoro()
-            elif self.pomodoro_schedule and now < self.pomodoro_schedule[0]["start"]:
-                first_task = self.pomodoro_schedule[0]
-                self.status_label.setText(self.get_text('timer_status_waiting'))
-                self.task_label.setText(self.get_text('timer_task_next').format(first_task['name']))
-                self.timer_label.setText(first_task['start'].strftime("%H:%M"))
-            else:
-                # 這種情況理論上不應該發生在連續排程中，但作為備用
-                self.status_label.setText(self.get_text('timer_status_gap'))
-                self.task_label.setText(self.get_text('timer_task_done'))
-                self.timer_label.setText("--:--")
-
-    def show_notification(self, title, message, notification_type='info'):
+        self.timer_engine.poll()
+        if not self.is_running or not self.display_visible():
+            self.display_timer.stop()
+            return
+        now = self.timer_engine.now()
+        state, index = self.timer_engine.locate(now)
+        if state == 'active':
+            task = self.pomodoro_schedule[index]
+            remaining_delta = task.end - now
+            remaining_secs = int(remaining_delta.total_seconds())
+            minutes, seconds = divmod(max(0, remaining_secs), 60)
+            self.timer_label.setText(f"{minutes:02d}:{seconds:02d}")
+            self.task_label.setText(self.segment_label(task))
+            self.set_status(task.type, self.get_text('timer_status_work') if task.type == 'work' else self.get_text('timer_status_break'))
+            # 在剩餘秒數下一次變動時再更新
+            self.display_timer.start(int(remaining_delta.total_seconds() % 1 * 1000) + 5)
+        elif state == 'waiting':
+            first_task = self.pomodoro_schedule[0]
+            self.set_status('waiting', self.get_text('timer_status_waiting'))
+            self.task_label.setText(self.get_text('timer_task_next').format(first_task.name))
+            self.timer_label.setText(first_task.start.strftime("%H:%M"))
+        elif state == 'gap':
+            # 這種情況理論上不應該發生在連續排程中，但作為備用
+            self.set_status('gap', self.get_text('timer_status_gap'))
+            self.task_label.setText(self.get_text('timer_task_done'))
+            self.timer_label.setText("--:--")
+
+    def set_status(self, state, text):
+        """
+        狀態標籤的顏色由樣式表中的 [state=...] 選擇器決定；
+        只有狀態真的改變時才重新套用樣式，每秒的更新不會觸發樣式重新計算。
+        """
+        self.status_label.setText(text)
+        if state == self.status_state: return
+        self.status_state = state
+        self.metrics.count('style.repolish')
+        self.status_label.setProperty('state', state)
+        self.status_label.style().unpolish(self.status_label)
+        self.status_label.style().polish(self.status_label)
+
+    def show_notification(self, title, message, notification_type='info', key=None):
         try:
-            self.notification = NotificationWidget(title, message, notification_type, self)
-            self.notification.show_animation()
+            self.notifications.post(title, message, notification_type, key)
         except Exception as e:
             print(f"顯示通知時發生錯誤: {e}")
 
     def show_minimized(self):
+        self.finish_startup()
         self.hide()
         self.tray_icon.showMessage("FocusFlow", self.get_text('minimized_msg'), self.app_icon, 2000)
 
@@ -593,7 +878,23 @@ class PomodoroApp(QWidget):
 
     def quit_app(self):
         self.autosave_data()
-        self.tray_icon.hide()
+        self.quitting = True
+        # 最後的編輯寫入失敗時讓使用者決定重試、放棄這些編輯或取消結束，不能在背景默默遺失
+        while not self.writer.close(timeout=SHUTDOWN_FLUSH_SECONDS):
+            error = self.writer.last_error or self.get_text('save_timeout').format(SHUTDOWN_FLUSH_SECONDS)
+            reply = QMessageBox.warning(self, self.get_text('save_error'), self.get_text('save_error_msg').format(error),
+                                        QMessageBox.StandardButton.Retry | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel,
+                                        QMessageBox.StandardButton.Retry)
+            if reply == QMessageBox.StandardButton.Discard: break
+            if reply != QMessageBox.StandardButton.Retry:
+                # 排在已送出的 save_failed 之後才恢復，錯誤已經顯示過，不再跳出第二個對話框
+                QTimer.singleShot(0, lambda: setattr(self, 'quitting', False))
+                return
+        else:
+            self.store.close()
+        if self.tray_icon is not None: self.tray_icon.hide()
+        # 連上守護行程時只中斷連線，執行中的番茄鐘由守護行程繼續計時
+        if self.daemon_listener is not None: self.daemon_listener.close()
         QApplication.instance().quit()
 
     def on_tray_icon_activated(self, reason):
@@ -601,6 +902,23 @@ class PomodoroApp(QWidget):
             if self.isHidden(): self.showNormal()
             else: self.hide()
 
+    # 視窗顯示時以一次 update_timer 追上目前狀態；隱藏或最小化時改由托盤提示顯示剩餘時間
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_timer()
+        self.update_tray_status()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.display_timer.stop()
+        self.update_tray_status()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_timer()
+            self.update_tray_status()
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and self.title_bar.geometry().contains(event.pos()):
             self.old_pos = event.globalPosition().toPoint()
@@ -614,8 +932,12 @@ class PomodoroApp(QWidget):
     def mouseReleaseEvent(self, event):
         self.old_pos = None
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def render_background(self, dpr):
+        self.metrics.count('background.rendered')
+        pixmap = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         path = QPainterPath()
         path.addRoundedRect(QRectF(self.rect()), 15, 15)
@@ -624,14 +946,63 @@ class PomodoroApp(QWidget):
         pen = QPen(QColor(189, 147, 249, 150), 1)
         painter.setPen(pen)
         painter.drawPath(path)
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        # 外框只在尺寸、螢幕或執行狀態改變時重新繪製；平常只複製需要更新的區域 (例如倒數文字後方)
+        dpr = self.devicePixelRatioF()
+        key = (self.width(), self.height(), dpr, self.is_running)
+        if key != self.background_key:
+            self.background_cache, self.background_key = self.render_background(dpr), key
+        rect = QRectF(event.rect())
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.drawPixmap(rect, self.background_cache, QRectF(rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr))
+        painter.end()
+        if not self.first_paint_done:
+            # 視窗外框已畫出，其餘初始化交給下一輪事件迴圈
+            self.first_paint_done = True
+            self.profiler.mark('first paint')
+            QTimer.singleShot(0, self.finish_startup)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="FocusFlow")
+    parser.add_argument('--storage', choices=sorted(storage.STORAGE_BACKENDS), default=storage.DEFAULT_BACKEND,
+                        help="排程資料的儲存方式 (sharded: 每月一個檔案, json: 單一檔案, journal: 附加日誌, sqlite: SQLite 資料庫, binary: 二進位快照)")
+    parser.add_argument('--profile-startup', action='store_true', help="啟動完成後印出各階段的耗時")
+    # 實際在檔案開頭、載入 PyQt6 之前處理 (見 headless.py)，這裡只為了顯示在 --help 中
+    parser.add_argument('--headless', action='store_true', help="不開啟視窗，在終端機中執行今天的番茄鐘 (另有 --mode、--restart、--format)")
+    parser.add_argument('--daemon', action='store_true', help="執行計時守護行程，或加上 status/start/stop/watch/shutdown 操作它")
+    parser.add_argument('--attach', action='store_true', help="連線到計時守護行程 (沒有時自動啟動)；關閉視窗後番茄鐘繼續計時")
+    parser.add_argument('--rpc', nargs='?', const='', metavar='ADDRESS', help="與 --attach 一起使用：自動啟動的守護行程另外開啟 JSON-RPC 端點")
+    # 其餘參數留給 Qt 處理
+    args, _ = parser.parse_known_args(argv)
+    return args
 
 if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    profiler = instrumentation.StartupProfiler(STARTUP_ORIGIN) if args.profile_startup else None
+    if profiler: profiler.record('imports', STARTUP_ORIGIN, IMPORTS_DONE)
     app = QApplication(sys.argv)
+    app.setApplicationName("FocusFlow")
     app.setQuitOnLastWindowClosed(False)
+    if profiler: profiler.record('QApplication', IMPORTS_DONE)
     # 確保 ui_components 和 translations 檔案存在
-    if 'DayScheduleWidget' not in globals():
+    if 'WeekPlannerModel' not in globals():
         QMessageBox.critical(None, "錯誤", "缺少必要的 ui_components.py 檔案，程式無法執行。")
         sys.exit(1)
-    window = PomodoroApp()
+    cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    icon_cache.set_disk_cache(os.path.join(cache_dir, ICON_CACHE_DIR_NAME) if cache_dir else None)
+    daemon = None
+    if args.attach:
+        command = [sys.executable] + ([] if getattr(sys, 'frozen', False) else [os.path.abspath(__file__)]) + ['--daemon', '--storage', args.storage]
+        if args.rpc is not None: command += ['--rpc'] + ([args.rpc] if args.rpc else [])
+        try:
+            daemon = focus_daemon.connect_or_spawn(focus_daemon.daemon_address(CONFIG_FILE), command,
+                                                   token_file=focus_daemon.token_path(CONFIG_FILE))
+        except OSError as e:
+            print(f"無法連線到計時守護行程，改為單獨執行: {e}")
+    window = PomodoroApp(storage_mode=args.storage, profiler=profiler, daemon=daemon)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,125 @@
+import copy
+import threading
+import time
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import storage
+
+
+class BackgroundWriter(QObject):
+    """
+    專用的存檔執行緒。
+    submit() 在 GUI 執行緒中取得資料快照後立即返回；短時間內的連續編輯會合併成一次寫入，
+    實際寫入 (暫存檔 + fsync + 改名) 在背景進行，失敗時以 save_failed 訊號回報給 GUI，
+    資料放回待寫入的佇列 (較新的編輯優先)，並以遞增的間隔重試。
+    last_error 為最近一次寫入失敗的訊息 (成功後清除)，供結束程式時同步顯示。
+    """
+    save_failed = pyqtSignal(str)
+    saved = pyqtSignal(dict)  # 已寫入的 {日期: 資料}
+
+    # 第一筆編輯之後最多再等待多久，讓後續編輯合併到同一次寫入
+    COALESCE_SECONDS = 0.5
+    # 寫入失敗後的重試間隔，每次失敗加倍，直到上限
+    RETRY_SECONDS = 1.0
+    MAX_RETRY_SECONDS = 60.0
+
+    def __init__(self, store, parent=None, metrics=None):
+        super().__init__(parent)
+        self.store = store
+        self.metrics = metrics  # instrumentation.Metrics，記錄實際寫入的耗時
+        self._cond = threading.Condition()
+        self._language = None
+        self._pending = {}
+        self._full = False
+        self._first_submit = None
+        self._not_before = 0.0  # 重試前最早可寫入的時間 (time.monotonic)
+        self._retry_delay = 0.0  # 0 表示上次寫入成功
+        self._failures = 0
+        self.last_error = None
+        self._busy = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="FocusFlowWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, language, schedule, dates=None):
+        """dates 為 None 時寫入整份 schedule，否則只寫入指定日期 (不在 schedule 中的日期視為刪除)。"""
+        snapshot = {date_str: copy.deepcopy(schedule.get(date_str)) for date_str in (schedule if dates is None else dates)}
+        with self._cond:
+            if dates is None:
+                self._pending, self._full = snapshot, True
+            else:
+                self._pending.update(snapshot)
+            self._language = language
+            if self._first_submit is None: self._first_submit = time.monotonic()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._first_submit is None and not self._closing:
+                    self._cond.wait()
+                if self._first_submit is None: return
+                # 每次醒來重新計算，flush() 會取消合併與重試的等待
+                while not self._closing:
+                    remaining = max(self._first_submit + self.COALESCE_SECONDS, self._not_before) - time.monotonic()
+                    if remaining <= 0: break
+                    self._cond.wait(remaining)
+                language, pending, full = self._language, self._pending, self._full
+                self._pending, self._full, self._first_submit = {}, False, None
+                self._busy = True
+            start = time.perf_counter()
+            try:
+                self.store.save(language, pending, None if full else list(pending))
+                self._retry_delay = 0.0
+                self.last_error = None
+                self.saved.emit(pending)
+            except Exception as e:  # 任何錯誤都不能讓執行緒結束，否則之後的編輯永遠不會寫入
+                if self.metrics: self.metrics.count('store.save_failed')
+                self.last_error = str(e) if isinstance(e, storage.STORAGE_ERRORS) else f"{type(e).__name__}: {e}"
+                # 連續失敗時只回報第一次，避免每次重試都跳出對話框
+                if self._requeue(language, pending, full): self.save_failed.emit(self.last_error)
+            finally:
+                if self.metrics: self.metrics.observe('store.save', time.perf_counter() - start)
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _requeue(self, language, pending, full):
+        """把寫入失敗的資料放回佇列；寫入期間又送出的較新編輯優先。回傳是否為連續失敗中的第一次。"""
+        with self._cond:
+            self._failures += 1
+            first = not self._retry_delay
+            if self._closing: return True  # 結束中不再重試，放棄寫入的資料一定要回報
+            pending.update(self._pending)
+            self._pending, self._full = pending, self._full or full
+            if self._language is None: self._language = language
+            self._retry_delay = min(self._retry_delay * 2, self.MAX_RETRY_SECONDS) if self._retry_delay else self.RETRY_SECONDS
+            self._not_before = time.monotonic() + self._retry_delay
+            if self._first_submit is None: self._first_submit = time.monotonic()
+            return first
+
+    def flush(self, timeout=None):
+        """立即寫入所有待寫入的資料並等待完成；寫入失敗 (資料留在佇列中等待重試) 或逾時回傳 False。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            failures = self._failures
+            if self._first_submit is not None: self._first_submit, self._not_before = 0.0, 0.0  # 不再等待合併或重試間隔
+            self._cond.notify_all()
+            while self._busy or (self._first_submit is not None and self._failures == failures):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0: return False
+                self._cond.wait(remaining)
+            return self._first_submit is None
+
+    def close(self, timeout=5.0):
+        """
+        寫完剩餘資料後結束執行緒，最多等待 timeout 秒。
+        寫入失敗或逾時回傳 False，執行緒繼續執行、資料留在佇列中，可以再次呼叫 close() 重試。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.flush(timeout): return False
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not self._thread.is_alive()
@@ -0,0 +1,235 @@
+"""
+不依賴 PyQt6 的排程引擎。
+輸入為純資料的任務紀錄 ({'name': ..., 'time': 'HH:mm'}) 與 (工作, 休息) 分鐘數，
+輸出精簡的 Segment 區段；GUI、命令列工具與測試皆可直接使用。
+"""
+from bisect import bisect_right
+from collections import Counter, OrderedDict, namedtuple
+from datetime import date, datetime, time, timedelta
+
+# type: 'work' 或 'break'；name: 所屬任務名稱；minute: 所屬任務的預定時間 (當日分鐘數)
+# next_name: 休息區段之後的下一個任務名稱 (最後一個休息為 None)
+Segment = namedtuple('Segment', 'type name start end minute next_name')
+
+
+def parse_time(text):
+    """將 'HH:mm' 轉為當日分鐘數；格式不正確時拋出 ValueError。"""
+    hours, sep, minutes = text.partition(':') if isinstance(text, str) else ('', '', '')
+    if not (sep and hours.strip().isdigit() and minutes.strip().isdigit()):
+        raise ValueError(f"無效的時間: {text!r} (格式為 HH:mm)")
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"無效的時間: {text!r}")
+    return hours * 60 + minutes
+
+
+def format_time(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def check_mode(mode):
+    if not isinstance(mode, tuple) or len(mode) != 2 or not all(isinstance(m, int) and m > 0 for m in mode):
+        raise ValueError(f"無效的番茄鐘模式: {mode!r}")
+    return mode
+
+
+def sort_tasks(tasks):
+    """回傳依時間排序的 (分鐘數, 名稱) 列表；同一時間保持原本順序。"""
+    entries = [(parse_time(task.get('time', '00:00')), task['name']) for task in tasks]
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+
+def find_start_index(entries, now):
+    """找出第一個預定時間尚未過去的任務索引，全部已過去時回傳 -1。"""
+    day_start = datetime.combine(now.date(), time.min)
+    for i, (minute, _) in enumerate(entries):
+        if day_start + timedelta(minutes=minute) >= now:
+            return i
+    return -1
+
+
+def build_schedule(entries, mode, now, start_index):
+    """
+    從 start_index 開始將任務排成環形隊列，產生連續不斷的工作-休息時間鏈。
+    第一個任務若預定時間已過則從 now 開始，否則從預定時間開始。
+    """
+    check_mode(mode)
+    tasks_to_run = entries[start_index:] + entries[:start_index]
+    if not tasks_to_run: return []
+    start_dt = max(now, datetime.combine(now.date(), time.min) + timedelta(minutes=tasks_to_run[0][0]))
+    return _chain(tasks_to_run, mode, start_dt)
+
+
+def _chain(tasks_to_run, mode, current_dt):
+    """從 current_dt 開始依序為每個 (分鐘數, 名稱) 排入工作與休息區段。"""
+    work_delta, break_delta = timedelta(minutes=mode[0]), timedelta(minutes=mode[1])
+    schedule = []
+    for i, (minute, name) in enumerate(tasks_to_run):
+        work_end = current_dt + work_delta
+        break_end = work_end + break_delta
+        next_name = tasks_to_run[i + 1][1] if i + 1 < len(tasks_to_run) else None
+        schedule.append(Segment('work', name, current_dt, work_end, minute, None))
+        schedule.append(Segment('break', name, work_end, break_end, minute, next_name))
+        current_dt = break_end
+    return schedule
+
+
+def replan_tail(schedule, current_index, tasks, mode, now):
+    """
+    執行中的排程在任務被編輯後重新規劃，回傳新的排程。
+    已完成的區段與目前的區段 (current_index) 保持不變，只重新計算之後的部分：
+    環形排列的起點維持原排程第一個任務的預定時間，已經開始過的任務依預定時間從新的任務中扣除
+    (不比對名稱，改名或修正錯字的任務不會被重新排入)，
+    其餘任務接在目前區段 (目前為工作時則是它的休息) 之後。
+    current_index 為 -1 (尚未開始) 時依一般規則重新產生整個排程。
+    """
+    check_mode(mode)
+    entries = sort_tasks(tasks)
+    anchor = schedule[0].minute if schedule else 0
+    chain = [entry for entry in entries if entry[0] >= anchor] + [entry for entry in entries if entry[0] < anchor]
+    if current_index < 0:
+        start_index = find_start_index(entries, now)
+        # 所有任務都已過去時，沿用原本 (從頭開始) 的起點
+        if start_index == -1: return build_schedule(chain, mode, now, 0)
+        return build_schedule(entries, mode, now, start_index)
+
+    kept = list(schedule[:current_index + 1])
+    consumed = Counter(segment.minute for segment in kept if segment.type == 'work')
+    remaining = []
+    for entry in chain:
+        if consumed[entry[0]]: consumed[entry[0]] -= 1
+        else: remaining.append(entry)
+    current = kept[-1]
+    next_name = remaining[0][1] if remaining else None
+    if current.type == 'work':
+        kept.append(Segment('break', current.name, current.end, current.end + timedelta(minutes=mode[1]), current.minute, next_name))
+    else:
+        kept[-1] = current._replace(next_name=next_name)
+    return kept + _chain(remaining, mode, kept[-1].end)
+
+
+def plan_day(tasks, mode, now, restart_if_past=True):
+    """
+    產生一天的排程。沒有任務時回傳空列表；
+    所有任務時間都已過去且 restart_if_past 為 False 時回傳 None。
+    """
+    entries = sort_tasks(tasks)
+    if not entries: return []
+    start_index = find_start_index(entries, now)
+    if start_index == -1:
+        if not restart_if_past: return None
+        start_index = 0
+    return build_schedule(entries, mode, now, start_index)
+
+
+def plan_batch(schedule_data, dates, modes, now=None, restart_if_past=True):
+    """
+    一次為多個日期與多種模式產生排程，回傳 {(日期字串, 模式): 排程}。
+    每個日期的任務只解析、排序一次；今天以 now 為基準，其他日期以當天零時為基準。
+    """
+    now = now or datetime.now()
+    plans = {}
+    for day in dates:
+        if isinstance(day, str): day = date.fromisoformat(day)
+        date_str = day.isoformat()
+        entries = sort_tasks(schedule_data.get(date_str, {}).get('tasks', []))
+        day_now = now if day == now.date() else datetime.combine(day, time.min)
+        start_index = find_start_index(entries, day_now) if entries else 0
+        for mode in modes:
+            if start_index == -1 and not restart_if_past:
+                plans[(date_str, mode)] = None
+            else:
+                plans[(date_str, mode)] = build_schedule(entries, mode, day_now, max(start_index, 0))
+    return plans
+
+
+def find_overlap(schedule):
+    """回傳第一個與下一個區段重疊的區段索引，沒有重疊時回傳 -1。"""
+    for i in range(len(schedule) - 1):
+        # 允許時間相等，因為一個結束後下一個立刻開始
+        if schedule[i].end > schedule[i + 1].start:
+            return i
+    return -1
+
+
+def segment_to_dict(segment):
+    """轉成可 JSON 序列化的 dict (時間為完整精度的 ISO 字串)，供行程間傳遞。"""
+    return {'type': segment.type, 'name': segment.name, 'start': segment.start.isoformat(), 'end': segment.end.isoformat(),
+            'minute': segment.minute, 'next_name': segment.next_name}
+
+
+def segment_from_dict(data):
+    if data.get('type') not in ('work', 'break'): raise ValueError(f"無效的區段類型: {data.get('type')!r}")
+    return Segment(data['type'], str(data['name']), datetime.fromisoformat(data['start']), datetime.fromisoformat(data['end']),
+                   int(data['minute']), data.get('next_name'))
+
+
+def locate(schedule, starts, now):
+    """
+    回傳 now 在排程中的 (狀態, 索引)；starts 為各區段開始時間的列表。
+    狀態為 'waiting' (尚未開始)、'active'、'gap' (兩區段之間) 或 'done'。
+    """
+    if not schedule: return 'done', -1
+    i = bisect_right(starts, now) - 1
+    if i < 0: return 'waiting', 0
+    if now < schedule[i].end: return 'active', i
+    if i + 1 < len(schedule): return 'gap', i + 1
+    return 'done', -1
+
+
+# --- 排程快取 ---
+class CachedPlan:
+    """快取的排程；derived 供呼叫端存放由排程衍生的資料 (例如各語言的預覽文字)。"""
+    __slots__ = ('segments', 'derived')
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.derived = {}
+
+
+class PlanCache:
+    """
+    記住最近產生的排程，重複預覽或切換模式時直接重用。
+    鍵為 (日期, 任務內容, 模式, 起始任務索引, 開始時間)。起始任務尚未到時，開始時間就是它的預定時間，
+    與按下按鈕的秒數無關，因此同一分鐘內 (起始任務不變) 的重複預覽一定命中；
+    從頭重新開始時開始時間為當下，不會重用舊的排程。
+    任務內容本身就是鍵的一部分，另外 invalidate(date) 會在該日編輯時立即丟棄相關項目。
+    """
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._plans = OrderedDict()
+        self._sorted = {}  # 日期 -> (任務內容, 排序後的 entries)
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def content_key(tasks):
+        return tuple((task.get('time', '00:00'), task['name']) for task in tasks)
+
+    def sorted_entries(self, date_str, tasks):
+        """回傳 (任務內容, sort_tasks 的結果)；內容沒變時不重新解析與排序。"""
+        content = self.content_key(tasks)
+        cached = self._sorted.get(date_str)
+        if cached is not None and cached[0] == content: return cached
+        self._sorted[date_str] = (content, sort_tasks(tasks))
+        return self._sorted[date_str]
+
+    def build(self, date_str, content, entries, mode, now, start_index):
+        """與 build_schedule 相同的參數，回傳 CachedPlan。"""
+        start = max(now, datetime.combine(now.date(), time.min) + timedelta(minutes=entries[start_index][0]))
+        key = (date_str, content, mode, start_index, start)
+        plan = self._plans.get(key)
+        if plan is not None:
+            self.hits += 1
+            self._plans.move_to_end(key)
+            return plan
+        self.misses += 1
+        plan = self._plans[key] = CachedPlan(build_schedule(entries, mode, now, start_index))
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self, date_str):
+        self._sorted.pop(date_str, None)
+        for key in [key for key in self._plans if key[0] == date_str]:
+            del self._plans[key]
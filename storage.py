@@ -0,0 +1,647 @@
+"""
+排程資料的儲存後端 (不依賴 PyQt6)。
+所有後端提供相同的介面 (日期皆為 'yyyy-MM-dd' 字串):
+    load() -> (language, schedule)    # 回傳的 schedule 為呼叫端自己的副本
+    load_settings() -> language
+    load_range(first, last) -> schedule  # 只含 first 到 last (含) 之間的日期
+    search(text, limit) -> [(date, task), ...]
+    stats(first, last) -> {date: 任務數}
+    save(language, schedule, dates=None)  # dates 為可能變動的日期；None 表示全部
+    close()
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import binary_snapshot
+
+DEFAULT_LANGUAGE = 'zh_TW'
+# 後端可能拋出的錯誤類型 (json.JSONDecodeError 屬於 ValueError)
+STORAGE_ERRORS = (ValueError, OSError, sqlite3.Error)
+
+
+def atomic_write(path, data):
+    """寫入暫存檔、fsync 後再改名覆蓋，避免寫到一半時留下損毀的檔案。"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def encode_snapshot(language, schedule):
+    return json.dumps({'language': language, 'schedule': schedule}, ensure_ascii=False, indent=4).encode('utf-8')
+
+
+def read_snapshot(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    full_data = json.loads(content) if content else {}
+    return full_data.get('language', DEFAULT_LANGUAGE), full_data.get('schedule', {})
+
+
+def apply_changes(target, schedule, dates):
+    """將 schedule 中 dates 指定的日期套用到 target；不在 schedule 中的日期視為刪除。"""
+    if dates is None:
+        target.clear(); target.update(schedule)
+        return
+    for date_str in dates:
+        if schedule.get(date_str): target[date_str] = schedule[date_str]
+        else: target.pop(date_str, None)
+
+
+class _MemoryStore:
+    """
+    整份資料都保存在記憶體中的後端，查詢直接在記憶體內完成。
+    儲存可能在背景執行緒進行，讀寫 self.schedule 時都要持有 self._lock。
+    """
+    _loaded = False
+
+    def load_settings(self):
+        if not self._loaded: self.load()
+        return self.language
+
+    def load_range(self, first, last):
+        if not self._loaded: self.load()
+        with self._lock:
+            return {date_str: day for date_str, day in self.schedule.items() if first <= date_str <= last}
+
+    def search(self, text, limit=100):
+        if not self._loaded: self.load()
+        with self._lock:
+            schedule = dict(self.schedule)
+        results = []
+        for date_str in sorted(schedule):
+            for task in sorted(schedule[date_str].get('tasks', []), key=lambda t: t.get('time', '')):
+                if text in task.get('name', ''):
+                    results.append((date_str, task))
+                    if len(results) >= limit: return results
+        return results
+
+    def stats(self, first, last):
+        return {date_str: len(day.get('tasks', [])) for date_str, day in self.load_range(first, last).items()}
+
+
+# --- 單一 JSON 檔案 (原本的格式) ---
+class JsonStore(_MemoryStore):
+    def __init__(self, path):
+        self.path = path
+        self.language = DEFAULT_LANGUAGE
+        self.schedule = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            # 讀取失敗時以空白資料繼續，之後的儲存會建立新檔案
+            self.language, self.schedule, self._loaded = DEFAULT_LANGUAGE, {}, True
+            if not os.path.exists(self.path):
+                atomic_write(self.path, self._encode(DEFAULT_LANGUAGE, {}))
+            else:
+                self.language, self.schedule = self._read()
+            return self.language, dict(self.schedule)
+
+    def _read(self):
+        return read_snapshot(self.path)
+
+    def _encode(self, language, schedule):
+        return encode_snapshot(language, schedule)
+
+    def save(self, language, schedule, dates=None):
+        if not self._loaded: self.load()
+        with self._lock:
+            self.language = language
+            apply_changes(self.schedule, schedule, dates)
+            data = self._encode(self.language, self.schedule)
+        atomic_write(self.path, data)
+
+    def close(self):
+        pass
+
+
+# --- 精簡二進位快照 ---
+class BinaryStore(JsonStore):
+    """
+    與 JsonStore 相同的整份快照，但以 binary_snapshot 格式寫入 .ffsnap 檔案，
+    檔案較小、讀寫較快。第一次使用時會自動匯入既有的 JSON 檔案 (原檔保留不動)。
+    """
+    def __init__(self, path):
+        super().__init__(os.path.splitext(path)[0] + '.ffsnap')
+        self.json_path = path
+
+    def load(self):
+        if not os.path.exists(self.path) and os.path.exists(self.json_path):
+            atomic_write(self.path, self._encode(*read_snapshot(self.json_path)))
+        return super().load()
+
+    def _read(self):
+        with open(self.path, 'rb') as f:
+            return binary_snapshot.decode(f.read())
+
+    def _encode(self, language, schedule):
+        return binary_snapshot.encode(language, schedule)
+
+
+# --- 只附加的日誌 + 背景壓縮 ---
+class JournalStore(_MemoryStore):
+    """
+    每次儲存只把變動的日期以一行 JSON 附加到日誌檔，成本取決於編輯的大小而非歷史長度。
+    日誌超過 COMPACT_BYTES 時由背景執行緒把內容併入快照 (與 JsonStore 相同格式的 JSON 檔)。
+    啟動時讀取快照並重播日誌；最後一行若因當機只寫了一半則捨棄。
+    中間無法解析的紀錄略過並複製到 .journal.bad 檔案，不影響之後的紀錄。
+    日誌紀錄都是「設定為某值」的冪等操作，壓縮途中當機時重複重播也不會出錯。
+    """
+    COMPACT_BYTES = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + '.journal'
+        self.quarantine_path = self.journal_path + '.bad'
+        self.language = DEFAULT_LANGUAGE
+        self.schedule = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._journal_size = 0
+        self._compactor = None
+
+    def load(self):
+        snapshot_error = None
+        with self._lock:
+            self.language, self.schedule, self._loaded = DEFAULT_LANGUAGE, {}, True
+            if os.path.exists(self.path):
+                try:
+                    self.language, self.schedule = read_snapshot(self.path)
+                except ValueError as e:
+                    # 快照損毀時仍重播日誌，盡量保留最近的編輯
+                    snapshot_error = e
+            else:
+                atomic_write(self.path, encode_snapshot(DEFAULT_LANGUAGE, {}))
+            self._journal_size = self._replay()
+            self._journal = open(self.journal_path, 'ab')
+        if snapshot_error: raise snapshot_error
+        if self._journal_size: self._start_compaction()
+        return self.language, dict(self.schedule)
+
+    def _replay(self):
+        """重播日誌並回傳最後一行完整紀錄的結尾位置；只有最後一行沒有換行 (寫到一半) 時會被截掉。"""
+        if not os.path.exists(self.journal_path): return 0
+        valid_end = 0
+        bad_lines = []
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'): break
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    bad_lines.append(line)
+                valid_end += len(line)
+        if bad_lines: self._quarantine(bad_lines)
+        if valid_end != os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as f: f.truncate(valid_end)
+        return valid_end
+
+    def _quarantine(self, lines):
+        try:
+            with open(self.quarantine_path, 'ab') as f: f.write(b''.join(lines))
+        except OSError as e:
+            print(f"無法保存損毀的日誌紀錄: {e}")
+        print(f"日誌中有 {len(lines)} 筆無法讀取的紀錄已略過，原始內容保存在 {self.quarantine_path}")
+
+    def _apply(self, record):
+        if 'language' in record:
+            self.language = str(record['language'])
+            return
+        date_str, day = record['date'], record['day']
+        if not isinstance(date_str, str) or not isinstance(day, (dict, type(None))): raise ValueError(f"無效的日誌紀錄: {record!r}")
+        apply_changes(self.schedule, {date_str: day}, [date_str])
+
+    def save(self, language, schedule, dates=None):
+        if not self._loaded: self.load()
+        with self._lock:
+            records = []
+            if language != self.language: records.append({'language': language})
+            if dates is None: dates = set(schedule) | set(self.schedule)
+            for date_str in dates:
+                day = schedule.get(date_str) or None
+                if day != self.schedule.get(date_str):
+                    records.append({'date': date_str, 'day': copy.deepcopy(day)})
+            if not records: return
+            data = b''.join(json.dumps(r, ensure_ascii=False).encode('utf-8') + b'\n' for r in records)
+            self._journal.write(data)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_size += len(data)
+            for record in records: self._apply(record)
+            should_compact = self._journal_size >= self.COMPACT_BYTES
+        if should_compact: self._start_compaction()
+
+    def _start_compaction(self):
+        if self._compactor and self._compactor.is_alive(): return
+        self._compactor = threading.Thread(target=self.compact, name="JournalCompaction", daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        """把目前狀態寫成新快照，再把壓縮期間新增的日誌紀錄保留下來。"""
+        with self._lock:
+            language, schedule = self.language, dict(self.schedule)
+            folded = self._journal_size
+        atomic_write(self.path, encode_snapshot(language, schedule))
+        with self._lock:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(folded)
+                tail = f.read()
+            self._journal.close()
+            atomic_write(self.journal_path, tail)
+            self._journal = open(self.journal_path, 'ab')
+            self._journal_size = len(tail)
+
+    def close(self):
+        if self._compactor: self._compactor.join()
+        with self._lock:
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+
+
+# --- SQLite 資料庫 ---
+class SqliteStore:
+    """
+    任務存放在以 (日期, 時間) 建立索引的資料表中，週檢視、搜尋與統計只查詢需要的資料列，
+    儲存則是以交易方式更新變動日期的資料列。
+    第一次使用時會自動匯入既有的 JSON 檔案 (原檔保留不動)。匯入與 settings 中的 json_import 標記在同一個交易中寫入；
+    匯入失敗時標記為 failed，錯誤在第一次 load_settings() 時拋出，下次開啟時再重試 (只補上資料庫中還沒有的日期)。
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS tasks (
+        date TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        time TEXT NOT NULL,
+        name TEXT NOT NULL,
+        PRIMARY KEY (date, position)
+    );
+    CREATE INDEX IF NOT EXISTS tasks_date_time ON tasks (date, time);
+    """
+
+    def __init__(self, path):
+        self.json_path = path
+        self.path = os.path.splitext(path)[0] + '.sqlite3'
+        self._lock = threading.Lock()
+        self._import_error = None
+        # 儲存可能在背景執行緒進行，所有存取都以 _lock 串行化
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(self.SCHEMA)
+            state = self._setting('json_import')
+            # 沒有標記但已有語言設定：舊版本建立、已經匯入過的資料庫
+            if state is None and (self._setting('language') is not None or not os.path.exists(self.json_path)):
+                state = 'done'
+                self._db.execute("INSERT INTO settings (key, value) VALUES ('json_import', 'done')")
+        if state != 'done': self._import_json()
+
+    def _setting(self, key):
+        row = self._db.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _import_json(self):
+        try:
+            language, schedule = read_snapshot(self.json_path)
+            with self._lock, self._db:
+                existing = {row[0] for row in self._db.execute("SELECT DISTINCT date FROM tasks")}
+                self._db.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('language', ?)", (language,))
+                for date_str, day in schedule.items():
+                    if date_str not in existing: self._insert_tasks(date_str, (day or {}).get('tasks', []))
+                self._db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('json_import', 'done')")
+        except (*STORAGE_ERRORS, AttributeError, KeyError, TypeError) as e:
+            self._import_error = e if isinstance(e, STORAGE_ERRORS) else ValueError(f"{self.json_path}: 資料格式錯誤 ({e!r})")
+            with self._lock, self._db:
+                self._db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('json_import', 'failed')")
+
+    def _insert_tasks(self, date_str, tasks):
+        self._db.executemany("INSERT INTO tasks (date, position, time, name) VALUES (?, ?, ?, ?)",
+                             [(date_str, i, task['time'], task['name']) for i, task in enumerate(tasks)])
+
+    def load(self):
+        language = self.load_settings()
+        with self._lock:
+            rows = self._db.execute("SELECT date, time, name FROM tasks ORDER BY date, position").fetchall()
+        return language, self._rows_to_schedule(rows)
+
+    def load_settings(self):
+        if self._import_error is not None:
+            # 只回報一次 (透過 GUI 的 load_error)，之後以資料庫中現有的資料繼續使用
+            error, self._import_error = self._import_error, None
+            raise error
+        with self._lock:
+            language = self._setting('language')
+        return language or DEFAULT_LANGUAGE
+
+    def load_range(self, first, last):
+        with self._lock:
+            rows = self._db.execute("SELECT date, time, name FROM tasks WHERE date BETWEEN ? AND ? ORDER BY date, position",
+                                    (first, last)).fetchall()
+        return self._rows_to_schedule(rows)
+
+    def search(self, text, limit=100):
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        with self._lock:
+            rows = self._db.execute("SELECT date, time, name FROM tasks WHERE name LIKE ? ESCAPE '\\' ORDER BY date, time LIMIT ?",
+                                    (pattern, limit)).fetchall()
+        return [(date_str, {'name': name, 'time': time_str}) for date_str, time_str, name in rows]
+
+    def stats(self, first, last):
+        with self._lock:
+            rows = self._db.execute("SELECT date, COUNT(*) FROM tasks WHERE date BETWEEN ? AND ? GROUP BY date",
+                                    (first, last)).fetchall()
+        return dict(rows)
+
+    def save(self, language, schedule, dates=None):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('language', ?)", (language,))
+            if dates is None:
+                self._db.execute("DELETE FROM tasks")
+                dates = schedule
+            for date_str in dates:
+                self._db.execute("DELETE FROM tasks WHERE date = ?", (date_str,))
+                self._insert_tasks(date_str, (schedule.get(date_str) or {}).get('tasks', []))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _rows_to_schedule(rows):
+        schedule = {}
+        for date_str, time_str, name in rows:
+            schedule.setdefault(date_str, {'tasks': []})['tasks'].append({'name': name, 'time': time_str})
+        return schedule
+
+
+# --- 每月一個分片檔案 ---
+class ShardedStore:
+    """
+    資料目錄中包含 settings.json (語言)、manifest.json (有資料的月份清單) 以及每月一個 YYYY-MM.json 分片。
+    讀取日期範圍時只開啟涵蓋到的分片；儲存時只重寫有變動的月份，各檔案皆以 atomic_write 寫入。
+    manifest.json 同時作為遷移的標記：不存在時會從既有的 JSON 檔案匯入一次 (原檔保留不動)。
+    JSON 檔案損毀時只回報一次錯誤並以空白資料繼續 (清單記為 'failed')，下次啟動再重試，只匯入還沒有資料的日期。
+    新增月份時先更新清單再寫分片、移除月份時先刪分片再更新清單，
+    中途當機最多只會留下指向不存在分片的清單項目，讀取時視為空白月份。
+    """
+    MANIFEST_VERSION = 1
+
+    def __init__(self, path):
+        self.json_path = path
+        self.dir = os.path.splitext(path)[0] + '_shards'
+        self.settings_path = os.path.join(self.dir, 'settings.json')
+        self.manifest_path = os.path.join(self.dir, 'manifest.json')
+        self._lock = threading.Lock()
+        self._language = DEFAULT_LANGUAGE
+        self._months = None
+        self._json_import = 'done'
+        self._import_error = None
+
+    def _ensure_layout(self):
+        """第一次存取時讀取設定與清單；沒有清單 (或上次匯入失敗) 時匯入既有的 JSON 檔案。需持有 _lock。"""
+        if self._months is not None: return
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if os.path.exists(self.settings_path):
+                with open(self.settings_path, 'r', encoding='utf-8') as f:
+                    self._language = json.load(f).get('language', DEFAULT_LANGUAGE)
+            self._months = set(manifest.get('months', []))
+            self._json_import = manifest.get('json_import', 'done')
+            if self._json_import == 'done' or not os.path.exists(self.json_path): return
+        else:
+            os.makedirs(self.dir, exist_ok=True)
+            self._months = set()
+            if not os.path.exists(self.json_path):
+                self._write_manifest(set())
+                return
+        self._import_json()
+
+    def _import_json(self):
+        """將 JSON 檔案中還沒有資料的日期併入分片；失敗時記下錯誤，由 load_settings/load 回報一次。"""
+        try:
+            language, schedule = read_snapshot(self.json_path)
+            shards = {}
+            for date_str, day in schedule.items():
+                if day: shards.setdefault(date_str[:7], {})[date_str] = day
+        except (*STORAGE_ERRORS, AttributeError, TypeError) as e:
+            self._import_error = e if isinstance(e, STORAGE_ERRORS) else ValueError(f"{self.json_path}: 資料格式錯誤 ({e!r})")
+            self._json_import = 'failed'
+            self._write_manifest(self._months)
+            return
+        for month, days in shards.items():
+            if month in self._months: days = {**days, **self._read_shard(month)}
+            atomic_write(self._shard_path(month), self._encode(days))
+        if not os.path.exists(self.settings_path):
+            atomic_write(self.settings_path, self._encode({'language': language}))
+            self._language = language
+        # 最後才寫入清單，匯入中途失敗時下次啟動會重新匯入
+        self._json_import = 'done'
+        self._write_manifest(self._months | set(shards))
+
+    def _take_import_error(self):
+        # 只回報一次 (透過 GUI 的 load_error)，之後以分片中現有的資料繼續使用
+        error, self._import_error = self._import_error, None
+        if error is not None: raise error
+
+    def _shard_path(self, month):
+        return os.path.join(self.dir, month + '.json')
+
+    @staticmethod
+    def _encode(data):
+        return json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')
+
+    def _write_manifest(self, months):
+        manifest = {'version': self.MANIFEST_VERSION, 'months': sorted(months)}
+        if self._json_import != 'done': manifest['json_import'] = self._json_import
+        atomic_write(self.manifest_path, self._encode(manifest))
+        self._months = set(months)
+
+    def _read_shard(self, month):
+        if month not in self._months: return {}
+        try:
+            with open(self._shard_path(month), 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return {}
+        return json.loads(content) if content else {}
+
+    def load(self):
+        with self._lock:
+            self._ensure_layout()
+            self._take_import_error()
+            schedule = {}
+            for month in sorted(self._months): schedule.update(self._read_shard(month))
+            return self._language, schedule
+
+    def load_settings(self):
+        with self._lock:
+            self._ensure_layout()
+            self._take_import_error()
+            return self._language
+
+    def load_range(self, first, last):
+        with self._lock:
+            self._ensure_layout()
+            schedule = {}
+            for month in sorted(self._months):
+                if not (first[:7] <= month <= last[:7]): continue
+                for date_str, day in self._read_shard(month).items():
+                    if first <= date_str <= last: schedule[date_str] = day
+            return schedule
+
+    def search(self, text, limit=100):
+        with self._lock:
+            self._ensure_layout()
+            months = sorted(self._months)
+        results = []
+        for month in months:
+            # 逐月讀取，找到足夠的結果就停止，不必開啟所有分片
+            with self._lock:
+                shard = self._read_shard(month)
+            for date_str in sorted(shard):
+                for task in sorted(shard[date_str].get('tasks', []), key=lambda t: t.get('time', '')):
+                    if text in task.get('name', ''):
+                        results.append((date_str, task))
+                        if len(results) >= limit: return results
+        return results
+
+    def stats(self, first, last):
+        return {date_str: len(day.get('tasks', [])) for date_str, day in self.load_range(first, last).items()}
+
+    def save(self, language, schedule, dates=None):
+        with self._lock:
+            self._ensure_layout()
+            if dates is None:
+                # 整份儲存：直接以新內容建立分片，已經沒有資料的月份一併移除
+                shards = {month: {} for month in self._months}
+                for date_str, day in schedule.items():
+                    if day: shards.setdefault(date_str[:7], {})[date_str] = day
+            else:
+                shards = {}
+                for date_str in dates:
+                    month = date_str[:7]
+                    if month not in shards: shards[month] = self._read_shard(month)
+                    apply_changes(shards[month], schedule, [date_str])
+            months = (self._months - set(shards)) | {month for month, shard in shards.items() if shard}
+            if months - self._months: self._write_manifest(self._months | months)
+            for month, shard in shards.items():
+                if shard: atomic_write(self._shard_path(month), self._encode(shard))
+                elif os.path.exists(self._shard_path(month)): os.remove(self._shard_path(month))
+            if months != self._months: self._write_manifest(months)
+            if language != self._language:
+                atomic_write(self.settings_path, self._encode({'language': language}))
+                self._language = language
+
+    def close(self):
+        pass
+
+
+# --- 依日期範圍載入的快取 ---
+class WindowedSchedule:
+    """
+    以 dict 介面包裝儲存後端，只保留最近使用的 max_ranges 個日期範圍 (LRU)。
+    畫面需要某段日期前必須先呼叫 ensure()；未載入的日期視為不存在。
+    尚未確認寫入的編輯保存在 pending 中，不會隨範圍被淘汰，
+    直到 mark_saved() 收到相同內容已寫入的通知為止。
+    """
+    def __init__(self, store, max_ranges=8):
+        self.store = store
+        self.max_ranges = max_ranges
+        self._ranges = OrderedDict()
+        self._pending = {}
+
+    def ensure(self, first, last):
+        for (range_first, range_last) in self._ranges:
+            if range_first <= first and last <= range_last:
+                self._ranges.move_to_end((range_first, range_last))
+                return
+        try:
+            days = self.store.load_range(first, last)
+        except STORAGE_ERRORS:
+            # 讀取失敗時記為空白範圍，避免每次切換都重試並重複跳出錯誤
+            self._remember(first, last, {})
+            raise
+        self._remember(first, last, days)
+
+    def _remember(self, first, last, days):
+        # 背景存檔還沒寫入的編輯蓋過剛讀到的舊資料，否則 mark_saved 移除 pending 後會查到舊內容
+        for date_str, day in self._pending.items():
+            if not first <= date_str <= last: continue
+            if day: days[date_str] = day
+            else: days.pop(date_str, None)
+        self._ranges[(first, last)] = days
+        while len(self._ranges) > self.max_ranges:
+            self._ranges.popitem(last=False)
+
+    def loaded_ranges(self):
+        return list(self._ranges)
+
+    def mark_saved(self, saved):
+        """saved 為已寫入的 {日期: 資料}；內容與 pending 相同才移除，之後又被編輯的日期會保留。"""
+        for date_str, day in saved.items():
+            if date_str in self._pending and self._pending[date_str] == (day or None):
+                del self._pending[date_str]
+
+    def apply_remote(self, days):
+        """
+        套用其他程式 (例如透過計時守護行程) 寫入的 {日期: 資料或 None}，回傳實際更新的日期。
+        本地尚未寫入的編輯優先，不會被覆蓋。
+        """
+        updated = []
+        for date_str, day in days.items():
+            if date_str in self._pending: continue
+            for (first, last), loaded in self._ranges.items():
+                if not first <= date_str <= last: continue
+                if day: loaded[date_str] = day
+                else: loaded.pop(date_str, None)
+                if date_str not in updated: updated.append(date_str)
+        return updated
+
+    def _lookup(self, date_str):
+        if date_str in self._pending: return self._pending[date_str]
+        for days in reversed(self._ranges.values()):
+            if date_str in days: return days[date_str]
+        return None
+
+    def get(self, date_str, default=None):
+        day = self._lookup(date_str)
+        return default if day is None else day
+
+    def __contains__(self, date_str):
+        return self._lookup(date_str) is not None
+
+    def __getitem__(self, date_str):
+        day = self._lookup(date_str)
+        if day is None: raise KeyError(date_str)
+        return day
+
+    def __setitem__(self, date_str, day):
+        self._pending[date_str] = day
+        for (first, last), days in self._ranges.items():
+            if first <= date_str <= last: days[date_str] = day
+
+    def __delitem__(self, date_str):
+        if date_str not in self: raise KeyError(date_str)
+        self._pending[date_str] = None
+        for days in self._ranges.values(): days.pop(date_str, None)
+
+
+STORAGE_BACKENDS = {
+    'json': JsonStore,
+    'journal': JournalStore,
+    'sqlite': SqliteStore,
+    'sharded': ShardedStore,
+    'binary': BinaryStore,
+}
+DEFAULT_BACKEND = 'sharded'
+
+
+def open_store(mode, path):
+    return STORAGE_BACKENDS[mode](path)
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# 模組都放在專案根目錄 (沒有套件)，與 benchmarks/ 相同的方式加入搜尋路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """QTimer、跨執行緒的訊號與元件測試共用的 QApplication (offscreen 平台，不需要螢幕)。"""
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,101 @@
+import os
+import struct
+import zlib
+
+import pytest
+
+import binary_snapshot
+import storage
+
+SCHEDULE = {
+    '2026-10-12': {'tasks': [{'name': "寫報告", 'time': '09:00'}, {'name': "開會", 'time': '14:30'}]},
+    '2026-10-13': {'tasks': [{'name': "寫報告", 'time': '00:00'}]},
+    '2026-10-20': {'tasks': [{'name': "Code review", 'time': '23:59'}]},
+}
+
+
+def test_round_trip():
+    assert binary_snapshot.decode(binary_snapshot.encode('ja', SCHEDULE)) == ('ja', SCHEDULE)
+
+
+def test_round_trip_empty():
+    assert binary_snapshot.decode(binary_snapshot.encode('en', {})) == ('en', {})
+
+
+def test_round_trip_keeps_days_the_compact_fields_cannot_hold():
+    # 時間格式不標準、缺少時間或有額外欄位的日期原樣存在 JSON 區段中
+    schedule = dict(SCHEDULE)
+    schedule['2026-10-14'] = {'tasks': [{'name': "閱讀", 'time': '9:5'}]}
+    schedule['2026-10-15'] = {'tasks': [{'name': "運動"}], 'note': "x"}
+    assert binary_snapshot.decode(binary_snapshot.encode('zh_TW', schedule)) == ('zh_TW', schedule)
+
+
+def test_round_trip_large_indexes():
+    # 超過 1 byte 的陣列型別與 varint
+    schedule = {f"2026-{month:02d}-{day:02d}": {'tasks': [{'name': f"task {month}-{day}-{i}", 'time': f"{i:02d}:00"} for i in range(5)]}
+                for month in range(1, 13) for day in range(1, 29)}
+    assert binary_snapshot.decode(binary_snapshot.encode('en', schedule)) == ('en', schedule)
+
+
+def test_truncated_at_every_length_raises_value_error():
+    data = binary_snapshot.encode('ja', SCHEDULE)
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            binary_snapshot.decode(data[:length])
+
+
+def test_bad_crc():
+    data = bytearray(binary_snapshot.encode('ja', SCHEDULE))
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="檢查碼"):
+        binary_snapshot.decode(bytes(data))
+
+
+def test_flipped_body_byte_fails_crc():
+    data = bytearray(binary_snapshot.encode('ja', SCHEDULE))
+    data[10] ^= 0x01
+    with pytest.raises(ValueError):
+        binary_snapshot.decode(bytes(data))
+
+
+def test_bad_magic_and_newer_version():
+    data = binary_snapshot.encode('ja', SCHEDULE)
+    with pytest.raises(ValueError):
+        binary_snapshot.decode(b'XXXX' + data[4:])
+    with pytest.raises(ValueError, match="版本"):
+        binary_snapshot.decode(data[:4] + bytes([binary_snapshot.VERSION + 1]) + data[5:])
+
+
+def test_corrupt_body_with_valid_crc_raises_value_error():
+    # 檢查碼正確但內容不一致 (例如手動修改後重新計算)，不應拋出 ValueError 以外的例外
+    data = binary_snapshot.encode('ja', SCHEDULE)
+    header, body = data[:6], bytearray(data[6:-4])
+    for i in range(len(body)):
+        corrupt = bytearray(body)
+        corrupt[i] ^= 0xFF
+        try:
+            binary_snapshot.decode(header + bytes(corrupt) + struct.pack('<I', zlib.crc32(corrupt)))
+        except ValueError:
+            pass
+
+
+def open_binary_store(tmp_path):
+    return storage.open_store('binary', str(tmp_path / 'pomodoro_schedule.json'))
+
+
+def test_binary_store_imports_existing_json_once(tmp_path):
+    (tmp_path / 'pomodoro_schedule.json').write_bytes(storage.encode_snapshot('ja', SCHEDULE))
+    store = open_binary_store(tmp_path)
+    assert store.load() == ('ja', SCHEDULE)
+    store.save('ja', {}, list(SCHEDULE))
+    store.close()
+    assert open_binary_store(tmp_path).load() == ('ja', {})
+
+
+def test_binary_store_reports_a_corrupt_snapshot(tmp_path):
+    store = open_binary_store(tmp_path)
+    store.save('en', SCHEDULE)
+    with open(store.path, 'r+b') as f:
+        f.truncate(os.path.getsize(store.path) - 3)
+    with pytest.raises(storage.STORAGE_ERRORS):
+        open_binary_store(tmp_path).load()
@@ -0,0 +1,204 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+import focus_daemon
+import jsonrpc
+import storage
+
+NOW = datetime(2026, 10, 18, 9, 30)
+TODAY = NOW.date().isoformat()
+TASKS = [{'name': "A", 'time': '09:00'}, {'name': "B", 'time': '10:00'}, {'name': "C", 'time': '11:00'}]
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+class Client:
+    """以一行一個 JSON 的協定連線；回應之前收到的事件保存在 events。"""
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.ids = iter(range(1, 1000))
+        self.events = []
+
+    async def send_line(self, line):
+        self.writer.write(line + b'\n')
+        await self.writer.drain()
+
+    async def call(self, cmd, **args):
+        request_id = next(self.ids)
+        await self.send_line(json.dumps({'id': request_id, 'cmd': cmd, **args}).encode('utf-8'))
+        while True:
+            message = json.loads(await asyncio.wait_for(self.reader.readline(), 5))
+            if 'event' in message: self.events.append(message)
+            elif message.get('id') == request_id: return message
+
+    async def rpc(self, method, **params):
+        request_id = next(self.ids)
+        await self.send_line(json.dumps(jsonrpc_request(method, params, request_id)).encode('utf-8'))
+        while True:
+            message = json.loads(await asyncio.wait_for(self.reader.readline(), 5))
+            if 'method' in message: self.events.append(message)
+            elif message.get('id') == request_id: return message
+
+    async def close(self):
+        self.writer.close()
+
+
+def jsonrpc_request(method, params, request_id):
+    return {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': request_id}
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """執行 body(daemon, connect)；connect() 開啟一個新的連線。"""
+    monkeypatch.setattr(focus_daemon, 'datetime', FixedDatetime)
+    config_file = str(tmp_path / 'pomodoro_schedule.json')
+    seed = storage.open_store('json', config_file)
+    seed.save('en', {TODAY: {'tasks': TASKS}})
+    seed.close()
+
+    def runner(body, address=None, connection_class=focus_daemon.Connection):
+        async def main():
+            daemon = focus_daemon.FocusDaemon(storage.open_store('json', config_file), token='secret')
+            server = await daemon.serve(address or str(tmp_path / 'd.sock'), connection_class)
+            async def connect():
+                if isinstance(server.sockets[0].getsockname(), str):
+                    return Client(*await asyncio.open_unix_connection(server.sockets[0].getsockname()))
+                return Client(*await asyncio.open_connection(*server.sockets[0].getsockname()[:2]))
+            try:
+                return await body(daemon, connect)
+            finally:
+                server.close()
+                await daemon.close()
+                daemon.store.close()
+        return asyncio.run(main())
+    return runner
+
+
+def test_segments_survive_the_wire_format():
+    schedule = focus_daemon.schedule_engine.plan_day(TASKS, (25, 5), NOW)
+    records = json.loads(json.dumps([focus_daemon.schedule_engine.segment_to_dict(segment) for segment in schedule]))
+    assert [focus_daemon.schedule_engine.segment_from_dict(record) for record in records] == schedule
+
+
+def test_tcp_connections_must_authenticate_first(run):
+    async def body(daemon, connect):
+        client = await connect()
+        assert (await client.call('status'))['ok'] is False
+        assert await client.reader.readline() == b''  # 未驗證的連線立即中斷
+        client = await connect()
+        assert (await client.call('auth', token='wrong'))['ok'] is False
+        client = await connect()
+        assert (await client.call('auth', token='secret'))['ok'] is True
+        assert (await client.call('status'))['ok'] is True
+        await client.send_line(b'GET / HTTP/1.1')
+        assert await client.reader.readline() == b''
+    run(body, ('127.0.0.1', 0))
+
+
+@pytest.mark.parametrize('days, dates', [
+    ({TODAY: "x"}, [TODAY]),
+    ({TODAY: {'tasks': [{'name': "a", 'time': 'bad'}]}}, [TODAY]),
+    ({TODAY: {'tasks': [{'name': "", 'time': '10:00'}]}}, [TODAY]),
+    ({TODAY: {'tasks': "a"}}, [TODAY]),
+    ({'2026-13-01': {'tasks': TASKS}}, ['2026-13-01']),
+    ({TODAY: None}, ["today"]),
+    ({TODAY: None}, None),
+])
+def test_save_rejects_malformed_days(run, days, dates):
+    async def body(daemon, connect):
+        client = await connect()
+        response = await client.call('save', language='en', days=days, dates=dates)
+        assert response['ok'] is False, response
+        assert (await client.call('load_range', first=TODAY, last=TODAY))['result'] == {TODAY: {'tasks': TASKS}}
+        assert (await client.call('status'))['ok'] is True
+    run(body)
+
+
+def test_save_normalizes_times_and_does_not_replan(run):
+    async def body(daemon, connect):
+        gui, other = await connect(), await connect()
+        await other.call('subscribe')
+        started = await gui.call('start', mode=[20, 5], restart=True)
+        edited = TASKS + [{'name': "D", 'time': '9:45'}]
+        assert (await gui.call('save', language='en', days={TODAY: {'tasks': edited}}, dates=[TODAY]))['ok']
+        assert (await gui.call('load_range', first=TODAY, last=TODAY))['result'][TODAY]['tasks'][-1] == {'name': "D", 'time': '09:45'}
+        # 自動存檔只寫入資料；排程由 GUI 回到計時畫面時以 update_plan 更新
+        assert (await gui.call('status'))['result']['plan'] == started['result']
+        await other.call('ping')
+        assert [event['event'] for event in other.events] == ['started', 'saved']
+    run(body)
+
+
+def test_update_plan_replaces_the_tail_and_tells_other_clients(run):
+    async def body(daemon, connect):
+        gui, other = await connect(), await connect()
+        await other.call('subscribe')
+        plan = (await gui.call('start', mode=[20, 5], restart=True))['result']
+        gui_id = (await gui.call('ping'))['result']['connection']
+        tail = focus_daemon.schedule_engine.replan_tail(
+            [focus_daemon.schedule_engine.segment_from_dict(record) for record in plan], -1, TASKS[1:], (20, 5), NOW)
+        records = [focus_daemon.schedule_engine.segment_to_dict(segment) for segment in tail]
+        assert (await gui.call('update_plan', segments=records))['ok']
+        assert (await gui.call('status'))['result']['plan'] == records
+        await other.call('ping')
+        assert other.events[-1]['event'] == 'plan' and other.events[-1]['origin'] == gui_id
+        assert (await gui.call('update_plan', segments=[]))['ok'] is False
+        await gui.call('stop')
+        assert (await gui.call('update_plan', segments=records))['ok'] is False
+    run(body)
+
+
+def test_rpc_tcp_connections_must_authenticate_first(run):
+    async def body(daemon, connect):
+        client = await connect()
+        assert (await client.rpc('system.ping'))['error']['code'] == jsonrpc.UNAUTHORIZED
+        assert await client.reader.readline() == b''
+        client = await connect()
+        assert (await client.rpc('system.auth', token='wrong'))['error']['code'] == jsonrpc.UNAUTHORIZED
+        client = await connect()
+        assert (await client.rpc('system.auth', token='secret'))['result'] is True
+        assert 'version' in (await client.rpc('system.ping'))['result']
+    run(body, ('127.0.0.1', 0), focus_daemon.RpcConnection)
+
+
+def test_rpc_parse_error_closes_the_connection(run):
+    async def body(daemon, connect):
+        client = await connect()
+        await client.send_line(b'{"jsonrpc": "2.0", "method"')
+        assert json.loads(await client.reader.readline())['error']['code'] == jsonrpc.PARSE_ERROR
+        assert await client.reader.readline() == b''
+    run(body, connection_class=focus_daemon.RpcConnection)
+
+
+def test_rpc_batch_and_invalid_params(run):
+    async def body(daemon, connect):
+        client = await connect()
+        batch = [jsonrpc_request('schedule.get', {'date': TODAY}, 1), jsonrpc_request('schedule.get', {'date': 'today'}, 2)]
+        await client.send_line(json.dumps(batch).encode('utf-8'))
+        responses = json.loads(await client.reader.readline())
+        assert responses[0]['result'] == {'date': TODAY, 'tasks': TASKS}
+        assert responses[1]['error']['code'] == jsonrpc.INVALID_PARAMS
+        response = await client.rpc('schedule.add_task', date=TODAY, name="D", time='25:00')
+        assert response['error']['code'] == jsonrpc.INVALID_PARAMS
+    run(body, connection_class=focus_daemon.RpcConnection)
+
+
+def test_rpc_edit_of_today_replans_the_running_session(run):
+    async def body(daemon, connect):
+        client = await connect()
+        await client.rpc('timer.subscribe')
+        plan = (await client.rpc('timer.start', mode=[20, 5], restart=True))['result']
+        tasks = (await client.rpc('schedule.add_task', date=TODAY, name="D", time='12:00'))['result']
+        assert tasks[-1] == {'name': "D", 'time': '12:00'}
+        current = (await client.rpc('plan.today'))['result']
+        assert current['running'] and len(current['segments']) == len(plan) + 2
+        assert [event['method'] for event in client.events][-1] == 'timer.transition'
+        assert client.events[-1]['params']['event'] == 'plan'
+    run(body, connection_class=focus_daemon.RpcConnection)
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+import headless
+import storage
+
+
+def test_malformed_task_time_is_reported_without_a_traceback(tmp_path, capsys):
+    config_file = str(tmp_path / 'pomodoro_schedule.json')
+    today = datetime.now().date().isoformat()
+    store = storage.open_store('json', config_file)
+    store.save('en', {today: {'tasks': [{'name': "A", 'time': '9h30'}]}})
+    store.close()
+    assert headless.main(['--headless', '--storage', 'json'], config_file) == 1
+    assert "Load Error: 無效的時間: '9h30'" in capsys.readouterr().err
@@ -0,0 +1,67 @@
+import asyncio
+
+import jsonrpc
+
+
+def make_dispatcher():
+    dispatcher = jsonrpc.Dispatcher()
+
+    async def add(connection, a, b=0):
+        return a + b
+
+    async def fail(connection):
+        raise RuntimeError("boom")
+
+    async def who(connection):
+        return connection
+
+    dispatcher.register('math.add', add)
+    dispatcher.register('fail', fail)
+    dispatcher.register('who', who)
+    return dispatcher
+
+
+def call(payload, connection='conn'):
+    return asyncio.run(make_dispatcher().handle(payload, connection))
+
+
+def test_named_and_positional_params():
+    assert call({'jsonrpc': '2.0', 'method': 'math.add', 'params': {'a': 1, 'b': 2}, 'id': 1}) == {'jsonrpc': '2.0', 'result': 3, 'id': 1}
+    assert call({'jsonrpc': '2.0', 'method': 'math.add', 'params': [5], 'id': 'x'})['result'] == 5
+    assert call({'jsonrpc': '2.0', 'method': 'who', 'id': 2}, connection='c1')['result'] == 'c1'
+
+
+def test_notification_has_no_response():
+    assert call({'jsonrpc': '2.0', 'method': 'math.add', 'params': [1, 2]}) is None
+
+
+def test_batch():
+    responses = call([
+        {'jsonrpc': '2.0', 'method': 'math.add', 'params': [1, 1], 'id': 1},
+        {'jsonrpc': '2.0', 'method': 'math.add', 'params': [1, 1]},
+        {'jsonrpc': '2.0', 'method': 'nope', 'id': 3},
+    ])
+    assert [response['id'] for response in responses] == [1, 3]
+    assert responses[1]['error']['code'] == jsonrpc.METHOD_NOT_FOUND
+    assert call([{'jsonrpc': '2.0', 'method': 'math.add', 'params': [1, 1]}]) is None
+
+
+def test_error_codes():
+    assert call([])['error']['code'] == jsonrpc.INVALID_REQUEST
+    assert call([1])[0]['error']['code'] == jsonrpc.INVALID_REQUEST
+    assert call({'method': 'math.add', 'id': 1})['error']['code'] == jsonrpc.INVALID_REQUEST
+    assert call({'jsonrpc': '2.0', 'method': 'math.add', 'params': {'c': 1}, 'id': 1})['error']['code'] == jsonrpc.INVALID_PARAMS
+    assert call({'jsonrpc': '2.0', 'method': 'math.add', 'params': 5, 'id': 1})['error']['code'] == jsonrpc.INVALID_PARAMS
+    response = call({'jsonrpc': '2.0', 'method': 'fail', 'id': 7})
+    assert response['error'] == {'code': jsonrpc.INTERNAL_ERROR, 'message': "Internal error", 'data': "boom"}
+    assert response['id'] == 7
+
+
+def test_parse_error():
+    try:
+        jsonrpc.parse(b'{bad')
+    except jsonrpc.RpcError as e:
+        assert e.code == jsonrpc.PARSE_ERROR
+    else:
+        raise AssertionError("parse() 應拋出 RpcError")
+    assert jsonrpc.parse(b'{"a": 1}\n') == {'a': 1}
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from save_worker import BackgroundWriter
+
+
+class FakeStore:
+    """記錄每次 save 的參數；failures 大於 0 時拋出 OSError 並遞減。"""
+    def __init__(self, failures=0):
+        self.calls = []
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def save(self, language, schedule, dates=None):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            self.calls.append((language, schedule, dates))
+
+
+@pytest.fixture
+def make_writer(qapp):
+    writers = []
+
+    def make(store):
+        writer = BackgroundWriter(store)
+        writer.COALESCE_SECONDS = writer.RETRY_SECONDS = 0.05
+        writer.errors = []
+        writer.save_failed.connect(writer.errors.append)
+        writers.append(writer)
+        return writer
+    yield make
+    for writer in writers:
+        writer.store.failures = 0
+        writer.close(timeout=2.0)
+
+
+def day(name):
+    return {'tasks': [{'name': name, 'time': '09:00'}]}
+
+
+def test_edits_are_coalesced_into_one_write(make_writer):
+    store = FakeStore()
+    writer = make_writer(store)
+    schedule = {'2026-10-18': day("A")}
+    writer.submit('en', schedule, ['2026-10-18'])
+    schedule['2026-10-18'] = day("B")  # 送出後的修改不影響已取得的快照
+    writer.submit('en', {'2026-10-19': day("C")}, ['2026-10-19', '2026-10-20'])
+    assert writer.flush(timeout=2.0)
+    assert len(store.calls) == 1
+    language, saved, dates = store.calls[0]
+    assert saved == {'2026-10-18': day("A"), '2026-10-19': day("C"), '2026-10-20': None}
+    assert sorted(dates) == ['2026-10-18', '2026-10-19', '2026-10-20']
+
+
+def test_failed_write_is_retried_and_reported_once(make_writer, qapp):
+    store = FakeStore(failures=2)
+    writer = make_writer(store)
+    writer.submit('en', {'2026-10-18': day("A")}, ['2026-10-18'])
+    assert not writer.flush(timeout=2.0)
+    assert writer.last_error == "disk full"
+    deadline = time.monotonic() + 2.0
+    while not store.calls and time.monotonic() < deadline: time.sleep(0.01)
+    assert store.calls == [('en', {'2026-10-18': day("A")}, ['2026-10-18'])]
+    qapp.processEvents()  # save_failed 由背景執行緒送出，排入事件佇列
+    assert writer.errors == ["disk full"] and writer.last_error is None
+
+
+def test_newer_edits_win_over_a_requeued_batch(make_writer):
+    store = FakeStore(failures=1)
+    writer = make_writer(store)
+    writer.submit('en', {'2026-10-18': day("old"), '2026-10-19': day("kept")}, ['2026-10-18', '2026-10-19'])
+    assert not writer.flush(timeout=2.0)
+    writer.submit('ja', {'2026-10-18': day("new")}, ['2026-10-18'])
+    assert writer.flush(timeout=2.0)
+    assert store.calls[-1][:2] == ('ja', {'2026-10-18': day("new"), '2026-10-19': day("kept")})
+
+
+def test_close_reports_a_failed_last_write_and_can_be_retried(make_writer):
+    store = FakeStore(failures=1)
+    writer = make_writer(store)
+    writer.submit('en', {'2026-10-18': day("A")}, ['2026-10-18'])
+    assert writer.close(timeout=2.0) is False
+    assert writer.last_error == "disk full" and store.calls == []
+    # 資料仍在佇列中；再次 close() 會重新寫入
+    assert writer.close(timeout=2.0) is True
+    assert store.calls == [('en', {'2026-10-18': day("A")}, ['2026-10-18'])]
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import schedule_engine
+
+TASKS = [{'name': "B", 'time': '11:00'}, {'name': "A", 'time': '10:00'}, {'name': "C", 'time': '12:00'}]
+
+
+def work_names(schedule):
+    return [segment.name for segment in schedule if segment.type == 'work']
+
+
+@pytest.mark.parametrize('text, minute', [('00:00', 0), ('09:05', 545), ('23:59', 1439), (' 9:05', 545)])
+def test_parse_time(text, minute):
+    assert schedule_engine.parse_time(text) == minute
+
+
+@pytest.mark.parametrize('text', ['bad', '24:00', '10:60', '1:2:3', '', '-1:30', 5, None])
+def test_parse_time_rejects_malformed_values(text):
+    with pytest.raises(ValueError, match="無效的時間"):
+        schedule_engine.parse_time(text)
+
+
+def test_check_mode():
+    assert schedule_engine.check_mode((25, 5)) == (25, 5)
+    for mode in [(0, 5), (25,), [25, 5], (25, 5.0)]:
+        with pytest.raises(ValueError):
+            schedule_engine.check_mode(mode)
+
+
+def test_build_schedule_is_a_continuous_chain_starting_at_the_next_task():
+    now = datetime(2026, 10, 18, 10, 30)
+    entries = schedule_engine.sort_tasks(TASKS)
+    start_index = schedule_engine.find_start_index(entries, now)
+    schedule = schedule_engine.build_schedule(entries, (20, 5), now, start_index)
+    assert work_names(schedule) == ["B", "C", "A"]
+    assert schedule[0].start == datetime(2026, 10, 18, 11, 0)
+    assert all(a.end == b.start for a, b in zip(schedule, schedule[1:]))
+    assert schedule_engine.find_overlap(schedule) == -1
+
+
+def test_plan_day_when_all_tasks_are_past():
+    now = datetime(2026, 10, 18, 23, 0)
+    assert schedule_engine.plan_day(TASKS, (20, 5), now, restart_if_past=False) is None
+    assert work_names(schedule_engine.plan_day(TASKS, (20, 5), now)) == ["A", "B", "C"]
+    assert schedule_engine.plan_day([], (20, 5), now) == []
+
+
+def test_plan_batch_matches_plan_day():
+    data = {'2026-10-18': {'tasks': TASKS}, '2026-10-19': {'tasks': TASKS[:1]}}
+    now = datetime(2026, 10, 18, 10, 30)
+    plans = schedule_engine.plan_batch(data, ['2026-10-18', '2026-10-19'], [(20, 5), (25, 10)], now)
+    assert len(plans) == 4
+    assert plans[('2026-10-18', (25, 10))] == schedule_engine.plan_day(TASKS, (25, 10), now)
+    assert plans[('2026-10-19', (20, 5))] == schedule_engine.plan_day(TASKS[:1], (20, 5), datetime(2026, 10, 19))
+
+
+def test_replan_tail_keeps_consumed_tasks_when_they_are_renamed():
+    schedule = schedule_engine.plan_day(TASKS, (20, 5), datetime(2026, 10, 18, 9, 0))
+    renamed = [{'name': "A (typo fixed)", 'time': '10:00'}, {'name': "B renamed", 'time': '11:00'}, {'name': "C", 'time': '12:00'}]
+    # 正在進行 B 的工作區段
+    new = schedule_engine.replan_tail(schedule, 2, renamed, (20, 5), datetime(2026, 10, 18, 10, 30))
+    assert work_names(new) == ["A", "B", "C"]
+    assert new[:3] == schedule[:3]
+
+
+def test_replan_tail_adds_new_tasks_after_the_current_segment():
+    schedule = schedule_engine.plan_day(TASKS, (20, 5), datetime(2026, 10, 18, 9, 0))
+    tasks = TASKS + [{'name': "D", 'time': '10:30'}]
+    new = schedule_engine.replan_tail(schedule, 0, tasks, (20, 5), datetime(2026, 10, 18, 9, 10))
+    assert work_names(new) == ["A", "D", "B", "C"]
+    assert new[0] == schedule[0]
+    assert new[1].next_name == "D"
+
+
+def cached_plan(cache, tasks, now, mode=(20, 5), date_str='2026-10-18'):
+    content, entries = cache.sorted_entries(date_str, tasks)
+    start_index = max(schedule_engine.find_start_index(entries, now), 0)
+    return cache.build(date_str, content, entries, mode, now, start_index)
+
+
+def test_plan_cache_reuses_plans_until_the_tasks_change():
+    cache = schedule_engine.PlanCache()
+    now = datetime(2026, 10, 18, 9, 0, 5)
+    plan = cached_plan(cache, TASKS, now)
+    assert plan.segments == schedule_engine.plan_day(TASKS, (20, 5), now)
+    # 起始任務還沒到時，開始時間與按下按鈕的秒數無關
+    assert cached_plan(cache, TASKS, now + timedelta(seconds=40)) is plan
+    assert cached_plan(cache, list(TASKS), now) is plan
+    assert cached_plan(cache, TASKS, now, mode=(25, 10)) is not plan
+    edited = TASKS[:2] + [{'name': "C", 'time': '12:30'}]
+    assert cached_plan(cache, edited, now).segments == schedule_engine.plan_day(edited, (20, 5), now)
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_plan_cache_restart_from_the_first_task_is_not_reused():
+    cache = schedule_engine.PlanCache()
+    now = datetime(2026, 10, 18, 23, 0)
+    plan = cached_plan(cache, TASKS, now)
+    later = cached_plan(cache, TASKS, now + timedelta(minutes=1))
+    assert later is not plan and later.segments[0].start == now + timedelta(minutes=1)
+
+
+def test_plan_cache_invalidate_drops_only_that_date():
+    cache = schedule_engine.PlanCache()
+    now = datetime(2026, 10, 18, 9, 0)
+    today = cached_plan(cache, TASKS, now)
+    other = cached_plan(cache, TASKS, now, date_str='2026-10-19')
+    sorted_before = cache.sorted_entries('2026-10-18', TASKS)
+    cache.invalidate('2026-10-18')
+    assert cache.sorted_entries('2026-10-18', TASKS) is not sorted_before
+    assert cached_plan(cache, TASKS, now) is not today
+    assert cached_plan(cache, TASKS, now, date_str='2026-10-19') is other
+
+
+def test_plan_cache_is_bounded():
+    cache = schedule_engine.PlanCache(max_entries=2)
+    now = datetime(2026, 10, 18, 9, 0)
+    first = cached_plan(cache, TASKS, now, mode=(20, 5))
+    cached_plan(cache, TASKS, now, mode=(25, 5))
+    cached_plan(cache, TASKS, now, mode=(30, 5))
+    assert len(cache._plans) == 2
+    assert cached_plan(cache, TASKS, now, mode=(20, 5)) is not first
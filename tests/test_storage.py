@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+import storage
+
+SCHEDULE = {
+    '2026-10-12': {'tasks': [{'name': "寫報告", 'time': '09:00'}]},
+    '2026-10-13': {'tasks': [{'name': "開會", 'time': '14:30'}, {'name': "閱讀", 'time': '20:00'}]},
+}
+
+
+def open_store(mode, tmp_path):
+    return storage.open_store(mode, str(tmp_path / 'pomodoro_schedule.json'))
+
+
+@pytest.mark.parametrize('mode', sorted(storage.STORAGE_BACKENDS))
+def test_save_and_reopen(mode, tmp_path):
+    store = open_store(mode, tmp_path)
+    store.save('ja', SCHEDULE)
+    store.close()
+    store = open_store(mode, tmp_path)
+    assert store.load_settings() == 'ja'
+    assert store.load_range('2026-10-01', '2026-10-31') == SCHEDULE
+    assert store.load_range('2026-10-13', '2026-10-13') == {'2026-10-13': SCHEDULE['2026-10-13']}
+    assert store.stats('2026-10-01', '2026-10-31') == {'2026-10-12': 1, '2026-10-13': 2}
+    assert store.search("會") == [('2026-10-13', {'name': "開會", 'time': '14:30'})]
+    store.close()
+
+
+@pytest.mark.parametrize('mode', sorted(storage.STORAGE_BACKENDS))
+def test_date_scoped_save_updates_and_deletes_only_those_dates(mode, tmp_path):
+    store = open_store(mode, tmp_path)
+    store.save('en', SCHEDULE)
+    store.save('en', {'2026-10-14': {'tasks': [{'name': "運動", 'time': '07:00'}]}}, ['2026-10-12', '2026-10-14'])
+    store.close()
+    store = open_store(mode, tmp_path)
+    assert sorted(store.load_range('2026-10-01', '2026-10-31')) == ['2026-10-13', '2026-10-14']
+    store.close()
+
+
+def test_journal_skips_corrupt_records_in_the_middle(tmp_path):
+    store = open_store('journal', tmp_path)
+    store.save('en', {'2026-10-12': SCHEDULE['2026-10-12']}, ['2026-10-12'])
+    store.close()
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'{garbage\n{"date": "2026-10-20"}\n')
+        f.write(json.dumps({'date': '2026-10-13', 'day': SCHEDULE['2026-10-13']}).encode('utf-8') + b'\n')
+        f.write(b'{"date": "2026-10-14", "da')  # 當機時寫到一半的最後一行
+    store = open_store('journal', tmp_path)
+    assert store.load_range('2026-10-01', '2026-10-31') == SCHEDULE
+    store.close()
+    with open(store.quarantine_path, 'rb') as f:
+        assert f.read() == b'{garbage\n{"date": "2026-10-20"}\n'
+
+
+@pytest.mark.parametrize('mode', ['sharded', 'sqlite'])
+def test_imports_existing_json_once(mode, tmp_path):
+    (tmp_path / 'pomodoro_schedule.json').write_bytes(storage.encode_snapshot('ja', SCHEDULE))
+    store = open_store(mode, tmp_path)
+    assert store.load() == ('ja', SCHEDULE)
+    store.save('ja', {}, ['2026-10-12'])
+    store.close()
+    store = open_store(mode, tmp_path)
+    assert sorted(store.load_range('2026-10-01', '2026-10-31')) == ['2026-10-13']
+    store.close()
+
+
+@pytest.mark.parametrize('mode', ['sharded', 'sqlite'])
+def test_import_failure_is_reported_once_and_retried(mode, tmp_path):
+    path = tmp_path / 'pomodoro_schedule.json'
+    path.write_text('{"language": "ja", "sched', encoding='utf-8')
+    store = open_store(mode, tmp_path)
+    with pytest.raises(ValueError):
+        store.load_settings()
+    # 之後以空白資料繼續，期間的編輯保留
+    assert store.load() == (storage.DEFAULT_LANGUAGE, {})
+    store.save('en', {'2026-10-13': {'tasks': [{'name': "new", 'time': '08:00'}]}}, ['2026-10-13'])
+    store.close()
+    path.write_bytes(storage.encode_snapshot('ja', SCHEDULE))
+    store = open_store(mode, tmp_path)
+    assert store.load() == ('en', {'2026-10-12': SCHEDULE['2026-10-12'], '2026-10-13': {'tasks': [{'name': "new", 'time': '08:00'}]}})
+    store.close()
+
+
+def test_windowed_schedule_evicts_least_recently_used_ranges(tmp_path):
+    store = open_store('json', tmp_path)
+    store.save('en', SCHEDULE)
+    window = storage.WindowedSchedule(store, max_ranges=2)
+    window.ensure('2026-10-12', '2026-10-12')
+    window.ensure('2026-10-13', '2026-10-13')
+    window.ensure('2026-10-12', '2026-10-12')
+    window.ensure('2026-10-20', '2026-10-26')
+    assert window.loaded_ranges() == [('2026-10-12', '2026-10-12'), ('2026-10-20', '2026-10-26')]
+    assert '2026-10-12' in window and '2026-10-13' not in window
+
+
+def test_windowed_schedule_keeps_pending_edits_over_a_newly_loaded_range(tmp_path):
+    store = open_store('json', tmp_path)
+    store.save('en', {'2026-10-14': {'tasks': [{'name': "old", 'time': '10:00'}]}, '2026-10-15': SCHEDULE['2026-10-12']})
+    window = storage.WindowedSchedule(store)
+    window.ensure('2026-10-12', '2026-10-18')
+    new = {'tasks': [{'name': "NEW", 'time': '10:00'}]}
+    window['2026-10-14'] = new
+    del window['2026-10-15']
+    # 背景存檔尚未寫入時載入重疊的範圍，讀到的是舊資料
+    window.ensure('2026-10-13', '2026-10-19')
+    assert window['2026-10-14'] == new and '2026-10-15' not in window
+    store.save('en', {'2026-10-14': new}, ['2026-10-14', '2026-10-15'])
+    window.mark_saved({'2026-10-14': new, '2026-10-15': None})
+    assert window['2026-10-14'] == new and '2026-10-15' not in window
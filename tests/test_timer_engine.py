@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import instrumentation
+import schedule_engine
+import timer_engine
+
+START = datetime(2026, 10, 18, 9, 0)
+TASKS = [{'name': "A", 'time': '09:00'}, {'name': "B", 'time': '10:00'}]
+
+
+class FakeTime:
+    """取代 timer_engine 使用的 time 模組：牆上時鐘可以單獨跳動。"""
+    def __init__(self, wall):
+        self.wall, self.mono = wall.timestamp(), 1000.0
+
+    def time(self): return self.wall
+    def monotonic(self): return self.mono
+
+    def advance(self, seconds):
+        self.wall += seconds; self.mono += seconds
+
+    def jump(self, seconds):
+        self.wall += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime(START - timedelta(minutes=1))
+    monkeypatch.setattr(timer_engine, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def engine(qapp, clock):
+    engine = timer_engine.TimerEngine(metrics=instrumentation.Metrics())
+    engine.changes = []; engine.done = []
+    engine.segment_changed.connect(engine.changes.append)
+    engine.finished.connect(lambda: engine.done.append(True))
+    yield engine
+    engine.stop()
+
+
+def test_clock_follows_the_monotonic_clock_between_resyncs(clock):
+    mono = timer_engine.MonotonicClock()
+    clock.advance(30); clock.jump(600)
+    assert mono.now() == START - timedelta(seconds=30)
+    assert mono.resync() is True
+    assert mono.now() == START + timedelta(seconds=570)
+    clock.jump(timer_engine.CLOCK_JUMP_THRESHOLD / 2)
+    assert mono.resync() is False
+
+
+def test_segments_advance_only_forward(engine, clock):
+    schedule = schedule_engine.plan_day(TASKS, (20, 5), START)
+    engine.start(schedule)
+    assert engine.changes == [] and engine._next_boundary == START
+    clock.advance(61); engine.wake()
+    assert engine.changes == [0]
+    # 一次跨過多個區段時只通知目前所在的區段
+    clock.advance(26 * 60); engine.wake()
+    assert engine.changes == [0, 2]
+    # 時鐘倒退不會重複通知
+    clock.jump(-25 * 60); engine.wake()
+    assert engine.changes == [0, 2]
+    clock.jump(60 * 60); engine.wake()
+    assert engine.done == [True] and not engine.running
+
+
+def test_poll_picks_up_a_wall_clock_jump_immediately(engine, clock):
+    engine.start(schedule_engine.plan_day(TASKS, (20, 5), START))
+    clock.advance(61); engine.wake()
+    assert engine.changes == [0]
+    # 例如 NTP 校正或手動調整：喚醒計時器仍以舊的間隔排定，畫面更新時就要修正
+    clock.jump(21 * 60)
+    engine.poll()
+    assert engine.changes == [0, 1]
+    assert engine._next_boundary == schedule_engine.plan_day(TASKS, (20, 5), START)[1].end
+    assert engine.metrics.counters['clock.jumps'] == 1
+    engine.poll()
+    assert engine.metrics.counters['clock.jumps'] == 1
+
+
+def test_update_schedule_keeps_the_current_index(engine, clock):
+    schedule = schedule_engine.plan_day(TASKS, (20, 5), START)
+    clock.advance(61)
+    engine.start(schedule, current_index=0)
+    assert engine.changes == []
+    engine.update_schedule(schedule_engine.plan_day(TASKS + [{'name': "C", 'time': '11:00'}], (20, 5), START))
+    assert engine.changes == [] and engine.current_index == 0
@@ -0,0 +1,69 @@
+import pytest
+from PyQt6.QtCore import QEvent, QPointF, Qt
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtWidgets import QApplication
+
+import main
+from ui_components import WeekPlannerModel
+
+DAY_ROW = 3
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'CONFIG_FILE', str(tmp_path / 'pomodoro_schedule.json'))
+    window = main.PomodoroApp(storage_mode='json')
+    model = window.week_model
+    for name in ("A", "B", "C"):
+        model.setData(model.add_task(DAY_ROW), name)
+    window.show()
+    window.week_view.expandAll()
+    qapp.processEvents()
+    yield window
+    window.writer.close()
+    window.hide()
+
+
+def send(view, kind, index):
+    pos = QPointF(view.visualRect(index).center())
+    buttons = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseButtonRelease else Qt.MouseButton.LeftButton
+    event = QMouseEvent(kind, pos, view.viewport().mapToGlobal(pos), Qt.MouseButton.LeftButton, buttons, Qt.KeyboardModifier.NoModifier)
+    QApplication.sendEvent(view.viewport(), event)
+
+
+def click(view, index, double=False):
+    """送出與實際滑鼠相同的事件順序；雙擊為 Press、Release、DblClick、Release。"""
+    kinds = [QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease]
+    if double: kinds += [QEvent.Type.MouseButtonDblClick, QEvent.Type.MouseButtonRelease]
+    for kind in kinds: send(view, kind, index)
+
+
+def task_names(window):
+    return [task['name'] for task in window.week_model.days[DAY_ROW].tasks]
+
+
+def action_index(window, row=None):
+    model = window.week_model
+    day = model.index(DAY_ROW, WeekPlannerModel.COLUMN_ACTION)
+    return day if row is None else model.index(row, WeekPlannerModel.COLUMN_ACTION, model.index(DAY_ROW, 0))
+
+
+def test_click_on_remove_deletes_one_task(window):
+    click(window.week_view, action_index(window, 1))
+    assert task_names(window) == ["A", "C"]
+
+
+def test_double_click_on_remove_deletes_only_that_task(window):
+    click(window.week_view, action_index(window, 1), double=True)
+    assert task_names(window) == ["A", "C"]
+
+
+def test_double_click_on_add_adds_one_task(window):
+    click(window.week_view, action_index(window), double=True)
+    assert task_names(window) == ["A", "B", "C", ""]
+
+
+def test_release_without_a_press_on_the_same_cell_does_nothing(window):
+    send(window.week_view, QEvent.Type.MouseButtonPress, action_index(window, 0))
+    send(window.week_view, QEvent.Type.MouseButtonRelease, action_index(window, 2))
+    assert task_names(window) == ["A", "B", "C"]
@@ -0,0 +1,122 @@
+import time
+from datetime import datetime, timedelta
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+import schedule_engine
+
+# 單次喚醒的最長等待時間 (毫秒)。系統休眠時單調時鐘可能暫停，
+# 限制等待長度可確保喚醒後最遲在此時間內重新對時。
+MAX_SLEEP_MS = 30 * 1000
+# 牆上時鐘與單調時鐘的差距超過此秒數，視為休眠/喚醒或手動調整時鐘
+CLOCK_JUMP_THRESHOLD = 2.0
+# 喚醒時間多加一點餘裕，避免計時器提早幾毫秒觸發而落在邊界之前
+WAKE_SLACK_MS = 5
+
+
+class MonotonicClock:
+    """以單調時鐘推進的時間基準，每次對時時修正與牆上時鐘的漂移。"""
+
+    def __init__(self):
+        self._anchor_wall = None
+        self.resync()
+
+    def resync(self):
+        """重新對時；回傳牆上時鐘是否跳動 (休眠/喚醒、NTP、日光節約或手動調整)。"""
+        wall, mono = time.time(), time.monotonic()
+        jumped = False
+        if self._anchor_wall is not None:
+            drift = (wall - self._anchor_wall) - (mono - self._anchor_mono)
+            jumped = abs(drift) > CLOCK_JUMP_THRESHOLD
+        self._anchor_wall, self._anchor_mono = wall, mono
+        return jumped
+
+    def now(self):
+        return datetime.fromtimestamp(self._anchor_wall + (time.monotonic() - self._anchor_mono))
+
+
+class TimerEngine(QObject):
+    """
+    事件驅動的番茄鐘計時引擎。
+    只在下一個區段邊界 (或 MAX_SLEEP_MS 上限) 喚醒一次，
+    不再每秒掃描整個排程；畫面更新由 UI 視需要自行處理。
+    每次喚醒 (包括每個區段轉換) 與每次 poll() 都會重新對時，時鐘跳動的次數記錄在 metrics 的 clock.jumps。
+    """
+    segment_changed = pyqtSignal(int)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None, metrics=None):
+        super().__init__(parent)
+        self.clock = MonotonicClock()
+        self.metrics = metrics  # instrumentation.Metrics
+        self.schedule = []
+        self.current_index = -1
+        self.running = False
+        self._starts = []
+        self._next_boundary = None
+        self._wake_timer = QTimer(self)
+        self._wake_timer.setSingleShot(True)
+        self._wake_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._wake_timer.timeout.connect(self.wake)
+
+    def start(self, schedule, current_index=-1):
+        """current_index 為已經通知過的區段 (例如接手其他程式執行中的排程)，不會再發出 segment_changed。"""
+        self.schedule = schedule
+        self._starts = [segment.start for segment in schedule]
+        self.current_index = current_index
+        self.running = True
+        self.wake()
+
+    def update_schedule(self, schedule):
+        """執行中替換排程 (例如重新規劃後段)；目前區段的索引不變，因此不會重複通知。"""
+        if not self.running: return
+        self.schedule = schedule
+        self._starts = [segment.start for segment in schedule]
+        self.wake()
+
+    def stop(self):
+        self.running = False
+        self._wake_timer.stop()
+        self.schedule = []; self._starts = []
+        self.current_index = -1
+        self._next_boundary = None
+
+    def now(self):
+        return self.clock.now()
+
+    def locate(self, now):
+        """回傳 (狀態, 索引)，狀態為 'waiting'、'active'、'gap' 或 'done'。"""
+        return schedule_engine.locate(self.schedule, self._starts, now)
+
+    def poll(self):
+        """給畫面更新呼叫：若時鐘跳動或已越過邊界但喚醒尚未觸發，立即重新排定。"""
+        if not self.running or self._next_boundary is None: return
+        if self._resync() or self.now() >= self._next_boundary:
+            self.wake()
+
+    def _resync(self):
+        jumped = self.clock.resync()
+        if jumped and self.metrics is not None: self.metrics.count('clock.jumps')
+        return jumped
+
+    def wake(self):
+        if not self.running: return
+        self._resync()
+        now = self.now()
+        state, index = self.locate(now)
+        if state == 'done':
+            self.running = False
+            self._next_boundary = None
+            self.finished.emit()
+            return
+        # 只往前推進：時鐘倒退時不重複通知，一次跨過多個區段時只通知目前所在的區段
+        if state == 'active' and index > self.current_index:
+            self.current_index = index
+            self.segment_changed.emit(index)
+            if not self.running: return
+        self._arm(now, state, index)
+
+    def _arm(self, now, state, index):
+        segment = self.schedule[index]
+        self._next_boundary = segment.end if state == 'active' else segment.start
+        delay_ms = int((self._next_boundary - now) / timedelta(milliseconds=1)) + WAKE_SLACK_MS
+        self._wake_timer.start(max(0, min(delay_ms, MAX_SLEEP_MS)))
@@ -2,6 +2,7 @@ TRANSLATIONS = {
     'zh_TW': {
         'window_title': "FocusFlow - 番茄鐘與排程助理",
         'tray_tooltip': "FocusFlow 番茄鐘助理",
+        'tray_tooltip_minutes': "剩餘約 {0} 分鐘",
         'show': "顯示",
         'quit': "結束",
         'select_start_date': "選擇開始日期:",
@@ -18,7 +19,6 @@ TRANSLATIONS = {
         'start_button_other_day': "只能啟動包含今日的排程",
         'add_task_tooltip': "為 {0} 新增任務",
         'task_placeholder': "請輸入任務...",
-        'max_tasks_reached': "每日任務數量已達上限 (20)。",
         'no_tasks_today': "請先為今天新增至少一個任務！",
         'all_tasks_past_title': "所有任務時間已過",
         'all_tasks_past_msg': "今日所有排程時間都已過去。\n您想從今天的第一個任務重新開始嗎？",
@@ -29,8 +29,10 @@ TRANSLATIONS = {
         'preview_header': "<b>番茄鐘真實執行排程:</b><br>",
         'preview_no_tasks': "今日無任務",
         'preview_focus': "專注 - {0}",
+        'preview_summary': "{0} 個專注時段，共專注 {1} 分鐘、休息 {2} 分鐘，預計 {3} 結束",
         'preview_break': "休息時間",
         'preview_break_next': "休息時間 (下個任務: {0})",
+        'preview_break_final': "休息時間 (今日最後一個任務)",
         'preview_gap': "空檔時間",
         'preview_start_button': "啟動",
         'preview_cancel_button': "取消",
@@ -42,6 +44,8 @@ TRANSLATIONS = {
         'timer_task_next': "即將開始: {0}",
         'timer_task_next_soon': "下一個排程即將開始...",
         'timer_task_done': "所有排程已結束",
+        'timer_edit_button': "編輯今日任務",
+        'return_to_timer_button': "返回計時畫面 (套用變更)",
         'notification_title_work': "專注時間",
         'notification_title_break': "休息一下",
         'notification_done': "任務完成",
@@ -51,14 +55,23 @@ TRANSLATIONS = {
         'select_time_title': "選擇時間",
         'save_error': "儲存錯誤",
         'save_error_msg': "無法儲存排程檔案:\n{0}",
+        'save_timeout': "背景存檔未在 {0} 秒內完成",
         'load_error': "讀取錯誤",
+        'daemon_disconnected_title': "計時守護行程已中斷",
+        'daemon_disconnected_msg': "計時會在視窗中繼續，但編輯將無法儲存，請重新啟動程式。",
         'load_error_msg': "無法讀取排程檔案，將建立新檔案。\n錯誤: {0}",
         'validation_error_title': "排程驗證失敗",
         'validation_error_msg': "生成的排程有時間邏輯錯誤，請檢查您的任務時間設定。",
+        'metrics_title': "FocusFlow 效能數據",
+        'metrics_dump_button': "匯出 JSON…",
+        'metrics_dump_title': "匯出效能數據",
+        'metrics_reset_button': "重設",
+        'metrics_close_button': "關閉",
     },
     'en': {
         'window_title': "FocusFlow - Pomodoro & Schedule Assistant",
         'tray_tooltip': "FocusFlow Pomodoro Assistant",
+        'tray_tooltip_minutes': "About {0} min left",
         'show': "Show",
         'quit': "Quit",
         'select_start_date': "Select Start Date:",
@@ -75,7 +88,6 @@ TRANSLATIONS = {
         'start_button_other_day': "Can only start if today is included",
         'add_task_tooltip': "Add task for {0}",
         'task_placeholder': "Enter a task...",
-        'max_tasks_reached': "Maximum tasks per day (20) reached.",
         'no_tasks_today': "Please add at least one task for today!",
         'all_tasks_past_title': "All Tasks Have Passed",
         'all_tasks_past_msg': "All scheduled task times for today have passed.\nWould you like to restart from the first task of the day?",
@@ -86,8 +98,10 @@ TRANSLATIONS = {
         'preview_header': "<b>Pomodoro Actual Schedule:</b><br>",
         'preview_no_tasks': "No tasks for today",
         'preview_focus': "Focus - {0}",
+        'preview_summary': "{0} focus sessions, {1} min focus and {2} min break, ending at {3}",
         'preview_break': "Break Time",
         'preview_break_next': "Break Time (Next: {0})",
+        'preview_break_final': "Break Time (last task of the day)",
         'preview_gap': "Gap Time",
         'preview_start_button': "Start",
         'preview_cancel_button': "Cancel",
@@ -99,6 +113,8 @@ TRANSLATIONS = {
         'timer_task_next': "Up next: {0}",
         'timer_task_next_soon': "Next session is coming up...",
         'timer_task_done': "All tasks completed",
+        'timer_edit_button': "Edit Today's Tasks",
+        'return_to_timer_button': "Back to Timer (apply changes)",
         'notification_title_work': "Focus Time",
         'notification_title_break': "Take a Break",
         'notification_done': "Tasks Complete",
@@ -108,14 +124,23 @@ TRANSLATIONS = {
         'select_time_title': "Select Time",
         'save_error': "Save Error",
         'save_error_msg': "Could not save schedule file:\n{0}",
+        'save_timeout': "The background save did not finish within {0} seconds",
         'load_error': "Load Error",
+        'daemon_disconnected_title': "Timer daemon disconnected",
+        'daemon_disconnected_msg': "The timer keeps running in this window, but edits cannot be saved. Please restart the app.",
         'load_error_msg': "Could not load schedule file, a new one will be created.\nError: {0}",
         'validation_error_title': "Schedule Validation Failed",
         'validation_error_msg': "There was a logical error generating the schedule. Please check your task time settings.",
+        'metrics_title': "FocusFlow Metrics",
+        'metrics_dump_button': "Dump JSON…",
+        'metrics_dump_title': "Dump Metrics",
+        'metrics_reset_button': "Reset",
+        'metrics_close_button': "Close",
     },
     'ja': {
         'window_title': "FocusFlow - ポモドーロ＆スケジュールアシスタント",
         'tray_tooltip': "FocusFlow ポモドーロアシスタント",
+        'tray_tooltip_minutes': "残り約 {0} 分",
         'show': "表示",
         'quit': "終了",
         'select_start_date': "開始日を選択:",
@@ -132,7 +157,6 @@ TRANSLATIONS = {
         'start_button_other_day': "今日が含まれる場合のみ開始可能",
         'add_task_tooltip': "{0} のタスクを追加",
         'task_placeholder': "タスクを入力...",
-        'max_tasks_reached': "1日の最大タスク数（20）に達しました。",
         'no_tasks_today': "今日のタスクを少なくとも1つ追加してください！",
         'all_tasks_past_title': "すべてのタスクが過去のものです",
         'all_tasks_past_msg': "今日のスケジュールされたタスク時間はすべて過ぎました。\n今日の最初のタスクから再開しますか？",
@@ -143,8 +167,10 @@ TRANSLATIONS = {
         'preview_header': "<b>ポモドーロ実行スケジュール:</b><br>",
         'preview_no_tasks': "今日のタスクはありません",
         'preview_focus': "集中 - {0}",
+        'preview_summary': "集中 {0} 回、集中 {1} 分・休憩 {2} 分、{3} 終了予定",
         'preview_break': "休憩時間",
         'preview_break_next': "休憩時間 (次: {0})",
+        'preview_break_final': "休憩時間 (本日最後のタスク)",
         'preview_gap': "空き時間",
         'preview_start_button': "開始",
         'preview_cancel_button': "キャンセル",
@@ -156,6 +182,8 @@ TRANSLATIONS = {
         'timer_task_next': "次のタスク: {0}",
         'timer_task_next_soon': "次のセッションが間もなく開始...",
         'timer_task_done': "すべてのタスクが完了しました",
+        'timer_edit_button': "今日のタスクを編集",
+        'return_to_timer_button': "タイマーに戻る (変更を反映)",
         'notification_title_work': "集中時間",
         'notification_title_break': "休憩してください",
         'notification_done': "タスク完了",
@@ -165,9 +193,17 @@ TRANSLATIONS = {
         'select_time_title': "時間を選択",
         'save_error': "保存エラー",
         'save_error_msg': "スケジュールファイルを保存できませんでした:\n{0}",
+        'save_timeout': "バックグラウンドの保存が {0} 秒以内に完了しませんでした",
         'load_error': "読み込みエラー",
+        'daemon_disconnected_title': "タイマーデーモンとの接続が切れました",
+        'daemon_disconnected_msg': "タイマーはこのウィンドウで続行しますが、編集は保存できません。アプリを再起動してください。",
         'load_error_msg': "スケジュールファイルを読み込めません。新しいファイルを作成します。\nエラー: {0}",
         'validation_error_title': "スケジュール検証失敗",
         'validation_error_msg': "スケジュールの生成に論理エラーがありました。タスクの時間設定を確認してください。",
+        'metrics_title': "FocusFlow パフォーマンス指標",
+        'metrics_dump_button': "JSON に書き出し…",
+        'metrics_dump_title': "指標を書き出し",
+        'metrics_reset_button': "リセット",
+        'metrics_close_button': "閉じる",
     }
 }
@@ -1,19 +1,28 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit, 
                              QPushButton, QFrame, QHBoxLayout, QMessageBox, 
                              QDialog, QDialogButtonBox, QCalendarWidget, QTimeEdit,
-                             QGraphicsOpacityEffect, QApplication)
-from PyQt6.QtCore import Qt, QTimer, QTime, QDate, QPropertyAnimation, QEasingCurve, QRectF
-from PyQt6.QtGui import QFont, QPixmap, QPainter, QColor, QBrush, QPen, QPainterPath
+                             QGraphicsOpacityEffect, QApplication, QStyledItemDelegate,
+                             QPlainTextEdit, QFileDialog, QTableView, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import (Qt, QObject, QTimer, QTime, QDate, QPropertyAnimation, QEasingCurve,
+                          QAbstractItemModel, QAbstractTableModel, QModelIndex, QPersistentModelIndex, QEvent, QElapsedTimer, pyqtSignal)
+from PyQt6.QtGui import QFont, QFontDatabase, QColor
+from collections import OrderedDict
 
-MAX_TASKS_PER_DAY = 20
+import icon_cache
 
 # --- 特效提示視窗 ---
 class NotificationWidget(QWidget):
-    def __init__(self, title, message, notification_type='info', parent=None):
+    """
+    常駐重用的提示視窗：只建立一次，之後以 set_content() 更換內容。
+    淡入淡出共用同一個動畫物件，自動隱藏也只使用一個計時器。
+    """
+    DISPLAY_MS = 30000
+
+    def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool | Qt.WindowType.WindowStaysOnTopHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.fading_out = False
         
         self.layout = QHBoxLayout(self)
         self.layout.setContentsMargins(15, 15, 15, 15)
@@ -26,15 +35,14 @@ class NotificationWidget(QWidget):
         self.icon_label = QLabel()
         self.icon_label.setFixedSize(48, 48)
         frame_layout.addWidget(self.icon_label)
-        self.create_icon(notification_type)
 
         text_layout = QVBoxLayout()
         text_layout.setSpacing(2)
-        self.title_label = QLabel(title)
+        self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
         self.title_label.setStyleSheet("color: #bd93f9; font-size: 18px; font-weight: bold;")
         
-        self.message_label = QLabel(message)
+        self.message_label = QLabel()
         self.message_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
         self.message_label.setStyleSheet("color: white; font-size: 14px;")
         self.message_label.setWordWrap(True)
@@ -48,60 +56,121 @@ class NotificationWidget(QWidget):
 
         self.opacity_effect = QGraphicsOpacityEffect(self)
         self.setGraphicsEffect(self.opacity_effect)
-        self.animation = QPropertyAnimation(self.opacity_effect, b"opacity")
+        self.animation = QPropertyAnimation(self.opacity_effect, b"opacity", self)
         self.animation.setDuration(500)
-        
-        QTimer.singleShot(30000, self.hide_animation)
-
-    def create_icon(self, icon_type):
-        pixmap = QPixmap(48, 48)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        if icon_type == 'work':
-            painter.setPen(QPen(QColor("#50fa7b"), 3))
-            painter.setBrush(Qt.BrushStyle.NoBrush)
-            path = QPainterPath()
-            path.moveTo(10, 38); path.quadTo(24, 42, 38, 38); path.lineTo(38, 10)
-            path.quadTo(24, 14, 10, 10); path.lineTo(10, 38)
-            painter.drawPath(path)
-            painter.drawLine(24, 12, 24, 39)
-        elif icon_type == 'break':
-            painter.setPen(QPen(QColor("#8be9fd"), 3))
-            painter.setBrush(Qt.BrushStyle.NoBrush)
-            painter.drawRect(8, 12, 28, 24)
-            painter.drawArc(36, 18, 8, 12, -90 * 16, 180 * 16)
-            painter.drawLine(14, 8, 16, 12); painter.drawLine(22, 8, 24, 12); painter.drawLine(30, 8, 32, 12)
-        elif icon_type == 'done':
-            painter.setPen(QPen(QColor("#50fa7b"), 4, cap=Qt.PenCapStyle.RoundCap, join=Qt.PenJoinStyle.RoundJoin))
-            painter.drawLine(10, 24, 22, 36); painter.drawLine(22, 36, 38, 12)
-        else:
-            painter.setPen(QPen(QColor("#f1fa8c"), 3))
-            painter.drawEllipse(8, 8, 32, 32)
-            painter.setFont(QFont("Arial", 18, QFont.Weight.Bold))
-            painter.drawText(QRectF(8, 8, 32, 32), Qt.AlignmentFlag.AlignCenter, "i")
+        self.animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
+        self.animation.finished.connect(self.on_animation_finished)
 
-        painter.end()
-        self.icon_label.setPixmap(pixmap)
+        self.hide_timer = QTimer(self)
+        self.hide_timer.setSingleShot(True)
+        self.hide_timer.timeout.connect(self.hide_animation)
 
-    def show_animation(self):
-        self.opacity_effect.setOpacity(0)
-        self.show()
+    def set_content(self, title, message, notification_type='info'):
+        self.title_label.setText(title)
+        self.message_label.setText(message)
+        self.icon_label.setPixmap(icon_cache.pixmap(notification_type, 48, self.devicePixelRatioF()))
+        self.adjustSize()
+        if self.isVisible(): self.place()
+
+    def place(self):
         screen_geometry = QApplication.primaryScreen().availableGeometry()
         self.move(screen_geometry.right() - self.width() - 20, screen_geometry.bottom() - self.height() - 20)
-        self.animation.setStartValue(0.0)
+
+    def is_shown(self):
+        """畫面上正顯示 (不是正在淡出) 時回傳 True。"""
+        return self.isVisible() and not self.fading_out
+
+    def show_animation(self):
+        self.hide_timer.start(self.DISPLAY_MS)
+        if self.is_shown(): return
+        # 淡出途中收到新內容時，從目前的透明度淡入回來
+        start = self.opacity_effect.opacity() if self.isVisible() else 0.0
+        self.fading_out = False
+        self.animation.stop()
+        self.opacity_effect.setOpacity(start)
+        self.show()
+        self.place()
+        self.animation.setStartValue(start)
         self.animation.setEndValue(1.0)
-        self.animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
         self.animation.start()
 
     def hide_animation(self):
-        self.animation.setStartValue(1.0)
+        self.hide_timer.stop()
+        if not self.is_shown(): return
+        self.fading_out = True
+        self.animation.stop()
+        self.animation.setStartValue(self.opacity_effect.opacity())
         self.animation.setEndValue(0.0)
-        self.animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
-        self.animation.finished.connect(self.close)
         self.animation.start()
 
+    def on_animation_finished(self):
+        if self.fading_out:
+            self.fading_out = False
+            self.hide()
+
+
+class NotificationCenter(QObject):
+    """
+    所有提示共用一個 NotificationWidget 的事件佇列。
+    COALESCE_MS 內連續送來的提示合併處理；key 相同的提示以較新的取代較舊的
+    (例如休息結束後緊接著開始工作，只顯示「開始工作」)。
+    每則提示至少顯示 MIN_DISPLAY_MS 才換下一則 (佇列原本是空的也一樣)，佇列最多保留 MAX_PENDING 則，超過時捨棄最舊的。
+    """
+    COALESCE_MS = 300
+    MIN_DISPLAY_MS = 3000
+    MAX_PENDING = 3
+
+    def __init__(self, parent_window, metrics=None):
+        super().__init__(parent_window)
+        self.parent_window = parent_window
+        self.metrics = metrics
+        self.widget = None
+        self.pending = OrderedDict()  # key -> (title, message, notification_type)
+        self.sequence = 0
+        self.shown = QElapsedTimer()  # 目前這則提示顯示了多久
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def count(self, name):
+        if self.metrics is not None: self.metrics.count(name)
+
+    def post(self, title, message, notification_type='info', key=None):
+        """加入一則提示；key 為 None 時不與其他提示合併。"""
+        if key is None:
+            key = self.sequence = self.sequence + 1
+        if key in self.pending:
+            del self.pending[key]; self.count('notifications.coalesced')
+        self.pending[key] = (title, message, notification_type)
+        while len(self.pending) > self.MAX_PENDING:
+            self.pending.popitem(last=False); self.count('notifications.dropped')
+        if not self.flush_timer.isActive(): self.flush_timer.start(self.next_delay())
+
+    def next_delay(self):
+        # 畫面上的提示還沒顯示滿 MIN_DISPLAY_MS 時，等到那時候才換下一則
+        if self.widget is not None and self.widget.is_shown() and self.shown.isValid():
+            return max(self.COALESCE_MS, self.MIN_DISPLAY_MS - self.shown.elapsed())
+        return self.COALESCE_MS
+
+    def flush(self):
+        if not self.pending: return
+        _, (title, message, notification_type) = self.pending.popitem(last=False)
+        if self.widget is None:
+            self.widget = NotificationWidget(self.parent_window)
+            self.count('widgets.created')
+        self.widget.set_content(title, message, notification_type)
+        self.widget.show_animation()
+        self.shown.start()
+        self.count('notifications.shown')
+        if self.pending: self.flush_timer.start(self.MIN_DISPLAY_MS)
+
+    def clear(self):
+        """捨棄排隊中的提示並收起目前的提示 (番茄鐘停止後，尚未顯示的區段提示已經過時)。"""
+        self.pending.clear()
+        self.flush_timer.stop()
+        self.shown.invalidate()
+        if self.widget is not None and self.widget.is_shown(): self.widget.hide_animation()
+
 # --- 自訂日期/時間選擇按鈕 ---
 class DatePickerButton(QPushButton):
     def __init__(self, parent=None):
@@ -135,161 +204,398 @@ class DatePickerButton(QPushButton):
         self.date = date
         self.setText(self.date.toString("yyyy-MM-dd"))
 
-class TimePickerButton(QPushButton):
-    def __init__(self, initial_time_str="09:00", parent=None):
-        super().__init__(parent)
-        self.task_row_widget = parent
-        self.parent_window = self.task_row_widget.parent_day_widget.parent_window
-        self.setObjectName("DateTimeButton")
-        self.time = QTime.fromString(initial_time_str, "HH:mm")
-        self.setText(self.time.toString("HH:mm"))
-        self.clicked.connect(self.pick_time)
+def show_invalid_time_warning(parent_window):
+    # 建立一個自訂樣式的 QMessageBox
+    msg_box = QMessageBox(parent_window)
+    msg_box.setWindowTitle(parent_window.get_text('invalid_time_title'))
+    msg_box.setText(parent_window.get_text('invalid_time_msg'))
+    msg_box.setIcon(QMessageBox.Icon.Warning)
+    # --- 核心修改：設定淺色背景與黑色文字 ---
+    msg_box.setStyleSheet("""
+        QMessageBox {
+            background-color: #f0f0f0; /* 淺灰色背景 */
+        }
+        QLabel {
+            color: black; /* 黑色文字 */
+            font-size: 14px;
+        }
+        QPushButton {
+            background-color: #c0c0c0;
+            color: black;
+            border-radius: 5px;
+            padding: 8px 12px;
+            font-size: 14px;
+        }
+        QPushButton:hover {
+            background-color: #d0d0d0;
+        }
+    """)
+    msg_box.exec()
 
-    def pick_time(self):
-        dialog = QDialog(self)
-        dialog.setWindowTitle(self.parent_window.get_text('select_time_title'))
-        layout = QVBoxLayout(dialog)
-        time_edit = QTimeEdit(dialog)
-        time_edit.setDisplayFormat("HH:mm")
-        time_edit.setTime(self.time)
-        layout.addWidget(time_edit)
-        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
-        buttons.accepted.connect(dialog.accept)
-        buttons.rejected.connect(dialog.reject)
-        layout.addWidget(buttons)
+# --- 週計畫資料模型 ---
+class _DayNode:
+    __slots__ = ('date', 'date_str', 'tasks')
 
-        if dialog.exec():
-            new_time = time_edit.time()
-
-            # --- 新增：時間驗證邏輯 ---
-            is_today = self.task_row_widget.parent_day_widget.date == QDate.currentDate()
-            is_first_task = self.task_row_widget == self.task_row_widget.parent_day_widget.task_widgets[0]
-
-            if is_today and is_first_task and new_time <= QTime.currentTime():
-                # 建立一個自訂樣式的 QMessageBox
-                msg_box = QMessageBox(self.parent_window)
-                msg_box.setWindowTitle(self.parent_window.get_text('invalid_time_title'))
-                msg_box.setText(self.parent_window.get_text('invalid_time_msg'))
-                msg_box.setIcon(QMessageBox.Icon.Warning)
-                # --- 核心修改：設定淺色背景與黑色文字 ---
-                msg_box.setStyleSheet("""
-                    QMessageBox {
-                        background-color: #f0f0f0; /* 淺灰色背景 */
-                    }
-                    QLabel {
-                        color: black; /* 黑色文字 */
-                        font-size: 14px;
-                    }
-                    QPushButton {
-                        background-color: #c0c0c0;
-                        color: black;
-                        border-radius: 5px;
-                        padding: 8px 12px;
-                        font-size: 14px;
-                    }
-                    QPushButton:hover {
-                        background-color: #d0d0d0;
-                    }
-                """)
-                
-                msg_box.exec()
-                return # 不更新時間，直接返回
-
-
-            if self.time != new_time:
-                self.setTime(new_time)
-                self.parent_window.schedule_changed()
-
-    def setTime(self, time):
-        self.time = time
-        self.setText(self.time.toString("HH:mm"))
-        
-# --- 單一任務列 Widget ---
-class TaskRowWidget(QWidget):
-    def __init__(self, task_text="", task_time_str="09:00", parent=None):
-        super().__init__(parent)
-        self.parent_day_widget = parent
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        self.task_input = QLineEdit(task_text)
-        self.task_input.setPlaceholderText(self.parent_day_widget.parent_window.get_text('task_placeholder'))
-        self.task_input.textChanged.connect(self.parent_day_widget.parent_window.schedule_changed)
-        self.time_picker = TimePickerButton(task_time_str, self)
-        self.remove_button = QPushButton("✕")
-        self.remove_button.setObjectName("RemoveButton")
-        self.remove_button.clicked.connect(self.remove_self)
-        layout.addWidget(self.task_input)
-        layout.addWidget(self.time_picker)
-        layout.addWidget(self.remove_button)
-
-    def remove_self(self):
-        self.parent_day_widget.remove_task_widget(self)
-
-    def get_data(self):
-        return {"name": self.task_input.text(), "time": self.time_picker.time.toString("HH:mm")}
-
-# --- 單日排程 Widget ---
-class DayScheduleWidget(QFrame):
-    def __init__(self, date, parent_window):
-        super().__init__()
+    def __init__(self, date, tasks):
         self.date = date
-        self.parent_window = parent_window
-        self.task_widgets = []
-        self.setFrameShape(QFrame.Shape.NoFrame)
-        self.main_layout = QVBoxLayout(self)
-        self.main_layout.setSpacing(8)
-        self.main_layout.setContentsMargins(5, 5, 5, 5)
-        header_layout = QHBoxLayout()
-        self.date_label = QLabel(self.date.toString("yyyy-MM-dd (ddd)"))
-        self.date_label.setObjectName("DateHeaderLabel")
-        header_layout.addWidget(self.date_label)
-        header_layout.addStretch()
-        self.add_button = QPushButton("+")
-        self.add_button.setObjectName("AddButton")
-        header_layout.addWidget(self.add_button)
-        self.main_layout.addLayout(header_layout)
-        self.tasks_layout = QVBoxLayout()
-        self.tasks_layout.setSpacing(5)
-        self.main_layout.addLayout(self.tasks_layout)
-        self.main_layout.addStretch()
-        
-        self.add_button.clicked.connect(self.add_task_row)
-        self.retranslate_ui()
+        self.date_str = date.toString("yyyy-MM-dd")
+        self.tasks = tasks
+
+class WeekPlannerModel(QAbstractItemModel):
+    """
+    週計畫的樹狀模型：第一層為日期，第二層為該日的任務 ({'name', 'time'})。
+    檢視只會繪製可見的列，編輯器也只在編輯時才建立，任務數量不再有上限。
+    """
+    COLUMN_NAME, COLUMN_TIME, COLUMN_ACTION = range(3)
+    day_edited = pyqtSignal(str)
 
-    def retranslate_ui(self):
-        self.add_button.setToolTip(self.parent_window.get_text('add_task_tooltip').format(self.date.toString('MM/dd')))
-        for widget in self.task_widgets:
-            widget.task_input.setPlaceholderText(self.parent_window.get_text('task_placeholder'))
+    def __init__(self, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window
+        self.days = []
 
-    def add_task_row(self, task_data=None):
-        if len(self.task_widgets) >= MAX_TASKS_PER_DAY:
-            QMessageBox.information(self.parent_window, "提示", self.parent_window.get_text('max_tasks_reached'))
+    # --- 資料存取 ---
+    def set_week(self, start_date, schedule_data):
+        """
+        換到另一週。第一次呼叫時建立七個日期節點，之後重複使用同一批節點，
+        只依任務數量差異插入/移除列並通知內容變動，檢視的展開狀態與捲動列不必重建。
+        載入資料不是編輯，因此不會發出 day_edited。
+        """
+        weeks_tasks = []
+        for i in range(7):
+            day_data = schedule_data.get(start_date.addDays(i).toString("yyyy-MM-dd")) or {}
+            weeks_tasks.append([dict(task) for task in day_data.get("tasks", [])])
+        if not self.days:
+            self.beginResetModel()
+            self.days = [_DayNode(start_date.addDays(i), tasks) for i, tasks in enumerate(weeks_tasks)]
+            self.endResetModel()
             return
-        task_text = task_data['name'] if task_data else ""
-        if self.task_widgets:
-            last_time = self.task_widgets[-1].time_picker.time
-            new_time = last_time.addSecs(30 * 60)
-            task_time = new_time.toString("HH:mm")
-        else:
-            task_time = task_data['time'] if task_data else "09:00"
-        task_widget = TaskRowWidget(task_text, task_time, self)
-        self.tasks_layout.addWidget(task_widget)
-        self.task_widgets.append(task_widget)
-        self.parent_window.schedule_changed()
-
-    def remove_task_widget(self, task_widget):
-        if task_widget in self.task_widgets:
-            self.task_widgets.remove(task_widget)
-            self.tasks_layout.removeWidget(task_widget)
-            task_widget.deleteLater()
-            self.parent_window.schedule_changed()
-
-    def get_day_data(self):
-        tasks = [w.get_data() for w in self.task_widgets if w.get_data()['name'].strip()]
+        for day_row, (day, tasks) in enumerate(zip(self.days, weeks_tasks)):
+            parent = self.index(day_row, 0)
+            old_count, new_count = len(day.tasks), len(tasks)
+            if new_count < old_count:
+                self.beginRemoveRows(parent, new_count, old_count - 1)
+                del day.tasks[new_count:]
+                self.endRemoveRows()
+            elif new_count > old_count:
+                self.beginInsertRows(parent, old_count, new_count - 1)
+                day.tasks.extend(tasks[old_count:])
+                self.endInsertRows()
+            day.date = start_date.addDays(day_row)
+            day.date_str = day.date.toString("yyyy-MM-dd")
+            day.tasks = tasks
+            self.dataChanged.emit(parent, self.index(day_row, self.COLUMN_ACTION))
+            if new_count:
+                self.dataChanged.emit(self.index(0, 0, parent), self.index(new_count - 1, self.COLUMN_ACTION, parent))
+
+    def dates(self):
+        return [day.date_str for day in self.days]
+
+    def day_data(self, date_str):
+        day = next((d for d in self.days if d.date_str == date_str), None)
+        tasks = [dict(task) for task in day.tasks if task['name'].strip()] if day else []
         if not tasks: return None
-        tasks.sort(key=lambda x: QTime.fromString(x['time'], "HH:mm"))
+        tasks.sort(key=lambda x: x['time'])
         return {"tasks": tasks}
 
-    def load_day_data(self, day_data):
-        for task in day_data.get("tasks", []):
-            self.add_task_row(task)
+    def add_task(self, day_row):
+        day = self.days[day_row]
+        if day.tasks:
+            task_time = QTime.fromString(day.tasks[-1]['time'], "HH:mm").addSecs(30 * 60).toString("HH:mm")
+        else:
+            task_time = "09:00"
+        row = len(day.tasks)
+        self.beginInsertRows(self.index(day_row, 0), row, row)
+        day.tasks.append({"name": "", "time": task_time})
+        self.endInsertRows()
+        self.day_edited.emit(day.date_str)
+        return self.index(row, self.COLUMN_NAME, self.index(day_row, 0))
+
+    def remove_task(self, day_row, row):
+        day = self.days[day_row]
+        self.beginRemoveRows(self.index(day_row, 0), row, row)
+        del day.tasks[row]
+        self.endRemoveRows()
+        self.day_edited.emit(day.date_str)
+
+    def retranslate(self):
+        if self.days:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.days) - 1, self.COLUMN_ACTION))
+            for day_row, day in enumerate(self.days):
+                if day.tasks:
+                    parent = self.index(day_row, 0)
+                    self.dataChanged.emit(self.index(0, 0, parent), self.index(len(day.tasks) - 1, self.COLUMN_ACTION, parent))
+
+    # --- QAbstractItemModel 介面 ---
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent): return QModelIndex()
+        if not parent.isValid(): return self.createIndex(row, column, None)
+        return self.createIndex(row, column, self.days[parent.row()])
+
+    def parent(self, index):
+        if not index.isValid(): return QModelIndex()
+        day = index.internalPointer()
+        if day is None: return QModelIndex()
+        return self.createIndex(self.days.index(day), 0, None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid(): return len(self.days)
+        if parent.internalPointer() is None and parent.column() == 0: return len(self.days[parent.row()].tasks)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 3
+
+    def flags(self, index):
+        if not index.isValid(): return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled
+        if index.internalPointer() is not None and index.column() != self.COLUMN_ACTION:
+            flags |= Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        day = index.internalPointer()
+        column = index.column()
+        if day is None:
+            day = self.days[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole:
+                if column == self.COLUMN_NAME: return day.date.toString("yyyy-MM-dd (ddd)")
+                if column == self.COLUMN_ACTION: return "+"
+            elif role == Qt.ItemDataRole.ToolTipRole and column == self.COLUMN_ACTION:
+                return self.parent_window.get_text('add_task_tooltip').format(day.date.toString('MM/dd'))
+            elif role == Qt.ItemDataRole.ForegroundRole and column == self.COLUMN_NAME:
+                return QColor("#ffb86c")
+            elif role == Qt.ItemDataRole.FontRole:
+                font = QFont(); font.setBold(True); font.setPointSize(12)
+                return font
+            elif role == Qt.ItemDataRole.TextAlignmentRole and column == self.COLUMN_ACTION:
+                return Qt.AlignmentFlag.AlignCenter
+            return None
+
+        task = day.tasks[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if column == self.COLUMN_NAME:
+                if role == Qt.ItemDataRole.DisplayRole and not task['name']: return self.parent_window.get_text('task_placeholder')
+                return task['name']
+            if column == self.COLUMN_TIME: return task['time']
+            if column == self.COLUMN_ACTION and role == Qt.ItemDataRole.DisplayRole: return "✕"
+        elif role == Qt.ItemDataRole.ForegroundRole:
+            if column == self.COLUMN_NAME: return QColor("#FFD700") if task['name'] else QColor("#6272a4")
+            if column == self.COLUMN_TIME: return QColor("#FFD700")
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column != self.COLUMN_NAME:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        day = index.internalPointer() if index.isValid() else None
+        if day is None or role != Qt.ItemDataRole.EditRole: return False
+        key = 'name' if index.column() == self.COLUMN_NAME else 'time' if index.column() == self.COLUMN_TIME else None
+        task = day.tasks[index.row()]
+        if key is None or task[key] == value: return False
+        task[key] = value
+        self.dataChanged.emit(index, index)
+        self.day_edited.emit(day.date_str)
+        return True
+
+# --- 週計畫編輯代理 ---
+class WeekPlannerDelegate(QStyledItemDelegate):
+    """只為正在編輯的儲存格建立編輯器；「+」與「✕」欄位以點擊處理。"""
+    def __init__(self, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window
+        self._pressed = None  # 在「+」或「✕」上按下左鍵的位置，放開時仍在同一格才算一次點擊
+
+    def createEditor(self, parent, option, index):
+        if index.column() in (WeekPlannerModel.COLUMN_NAME, WeekPlannerModel.COLUMN_TIME):
+            self.parent_window.metrics.count('widgets.created')
+        if index.column() == WeekPlannerModel.COLUMN_NAME:
+            editor = QLineEdit(parent)
+            editor.setPlaceholderText(self.parent_window.get_text('task_placeholder'))
+            return editor
+        if index.column() == WeekPlannerModel.COLUMN_TIME:
+            editor = QTimeEdit(parent)
+            editor.setDisplayFormat("HH:mm")
+            return editor
+        return None
+
+    def setEditorData(self, editor, index):
+        value = index.data(Qt.ItemDataRole.EditRole)
+        if isinstance(editor, QTimeEdit): editor.setTime(QTime.fromString(value, "HH:mm"))
+        else: editor.setText(value)
+
+    def setModelData(self, editor, model, index):
+        if isinstance(editor, QTimeEdit):
+            new_time = editor.time()
+            # 時間驗證：今天的第一個任務不能早於或等於目前時間
+            day = index.internalPointer()
+            if day.date == QDate.currentDate() and index.row() == 0 and new_time <= QTime.currentTime():
+                if new_time.toString("HH:mm") != index.data(Qt.ItemDataRole.EditRole):
+                    show_invalid_time_warning(self.parent_window)
+                return
+            model.setData(index, new_time.toString("HH:mm"))
+        else:
+            model.setData(index, editor.text())
+
+    def editorEvent(self, event, model, option, index):
+        if index.column() != WeekPlannerModel.COLUMN_ACTION: return super().editorEvent(event, model, option, index)
+        if event.type() == QEvent.Type.MouseButtonPress:
+            if event.button() == Qt.MouseButton.LeftButton: self._pressed = QPersistentModelIndex(index)
+            return True
+        if event.type() == QEvent.Type.MouseButtonDblClick:
+            # 雙擊的順序為 Press、Release、DblClick、Release：第一次放開已經處理，第二次放開之前沒有 Press，不會再新增或刪除
+            self._pressed = None
+            return True
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            pressed, self._pressed = self._pressed, None
+            if pressed is None or not pressed.isValid() or QModelIndex(pressed) != index: return True
+            day = index.internalPointer()
+            if day is None:
+                new_index = model.add_task(index.row())
+                view = option.widget
+                if view is not None:
+                    view.expand(index.siblingAtColumn(0))
+                    view.setCurrentIndex(new_index)
+                    view.edit(new_index)
+            else:
+                model.remove_task(model.days.index(day), index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+# --- 排程預覽 ---
+class SchedulePreviewModel(QAbstractTableModel):
+    """
+    排程預覽的表格模型。資料列隨捲動以 BATCH_SIZE 分批加入 (fetchMore)，
+    文字在檢視需要繪製時才格式化，排程再長對話框也能立即開啟。
+    """
+    COLUMN_TIME, COLUMN_LABEL = range(2)
+    BATCH_SIZE = 200
+    COLORS = {'work': QColor('#D4AC0D'), 'break': QColor('#E74C3C')}
+
+    def __init__(self, schedule, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window
+        self.schedule = schedule
+        self.loaded = min(len(schedule), self.BATCH_SIZE)
+        self.first_date = schedule[0].start.date() if schedule else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.schedule)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid(): return
+        count = min(self.BATCH_SIZE, len(self.schedule) - self.loaded)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        segment = self.schedule[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if index.column() == self.COLUMN_TIME:
+                # 跨日的排程在其他日期的區段前加上日期
+                prefix = "" if segment.start.date() == self.first_date else segment.start.strftime('%m-%d ')
+                return f"{prefix}{segment.start.strftime('%H:%M')} - {segment.end.strftime('%H:%M')}"
+            if segment.type == 'work': return self.parent_window.get_text('preview_focus').format(segment.name)
+            return self.parent_window.get_text('preview_break')
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.COLORS.get(segment.type)
+        return None
+
+
+def create_schedule_preview_view(model):
+    view = QTableView()
+    view.setModel(model)
+    view.horizontalHeader().hide(); view.verticalHeader().hide()
+    # 時間欄寬度固定，不必為了版面配置量測每一列的內容
+    view.horizontalHeader().setSectionResizeMode(SchedulePreviewModel.COLUMN_TIME, QHeaderView.ResizeMode.Fixed)
+    view.horizontalHeader().resizeSection(SchedulePreviewModel.COLUMN_TIME, view.fontMetrics().horizontalAdvance("00-00 00:00 - 00:00") + 24)
+    view.horizontalHeader().setStretchLastSection(True)
+    # 固定列高，捲動與版面配置不必逐列計算高度
+    view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 8)
+    view.setShowGrid(False)
+    view.setWordWrap(False)
+    view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+    view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    view.setMinimumHeight(300)
+    return view
+
+
+# --- 效能數據除錯面板 ---
+class StyleChangeCounter(QObject):
+    """事件過濾器：計算被監看元件收到的 StyleChange 事件 (樣式重新計算) 次數。"""
+    def __init__(self, metrics, name='style.changes', parent=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.name = name
+
+    def watch(self, *widgets):
+        for widget in widgets: widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.StyleChange: self.metrics.count(self.name)
+        return False
+
+
+class MetricsPanel(QDialog):
+    """顯示 instrumentation.Metrics 的即時數據；開啟期間每秒更新，可匯出成 JSON 檔案。"""
+    REFRESH_MS = 1000
+
+    def __init__(self, metrics, dump_dir, parent=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.dump_dir = dump_dir
+        self.parent_window = parent
+        self.resize(560, 420)
+        layout = QVBoxLayout(self)
+        self.text = QPlainTextEdit(); self.text.setReadOnly(True)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        layout.addWidget(self.text)
+        buttons = QHBoxLayout()
+        self.dump_button = QPushButton(); self.dump_button.clicked.connect(self.dump_json)
+        self.reset_button = QPushButton(); self.reset_button.clicked.connect(self.reset)
+        self.close_button = QPushButton(); self.close_button.clicked.connect(self.hide)
+        buttons.addWidget(self.dump_button); buttons.addWidget(self.reset_button); buttons.addStretch(); buttons.addWidget(self.close_button)
+        layout.addLayout(buttons)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.retranslate()
+
+    def retranslate(self):
+        self.setWindowTitle(self.parent_window.get_text('metrics_title'))
+        self.dump_button.setText(self.parent_window.get_text('metrics_dump_button'))
+        self.reset_button.setText(self.parent_window.get_text('metrics_reset_button'))
+        self.close_button.setText(self.parent_window.get_text('metrics_close_button'))
+
+    def refresh(self):
+        self.text.setPlainText(self.metrics.report())
+
+    def reset(self):
+        self.metrics.reset(); self.refresh()
+
+    def dump_json(self):
+        default_path = f"{self.dump_dir}/focusflow_metrics_{QDate.currentDate().toString('yyyyMMdd')}_{QTime.currentTime().toString('HHmmss')}.json"
+        path, _ = QFileDialog.getSaveFileName(self, self.parent_window.get_text('metrics_dump_title'), default_path, "JSON (*.json)")
+        if not path: return
+        try:
+            self.metrics.dump(path)
+        except OSError as e:
+            QMessageBox.warning(self, self.parent_window.get_text('metrics_dump_title'), str(e))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start(self.REFRESH_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()